@@ -1,239 +1,208 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.express as px
-import math
 import locale
-import numpy as np
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from analise import (COLUNAS_CRITICAS, alta_duracao, baixa_duracao, calcular_indicadores, folga_curta,
+                     tarefas_criticas as tarefas_criticas_ordenadas)
+from cache_disco import chave_arquivo, ler_cronograma_em_cache
+from calendario import calendario_de_texto
+from carteira import (atualizar_carteira, base_da_pasta, curva_carteira, indicadores_carteira, ler_carteira,
+                      picos_carteira, versao_carteira)
+from comparacao import BASES_CURVA, comparar_versoes, curvas_versoes, nomes_unicos
+from compartilhado import CalculosCompartilhados, curva_s_compartilhada
+from cpm import CicloNaRede, aplicar_cpm
+from distribuicao import PERFIS, CargaCustos, eixo_dias_uteis, perfis_invalidos, tabela_perfil
+from graficos import (MAX_LINHAS_GANTT, faixas_por_periodo, figura_curva_s, figura_curvas_versoes,
+                      figura_custos_carteira, figura_datas_termino, figura_faixas_curva_s, figura_gantt_faixas,
+                      figura_gantt_tarefas, figura_histograma_recurso, figura_valor_agregado)
+from indicadores import indicadores_logica, tabela_indicadores
+from instrumentacao import ARQUIVO_METRICAS, Medicoes, cronometrar, gravar_metricas, marcar_execucao, metricas_prometheus
+from recursos import (AGRUPAMENTOS as AGRUPAMENTOS_RECURSOS, MEDIDAS, carga_recursos, histograma_recurso,
+                      janelas_superalocacao, resumo_recursos)
+from relatorio import (FORMATOS_RELATORIO, NOMES_INDICADORES, curva_s_numerica, relatorio_bytes,
+                       tabela_indicadores_relatorio)
+from risco import DISTRIBUICOES, resumo_termino, simular_riscos
+from tabelas import (TAMANHO_PAGINA, formato_data, formato_indice, formato_percentual, formato_reais, hash_tabela,
+                     pagina_tabela)
+from valor_agregado import AGRUPAMENTOS as AGRUPAMENTOS_VALOR_AGREGADO, serie_valor_agregado
+from vinculos import id_repetido, ids_tarefas, tabela_vinculos
 
 locale.setlocale(locale.LC_ALL, '')
 
 
-@st.cache_data
-#ler o arquivo e formatar#
-def ler_arquivo_excel(arquivo_excel):
-    df = pd.read_excel(arquivo_excel, sheet_name="Planilha1",
-                       parse_dates=["Início Agendado", "Término Agendado",
-                                    "Início da Linha de Base", "Término da linha de base"],
-                       date_parser=lambda x: pd.to_datetime(x, format='mixed'))
-    df.rename(columns={"Início da Linha de Base": "Início BL", "Término da linha de base": "Término BL", "Duração da Linha de Base": "Duração BL",
-                       "Margem de atraso permitida":"Folga"}, inplace=True)
-    df = df.apply(
-        lambda col: col.str.replace('diasd', '') if col.dtype == 'object' and col.name != 'Produtividade' else col)
-    df = df.apply(
-        lambda col: col.str.replace('dias', '') if col.dtype == 'object' and col.name != 'Produtividade' else col)
-    df = df.apply(
-        lambda col: col.str.replace('dia', '') if col.dtype == 'object' and col.name != 'Produtividade' else col)
-    df[['Predecessoras', 'Sucessoras']] = df[['Predecessoras', 'Sucessoras']].astype(str)
-    df['Duração BL'] = df['Duração BL'].astype(str).str.replace(',', '.').str.strip()
-    df['Duração BL'] = df['Duração BL'].astype(float).astype(int)
-    df = df.query("Resumo == 'Não'")
-    df['Custo Diário'] = df['Custo'] / df['Duração BL']
-
-    return df
-
-@st.cache_data
-# Incluir Feriados#
-def selecionar_feriados(feriados_texto):
-    feriados = []
-    for data_texto in feriados_texto.split('\n'):
-        data_texto = data_texto.strip()
-        if data_texto:
-            try:
-                feriados.append(pd.to_datetime(data_texto, format='%d/%m/%Y'))
-            except ValueError:
-                st.error(f"A data '{data_texto}' está em um formato inválido. Por favor, use o formato 'DD/MM/YYYY'.")
-    return feriados
-
-#Criar Curva S
-def criar_curva_s(dataframe, agrupamento, S30, S50, S70):
-    if agrupamento == 'Mês':
-        curva_s_agrupado = dataframe.groupby(pd.Grouper(freq='M')).sum()
-        curva_s_agrupado.index = curva_s_agrupado.index.strftime('%m/%y')
-        N = len(curva_s_agrupado)
-    elif agrupamento == 'Semana':
-        curva_s_agrupado = dataframe.groupby(pd.Grouper(freq='W-MON')).sum()
-        curva_s_agrupado.index = curva_s_agrupado.index.strftime('%d/%m/%y')
-        N = len(curva_s_agrupado)
-    else:
-        curva_s_agrupado = pd.DataFrame()  # Retornar um DataFrame vazio se o agrupamento não for reconhecido
-        N=0
-
-    # Calcular a nova coluna usando a fórmula 1 - [1 - (n/N)^{log(I)}]^S
-    curva_s_agrupado['n'] = range(0, N)
-    curva_s_agrupado['Curva30'] = curva_s_agrupado['n'].apply(lambda n: (1-((1-((n/(N-1))**(math.log10(30))))**S30))*100)
-    curva_s_agrupado['Curva50'] = curva_s_agrupado['n'].apply(lambda n: (1 - ((1 - ((n / (N-1)) ** (math.log10(50)))) ** S50)) * 100)
-    curva_s_agrupado['Curva70'] = curva_s_agrupado['n'].apply(lambda n: (1 - ((1 - ((n / (N-1)) ** (math.log10(70)))) ** S70)) * 100)
-
-    # Calcular o percentual acumulado
-    curva_s_agrupado['% Acum.'] = curva_s_agrupado['%'].cumsum()
-
-    # Formatar os valores monetários
-    curva_s_agrupado['Custo Total '] = curva_s_agrupado['Custo Total'].apply(
-        lambda x: '{:,.2f}'.format(x).replace(',', 'X').replace('.', ',').replace('X', '.'))
-    # Formatar as colunas de % e % Acum.
-    curva_s_agrupado['% '] = curva_s_agrupado['%'].apply(lambda x: f"{x:.1f}%")
-    curva_s_agrupado['% Acum. '] = curva_s_agrupado['% Acum.'].apply(lambda x: f"{x:.1f}%")
-    curva_s_agrupado['%C30'] = curva_s_agrupado['Curva30'].apply(lambda x: f"{x:.1f}%")
-    curva_s_agrupado['%C50'] = curva_s_agrupado['Curva50'].apply(lambda x: f"{x:.1f}%")
-    curva_s_agrupado['%C70'] = curva_s_agrupado['Curva70'].apply(lambda x: f"{x:.1f}%")
-
-    return curva_s_agrupado
-
+# Hash do conteúdo do arquivo enviado, calculado uma única vez por upload
+def chave_do_upload(arquivo_excel):
+    chaves = st.session_state.setdefault('chaves_arquivos', {})
+    if arquivo_excel.file_id not in chaves:
+        chaves[arquivo_excel.file_id] = chave_arquivo(arquivo_excel.getvalue())
+    return chaves[arquivo_excel.file_id]
 
-def processar_dados(arquivo_excel, feriados_texto, agrupamento_opcao, S30, S50, S70):
-    if arquivo_excel is not None:
-        # Ler o arquivo Excel e preencher valores ausentes na coluna EDT com uma string vazia
-        df = ler_arquivo_excel(arquivo_excel)
 
-        # Converter a coluna "Margem de atraso permitida" para numérico
-        df['Folga'] = pd.to_numeric(df['Folga'], errors='coerce')
-
-        # Armazenar as datas de feriado em cache
-        feriados = selecionar_feriados(feriados_texto)
-
-        # Criar um intervalo de datas considerando apenas os dias úteis (de segunda a sexta-feira)
-        datas_uteis = pd.date_range(start=df['Início BL'].min(), end=df['Término BL'].max(), freq='B')
-
-        # Extendendo o intervalo em uma semana ou um mês
-        if agrupamento_opcao == 'Mês':
-            datas_uteis = pd.date_range(start=df['Início BL'].min() - pd.DateOffset(months=1),
-                                        end=df['Término BL'].max(), freq='B')
-        elif agrupamento_opcao == 'Semana':
-            datas_uteis = pd.date_range(start=df['Início BL'].min() - pd.DateOffset(weeks=1),
-                                        end=df['Término BL'].max(), freq='B')
-
-        # Criar o DataFrame DataS usando o intervalo de datas úteis
-        DataS = pd.DataFrame(index=datas_uteis)
-
-        for index, row in df.iterrows():
-            data_inicio = row['Início BL']
-            data_termino = row['Término BL']
-            tarefa = row['Nome da tarefa'].strip()  # Remover espaços extras no nome da tarefa
-            custo_total = row['Custo']
-            custo_diario = row['Custo Diário']
-
-            # Verificar se a coluna já existe em DataS
-            if tarefa not in DataS.columns:
-                DataS[tarefa] = 0
+@st.cache_data
+#ler o arquivo e formatar (apenas as colunas usadas, com unidades, datas e tipos convertidos por coluna)#
+# O resultado também fica em cache em disco, pelo hash do conteúdo, e sobrevive a reinícios do servidor
+def ler_arquivo_excel(_arquivo_excel, chave):
+    marcar_execucao()
+    return ler_cronograma_em_cache(_arquivo_excel)
 
-            datas_tarefa = pd.date_range(start=data_inicio, end=data_termino, freq='B')  # Apenas dias úteis
-            custos_diarios = [custo_diario] * len(datas_tarefa)
+# Incluir Feriados (o calendário é montado uma única vez por texto de feriados)#
+def selecionar_feriados(feriados_texto):
+    calendario, invalidos = calendario_de_texto(feriados_texto)
+    for data_texto in invalidos:
+        st.error(f"A data '{data_texto}' está em um formato inválido. Por favor, use o formato 'DD/MM/YYYY'.")
+    return calendario
 
-            for data in datas_tarefa:
-                # Verificar se a data está dentro do intervalo desejado e não está na lista de feriados
-                if data not in feriados:
-                    DataS.loc[data, tarefa] += custo_diario
 
-            # Calcular a soma dos custos diários por dia para todas as tarefas
-            CurvaS = DataS.sum(axis=1).reset_index()
-            CurvaS.columns = ['Data', 'Custo Total']
-            CurvaS['Data'] = pd.to_datetime(CurvaS['Data'], format='%d.%m.%y')  # Corrigir o formato da data
-            CurvaS.set_index('Data', inplace=True)
+# Etapas em cache: os parâmetros com "_" não entram na chave do cache; o arquivo é identificado pela chave do
+# conteúdo. Toda função em cache chama marcar_execucao() ao ser executada, para as medições saberem se houve
+# acerto.
 
-            # Substituir valores infinitos por zero
-            CurvaS['Custo Total'] = CurvaS['Custo Total'].replace([np.inf, -np.inf], 0)
 
-            custo_total = CurvaS['Custo Total'].sum()
-            CurvaS['%'] = round((CurvaS['Custo Total'] / custo_total) * 100, 2)
+# Tarefas cujo custo não entra na Curva S (sem datas ou com custo inválido) e tarefas com um "Perfil de custo"
+# não reconhecido no arquivo (distribuídas pelo perfil escolhido)
+@st.cache_data(max_entries=8)
+def etapa_conferencia_custos(_df, chave, feriados_texto):
+    marcar_execucao()
+    calendario, _ = calendario_de_texto(feriados_texto)
+    datas_uteis = eixo_dias_uteis(_df['Início BL'].min(), _df['Término BL'].max(), 'Mês', calendario)
+    return CargaCustos.de_tarefas(_df, datas_uteis, calendario).conferir(), perfis_invalidos(_df)
 
 
-        # Criar a CurvaS agrupada de acordo com a opção selecionada
-        CurvaS_agrupado = criar_curva_s(CurvaS, agrupamento_opcao, S30, S50, S70).round(1)
+@st.cache_data
+def etapa_cpm(_df, chave, feriados_texto):
+    marcar_execucao()
+    calendario, _ = calendario_de_texto(feriados_texto)
+    return aplicar_cpm(_df, calendario)
+
+
+# Indicadores do cronograma e os de qualidade da lógica, com a tabela de vínculos montada uma única vez
+@st.cache_data(max_entries=8)
+def etapa_indicadores(_df, chave, feriados_texto, usar_cpm):
+    marcar_execucao()
+    calendario, _ = calendario_de_texto(feriados_texto)
+    vinculos = tabela_vinculos(_df)
+    return calcular_indicadores(_df, calendario, vinculos), indicadores_logica(_df, vinculos)
+
+
+# Comparação de versões do cronograma (resumo por versão, tabela por tarefa e figura das Curvas S sobrepostas),
+# memorizada pelas chaves dos arquivos
+@st.cache_data(max_entries=8)
+def etapa_comparacao(_versoes, chaves, nomes, feriados_texto, agrupamento_opcao, base_curva, perfil):
+    marcar_execucao()
+    calendario, _ = calendario_de_texto(feriados_texto)
+    resumo, tarefas = comparar_versoes(_versoes, list(nomes), calendario)
+    curvas = curvas_versoes(_versoes, list(nomes), calendario, agrupamento_opcao, base_curva, perfil)
+    return resumo, tarefas, figura_curvas_versoes(curvas).to_dict()
+
+
+# Valor agregado (série, resumo na data de status e figura) para a data de status e o agrupamento escolhidos
+@st.cache_data(max_entries=16)
+def etapa_valor_agregado(_df, chave, feriados_texto, usar_cpm, data_status, agrupamento_opcao, perfil):
+    marcar_execucao()
+    calendario, _ = calendario_de_texto(feriados_texto)
+    serie, resumo = serie_valor_agregado(_df, calendario, data_status, agrupamento_opcao, perfil)
+    return serie, resumo, figura_valor_agregado(serie).to_dict()
+
+
+# Demanda diária de cada recurso (pelas colunas "Quant. Prev." e "Produtividade") e o resumo por recurso
+@st.cache_data(max_entries=8)
+def etapa_carga_recursos(_df, chave, feriados_texto, medida):
+    marcar_execucao()
+    calendario, _ = calendario_de_texto(feriados_texto)
+    diaria = carga_recursos(_df, calendario, medida)
+    return diaria, resumo_recursos(diaria)
+
+
+# Histograma, janelas de superalocação e figura de um recurso para o agrupamento e a capacidade escolhidos
+@st.cache_data(max_entries=32)
+def etapa_histograma_recurso(_diaria, chave, feriados_texto, medida, recurso, agrupamento_opcao, capacidade):
+    marcar_execucao()
+    histograma = histograma_recurso(_diaria[recurso], agrupamento_opcao, capacidade)
+    janelas = None if capacidade is None else janelas_superalocacao(_diaria[recurso], capacidade, agrupamento_opcao)
+    return histograma, janelas, figura_histograma_recurso(histograma, recurso, capacidade).to_dict()
+
+
+# Simulação de Monte Carlo (término, criticidade e faixas da Curva S) com as figuras, memorizada pelas opções.
+# Num único processo: criar processos (fork) dentro do servidor, com as threads das sessões e dos cálculos
+# compartilhados, pode travar; a reserva de processos fica para o modo em lote e os benchmarks.
+@st.cache_data(max_entries=8)
+def etapa_riscos(_df, chave, feriados_texto, n_iteracoes, distribuicao, otimista, pessimista, incerteza_custo,
+                 agrupamento_opcao):
+    marcar_execucao()
+    calendario, _ = calendario_de_texto(feriados_texto)
+    datas_termino, criticidade, faixas = simular_riscos(_df, calendario, n_iteracoes, distribuicao, otimista,
+                                                        pessimista, incerteza_custo, agrupamento_opcao, processos=1)
+    resumo = resumo_termino(datas_termino, _df['Término BL'].max())
+    return (resumo, criticidade, figura_datas_termino(datas_termino, resumo, _df['Término BL'].max()).to_dict(),
+            figura_faixas_curva_s(faixas).to_dict())
+
+
+# Relatório (.xlsx ou .zip com Parquet/CSV) com as tabelas calculadas, memorizado pelo conteúdo das tabelas
+@st.cache_data(max_entries=4)
+def etapa_relatorio(_tabelas, hashes, formato):
+    marcar_execucao()
+    return relatorio_bytes(_tabelas, formato)
+
+
+# Carteira de projetos: Curva S combinada, custos e indicadores por projeto e picos, calculados sobre a base
+# inteira; memorizada pela versão da base (muda quando algum arquivo da pasta muda)
+@st.cache_data(max_entries=4)
+def etapa_carteira(base, versao_base, feriados_texto, agrupamento_opcao, S30, S50, S70):
+    marcar_execucao()
+    calendario, _ = calendario_de_texto(feriados_texto)
+    df = ler_carteira(base)
+    CurvaS_agrupado, custos_por_projeto = curva_carteira(df, calendario, agrupamento_opcao, S30, S50, S70)
+    colunas_grafico = ['Custo Total ', '%', '% Acum.'] + [coluna for coluna in CurvaS_agrupado.columns
+                                                          if coluna.startswith('Curva')]
+    return (CurvaS_agrupado, indicadores_carteira(df, calendario), picos_carteira(custos_por_projeto),
+            figura_curva_s(CurvaS_agrupado[colunas_grafico], agrupamento_opcao).to_dict(),
+            figura_custos_carteira(custos_por_projeto).to_dict())
+
+
+# Figura da Curva S (spec do Plotly) memorizada pelos dados da curva; só muda quando a curva muda
+@st.cache_data(max_entries=32)
+def etapa_figura_curva_s(curva, agrupamento_opcao):
+    marcar_execucao()
+    return figura_curva_s(curva, agrupamento_opcao).to_dict()
+
+
+# Cálculos em segundo plano do servidor, um único objeto para todas as sessões (ver compartilhado.py)
+@st.cache_resource
+def calculos_compartilhados():
+    return CalculosCompartilhados()
+
+
+# Espera máxima (s) por um cálculo em segundo plano antes de a página rodar de novo para exibir o que ficou pronto
+ESPERA_S = 1
 
-        return CurvaS_agrupado
-    else:
-        return None
 
 def caminho_critico_com_gantt(dataframe):
-    # Filtrar apenas as tarefas críticas
-    tarefas_criticas = dataframe[dataframe['Crítica'] == 'Sim']
-
-    # Selecionar as colunas desejadas
-    colunas_desejadas = ['Nome da tarefa', 'Início BL', 'Término BL',
-                         'Duração', 'Quant. Prev.', 'Produtividade']
-
-    # Ordenar as tarefas por data de início
-    tarefas_criticas = tarefas_criticas.sort_values(by='Início BL')
-
-    # Formatar as datas de início e término
-    tarefas_criticas['Início BL'] = pd.to_datetime(tarefas_criticas['Início BL'], format='%d.%m.%y').dt.date
-    tarefas_criticas['Término BL'] = pd.to_datetime(tarefas_criticas['Término BL'], format='%d.%m.%y').dt.date
+    # Filtrar apenas as tarefas críticas, ordenadas por data de início
+    tarefas_criticas = tarefas_criticas_ordenadas(dataframe)
 
     # Criar uma nova tabela com as colunas desejadas
-    tabela_critica = tarefas_criticas[colunas_desejadas]
-
-    # Obter a ordem das tarefas
-    order = tarefas_criticas['Nome da tarefa'].tolist()
-    order.reverse()
-
-    # Plotar o gráfico de Gantt
-    fig = px.timeline(tarefas_criticas, x_start='Início BL', x_end='Término BL',
-                      y='Nome da tarefa',
-                      labels={'Início BL': 'Início', 'Término BL': 'Término'},
-                      color_discrete_sequence=['#0068C9'])
-
-    # Definir a ordem das tarefas no eixo Y
-    fig.update_yaxes(categoryorder='array', categoryarray=order)
-    # Ajustar a legibilidade dos rótulos de data
-    fig.update_layout(xaxis=dict(tickformat="%d-%m-%y"))
-
-
-    # Ajustar a largura das barras para aumentar o espaçamento
-    fig.update_layout(
-        xaxis_title='Data',
-        yaxis_title='Tarefa',
-        autosize=True,  # Permitir que o gráfico ajuste automaticamente seu tamanho
-        width=1400,  # Define a largura do gráfico como None para ajustar automaticamente à largura do container
-        height=600,  # Ajuste a altura conforme necessário
-
-    )
-
-
-    return tabela_critica, fig
-
-# Função para calcular indicadores
-def calcular_indicadores(df):
-    quant_tarefas = len(df)
+    tabela_critica = tarefas_criticas[COLUNAS_CRITICAS]
 
-    # Contabilizar Leads e Lags
-    leads = df['Predecessoras'].apply(lambda x: '+' in x).sum()
-    lags = df['Predecessoras'].apply(lambda x: '-' in x).sum()
+    return tabela_critica, tarefas_criticas
 
-    # Contabilizar Relationship Types
-    relationship_types = df['Predecessoras'].apply(lambda x: all(s not in x for s in ['II', 'IT', 'TT'])).sum()
 
-    # Filtrar linhas onde "Predecessoras" e "Sucessoras" estão vazias
-    linhas_vazias = df[(df['Predecessoras'] == '') & (df['Sucessoras'] == '')]
-
-    # Contar o número de linhas vazias
-    logic = len(linhas_vazias)
-
-    # Calcular porcentagens
-    leads_pct = (leads / quant_tarefas) * 100
-    lags_pct = (lags / quant_tarefas) * 100
-    relationship_types_pct = (relationship_types / quant_tarefas) * 100
-    logic_pct = (logic / quant_tarefas) * 100
-
-    # Calcular Data de Início, Data de Término e Duração
-    data_inicio = df['Início BL'].min()
-    data_termino = df['Término BL'].max()
-    duracao_total = (data_termino - data_inicio).days
-
-    data_inicio = pd.to_datetime(data_inicio).strftime("%d/%m/%y")
-    data_termino = pd.to_datetime(data_termino).strftime("%d/%m/%y")
-
-
-    return leads_pct, lags_pct, relationship_types_pct, logic_pct, data_inicio, data_termino, duracao_total
+# Gráfico de Gantt (spec do Plotly) memorizado por cronograma, modo e janela; cada figura tem no máximo
+# MAX_LINHAS_GANTT linhas, seja qual for o número de tarefas críticas
+@st.cache_data(max_entries=64)
+def etapa_gantt(_tarefas_criticas, chave, feriados_texto, usar_cpm, modo, janela):
+    marcar_execucao()
+    if modo == "Faixas por período":
+        return figura_gantt_faixas(faixas_por_periodo(_tarefas_criticas)).to_dict()
+    inicio = janela * MAX_LINHAS_GANTT
+    return figura_gantt_tarefas(_tarefas_criticas.iloc[inicio:inicio + MAX_LINHAS_GANTT]).to_dict()
 
 # Função para calcular indicadores de alta duração
 
 def calcular_high_duration(df, valor_alta_duracao):
-    # Filtrar tarefas com duração alta (> valor_alta_duracao)
-    high_duration_tasks = df[df['Duração BL'] > valor_alta_duracao]
-
-    # Calcular o indicador High Duration
-    high_duration_indicator = (len(high_duration_tasks) / len(df)) * 100
+    # Filtrar tarefas com duração alta (> valor_alta_duracao) e calcular o indicador High Duration
+    high_duration_indicator, high_duration_tasks = alta_duracao(df, valor_alta_duracao)
 
     # Exibir o indicador High Duration
     st.subheader(":blue[Índice de Alta Duração:]")
@@ -242,26 +211,15 @@ def calcular_high_duration(df, valor_alta_duracao):
     # Exibir DataFrame para High Duration Tasks
     st.subheader(":blue[Tarefas de Alta Duração]:")
     if not high_duration_tasks.empty:
-        # Convertendo as colunas de data para datetime, se não forem
-        high_duration_tasks['Início BL'] = pd.to_datetime(high_duration_tasks['Início BL'],
-                                                                        format='%d.%m.%y').dt.date
-        high_duration_tasks['Término BL'] = pd.to_datetime(
-            high_duration_tasks['Término BL'], format='%d.%m.%y').dt.date
-        html_table_high_duration = high_duration_tasks[
-            ['Nome da tarefa', 'Início BL', 'Término BL', 'Duração BL']].to_html(index=False, classes=["dataframe"],
-                                                                                 justify="center")
-        st.write(css_style + html_table_high_duration, unsafe_allow_html=True)
-
+        exibir_tabela(high_duration_tasks, "alta_duracao")
     else:
         st.write("Nenhuma tarefa encontrada com duração alta.")
+    return high_duration_indicator, high_duration_tasks
 
 # Função para calcular indicadores de baixa duração
 def calcular_low_duration(df, valor_baixa_duracao):
-    # Filtrar tarefas com duração baixa (< valor_baixa_duracao)
-    low_duration_tasks = df[df['Duração BL'] < valor_baixa_duracao]
-
-    # Calcular o indicador Low Duration
-    low_duration_indicator = (len(low_duration_tasks) / len(df)) * 100
+    # Filtrar tarefas com duração baixa (< valor_baixa_duracao) e calcular o indicador Low Duration
+    low_duration_indicator, low_duration_tasks = baixa_duracao(df, valor_baixa_duracao)
 
     # Exibir o indicador Low Duration
     st.subheader(":blue[Índice de Baixa Duração:]")
@@ -270,39 +228,47 @@ def calcular_low_duration(df, valor_baixa_duracao):
     # Exibir DataFrame para Low Duration Tasks
     st.subheader(":blue[Tarefas de Baixa Duração]:")
     if not low_duration_tasks.empty:
-        # Convertendo as colunas de data para datetime, se não forem
-        low_duration_tasks['Início BL'] = pd.to_datetime(low_duration_tasks['Início BL'], format='%d.%m.%y').dt.date
-        low_duration_tasks['Término BL'] = pd.to_datetime(low_duration_tasks['Término BL'], format='%d.%m.%y').dt.date
-        html_table_low_duration = low_duration_tasks[
-            ['Nome da tarefa', 'Início BL', 'Término BL', 'Duração BL']].to_html(index=False, classes=["dataframe"],
-                                                                                 justify="center")
-        st.write(css_style + html_table_low_duration, unsafe_allow_html=True)
+        exibir_tabela(low_duration_tasks, "baixa_duracao")
     else:
         st.write("Nenhuma tarefa encontrada com duração baixa.")
+    return low_duration_indicator, low_duration_tasks
+
+# Página de uma tabela (filtro, ordenação e formatação feitos no servidor), memorizada pelo conteúdo da tabela
+@st.cache_data(max_entries=256)
+def etapa_pagina_tabela(_tabela, hash_da_tabela, nome, pagina, filtro, ordenar_por, crescente, _formatos=None):
+    marcar_execucao()
+    return pagina_tabela(_tabela, pagina, TAMANHO_PAGINA, filtro, ordenar_por, crescente, _formatos)
+
+
+# Exibir uma tabela em páginas de TAMANHO_PAGINA linhas; só a página visível é formatada e enviada ao navegador
+def exibir_tabela(tabela, nome, formatos=None):
+    pagina, filtro, ordenar_por, crescente = 1, '', None, True
+    if len(tabela) > TAMANHO_PAGINA:
+        col1, col2, col3, col4 = st.columns((2, 2, 1.2, 1))
+        with col1:
+            filtro = st.text_input("Filtrar:", key=f"filtro_{nome}")
+        with col2:
+            ordenar_por = st.selectbox("Ordenar por:", [None] + list(tabela.columns), key=f"ordem_{nome}",
+                                       format_func=lambda coluna: "(ordem original)" if coluna is None else coluna)
+        with col3:
+            crescente = st.selectbox("Ordem:", ["Crescente", "Decrescente"], key=f"sentido_{nome}") == "Crescente"
+        with col4:
+            pagina = st.number_input("Página:", min_value=1, value=1, step=1, key=f"pagina_{nome}")
+    # Colunas formatadas entram na chave pelo nome da tabela
+    with cronometrar(tempos, f'Tabela: {nome}', cache=True) as medicao:
+        medicao['linhas'] = len(tabela)
+        recorte, total, pagina, n_paginas = etapa_pagina_tabela(tabela, hash_tabela(tabela), nome, pagina, filtro,
+                                                                ordenar_por, crescente, formatos)
+        st.dataframe(recorte, hide_index=True, use_container_width=True)
+    if len(tabela) > TAMANHO_PAGINA:
+        st.caption(f"Página {pagina} de {n_paginas} ({total} linha(s))")
+
 
 def format_currency(amount):
     return f'R${amount:,.2f}'.replace('.', ',').replace(',', '.', 2)
 
 
 # Interface do usuário
-# Estilo CSS para ajustar o tamanho da fonte e centralizar o texto no cabeçalho e no corpo da tabela
-css_style = """
-<style>
-.dataframe th {
-    font-size: 14px;
-    text-align: center;
-}
-.dataframe td {
-    font-size: 14px;
-    text-align: center;
-}
-.scrollable-table {
-    max-height: 350px;
-    overflow-y: scroll;
-}
-</style>
-"""
-
 st.set_page_config(page_title="Análise de Projeto", page_icon=":bar_chart:", layout="wide")
 #____________Sidebar
 # Personalizando a barra lateral
@@ -311,12 +277,50 @@ st.sidebar.title("Menu")
 arquivo_excel = st.sidebar.file_uploader("Faça upload do seu arquivo Excel", type=["xlsx"], key="uploader1")
 # Definir os feriados
 feriados_texto = st.sidebar.text_area("Feriados (formato: DD/MM/YYYY)", "")
+# Calcular o caminho crítico e a folga pela rede de Predecessoras em vez de usar as colunas do arquivo
+usar_cpm = st.sidebar.checkbox("Calcular caminho crítico pelas Predecessoras (CPM)", value=False)
+# Versões anteriores do mesmo cronograma (comparadas com o arquivo principal, que é tomado como a mais recente)
+versoes_excel = st.sidebar.file_uploader("Versões anteriores para comparar (opcional)", type=["xlsx"],
+                                         accept_multiple_files=True, key="uploader_versoes")
+# Pasta no servidor com um cronograma (.xlsx) por projeto, consolidada numa base colunar (ver carteira.py)
+pasta_carteira = st.sidebar.text_input("Pasta da carteira de projetos (opcional)", "").strip()
+# Medir também memória, linhas e cache de cada etapa (o rastreamento de memória deixa o app mais lento)
+depuracao = st.sidebar.checkbox("Depuração (memória, linhas e cache por etapa)", value=False)
 #____________Sidebar
 
+# Medições de cada etapa nesta execução (exibidas na barra lateral, no log JSON e nas métricas)
+tempos = Medicoes(memoria=depuracao)
+# Cálculos em segundo plano ainda em andamento nesta execução (a página roda de novo quando algum termina)
+calculos = calculos_compartilhados()
+pendentes = []
 if arquivo_excel is not None:
-    df= ler_arquivo_excel(arquivo_excel)
+    chave = chave_do_upload(arquivo_excel)
+    tempos.contexto['arquivo'] = chave
+    with cronometrar(tempos, 'Leitura', cache=True) as medicao:
+        df= ler_arquivo_excel(arquivo_excel, chave)
+        medicao['linhas'] = len(df)
+    with cronometrar(tempos, 'Feriados'):
+        calendario = selecionar_feriados(feriados_texto)
+    if usar_cpm:
+        try:
+            with cronometrar(tempos, 'Caminho crítico (CPM)', cache=True):
+                df = etapa_cpm(df, chave, feriados_texto)
+        except CicloNaRede as erro:
+            st.error(f"{erro}. Usando as colunas 'Crítica' e 'Margem de atraso permitida' do arquivo.")
+    # Ids usados em mais de uma tarefa: os vínculos vão para a primeira (ver vinculos.tabela_vinculos)
+    ids_repetidos = pd.unique(ids_tarefas(df)[id_repetido(df)])
+    if len(ids_repetidos):
+        valores = ', '.join(map(str, ids_repetidos[:5]))
+        st.warning(f"{len(ids_repetidos)} Id(s) usado(s) em mais de uma tarefa ({valores}): os vínculos para esses "
+                   "Ids usam a primeira tarefa com o Id.")
+    # Tarefas críticas em segundo plano, enquanto os indicadores são calculados e exibidos
+    futuro_criticas = calculos.enviar(('Tarefas críticas', chave, feriados_texto, usar_cpm),
+                                      caminho_critico_com_gantt, df)
     # Calcular indicadores
-    leads_pct, lags_pct, relationship_types_pct, logic_pct, data_inicio, data_termino, duracao_total = calcular_indicadores(df)
+    with cronometrar(tempos, 'Indicadores', cache=True) as medicao:
+        medicao['linhas'] = len(df)
+        indicadores, indicadores_de_logica = etapa_indicadores(df, chave, feriados_texto, usar_cpm)
+        leads_pct, lags_pct, relationship_types_pct, logic_pct, data_inicio, data_termino, duracao_total, duracao_util = indicadores
 
 
     col1, col2, col3, col4, col5, col6 = st.columns((1, 2, 1, 1, 1.5, 1.5))
@@ -386,22 +390,23 @@ if arquivo_excel is not None:
                     <b>Should be < 5%</b>
                 </h4>
             </div>
-                """.format(lags_pct),
+                """.format(logic_pct),
             unsafe_allow_html=True
         )
     with col2:
-        Valor_Agregado = df["Custo"].sum()
-        Valor_Agregadof = format_currency(Valor_Agregado)
+        # Soma dos custos das tarefas: é o orçamento no término; o valor agregado fica na seção própria
+        Custo_Orcado = df["Custo"].sum()
+        Custo_Orcadof = format_currency(Custo_Orcado)
         st.markdown(
             """
             <div style="border: 1px inset #468189; padding: 5px; border-radius: 10px; text-align: center;
                 display: flex; flex-direction: column; justify-content: center;
                 background-color:#F0F0F0;">
                 <h2 style="color: #0068C9;font-size: 20px; margin: -7px 0;">
-                    <b>Valor Agregado</b>
+                    <b>Custo Orçado</b>
                 <h3 style="color: #0068C9;">{}</h3>
             </div>
-            """.format(Valor_Agregadof),
+            """.format(Custo_Orcadof),
             unsafe_allow_html=True
         )
     with col1:
@@ -419,13 +424,19 @@ if arquivo_excel is not None:
                     Término BL: {Data_Termino}
                 </h3>
                 <h3 style="color: #0068C9; margin: -6px 0;font-size: 16px;">
-                    Duração: {Duracao_Total} dias
+                    Duração: {Duracao_Total} dias ({Duracao_Util} úteis)
                 </h3>
             </div>
-            """.format(Data_Inicio=data_inicio, Data_Termino=data_termino, Duracao_Total=duracao_total),
+            """.format(Data_Inicio=data_inicio, Data_Termino=data_termino, Duracao_Total=duracao_total,
+                       Duracao_Util=duracao_util),
             unsafe_allow_html=True
         )
 
+    # Todos os indicadores de qualidade da lógica (vínculos, tarefas soltas, folgas)
+    with st.expander("Indicadores de qualidade da lógica"):
+        exibir_tabela(tabela_indicadores(indicadores_de_logica), "indicadores",
+                      {'%': lambda coluna: coluna.map('{:.2f}%'.format)})
+
     st.subheader(":blue[Curva S:]")
     col1, col2 = st.columns((2.5,1))  # Dividir a tela em duas colunas
 
@@ -441,76 +452,82 @@ if arquivo_excel is not None:
             S50 = st.selectbox("Valor de S50", options=[1.0, 1.5, 2.0, 2.5, 3.0], index=3)
         with col5:
             S70 = st.selectbox("Valor de S70", options=[1.0, 1.5, 2.0, 2.5, 3.0], index=3)
+        ajustar = st.checkbox("Ajustar S à curva real", value=False)
 
-    # Processar os dados e criar a curva S
-    CurvaS_agrupado = processar_dados(arquivo_excel, feriados_texto, agrupamento_opcao, S30, S50, S70)
+        # Perfil de carga do custo das tarefas (a coluna "Perfil de custo" do arquivo, se houver, prevalece)
+        perfil = st.selectbox("Perfil de custo:", list(PERFIS) + ["Tabela de percentuais"])
+        if perfil == "Tabela de percentuais":
+            perfil = st.text_input("Percentuais por trecho da duração:", "10;20;40;20;10")
+            try:
+                tabela_perfil(perfil)
+            except ValueError as erro:
+                st.error(str(erro))
+                perfil = "Uniforme"
+
+    # Processar os dados e criar a curva S em segundo plano, num cálculo compartilhado com as outras sessões que
+    # abrirem o mesmo arquivo com os mesmos parâmetros; até ficar pronta, o restante da página é exibido
+    futuro_curva_s = calculos.enviar(('Curva S', chave, feriados_texto, agrupamento_opcao, S30, S50, S70, ajustar,
+                                      perfil), curva_s_compartilhada, calculos, df, chave, feriados_texto,
+                                     agrupamento_opcao, S30, S50, S70, ajustar, perfil)
+    # Um erro no cálculo em segundo plano fica só nesta seção (o cálculo que falhou é esquecido e tentado de novo
+    # na próxima execução)
+    CurvaS_agrupado, erro_curva_s = None, None
+    if futuro_curva_s.done():
+        try:
+            with cronometrar(tempos, 'Curva S') as medicao:
+                CurvaS_agrupado = futuro_curva_s.result()
+                medicao['linhas'] = len(CurvaS_agrupado)
+        except Exception as erro:
+            erro_curva_s = erro
+    else:
+        pendentes.append(futuro_curva_s)
+    nao_distribuidas, perfis_ignorados = etapa_conferencia_custos(df, chave, feriados_texto)
+    if len(nao_distribuidas):
+        with col2:
+            st.warning(f"{len(nao_distribuidas)} tarefa(s) sem datas ou com custo inválido ficaram fora da Curva S "
+                       f"({format_currency(nao_distribuidas['Custo'].sum())}).")
+    if len(perfis_ignorados):
+        with col2:
+            valores = ", ".join(f'"{valor}"' for valor in perfis_ignorados['Perfil de Custo'].unique()[:5])
+            st.warning(f"{len(perfis_ignorados)} tarefa(s) com perfil de custo não reconhecido ({valores}) foram "
+                       f"distribuídas pelo perfil {perfil}.")
+    if ajustar and CurvaS_agrupado is not None:
+        with col2:
+            st.caption("S ajustado: " + ", ".join(f"S{I} = {S:.2f}" for I, S in CurvaS_agrupado.attrs['S ajustado'].items()))
 
 
 
     with col1:
         # Plotar o gráfico da curva S agrupado por mês
         if CurvaS_agrupado is not None:
-            plt.figure(figsize=(12, 6))
-            plt.plot(CurvaS_agrupado.index, CurvaS_agrupado['% Acum.'], marker='o', markerfacecolor="#0068C9", label='% Acum.')
-            plt.plot(CurvaS_agrupado.index, CurvaS_agrupado['Curva30'], linestyle=":", color='lightpink', label='S30')
-            plt.plot(CurvaS_agrupado.index, CurvaS_agrupado['Curva50'], linestyle=":", color='lightgreen', label='S50')
-            plt.plot(CurvaS_agrupado.index, CurvaS_agrupado['Curva70'], linestyle=":", color='Lightgray', label='S70')
-            plt.xlabel('Data')
-            plt.ylabel('% Acum.')
-            # Ajustar a densidade dos ticks dependendo do agrupamento selecionado
-            if agrupamento_opcao == 'Mês':
-                plt.xticks(CurvaS_agrupado.index[::1], rotation=0)
-            elif agrupamento_opcao == 'Semana':
-                plt.xticks(CurvaS_agrupado.index[::4], rotation=0)
-            plt.legend(loc='upper left')
-            plt.grid(False)
-            plt.box(None)
-            # Adicionando rótulos de dados nos pontos
-            for i in range(len(CurvaS_agrupado.index)):
-                plt.text(CurvaS_agrupado.index[i], CurvaS_agrupado['% Acum.'][i] + 4,
-                         f"{CurvaS_agrupado['% Acum.'][i]:.1f}%", ha="center", va="bottom", color="#0068C9",
-                         weight="bold")
-            st.pyplot(plt)
+            colunas_grafico = ['Custo Total ', '%', '% Acum.'] + [coluna for coluna in CurvaS_agrupado.columns
+                                                                  if coluna.startswith('Curva')]
+            with cronometrar(tempos, 'Gráfico da Curva S', cache=True):
+                figura = etapa_figura_curva_s(CurvaS_agrupado[colunas_grafico], agrupamento_opcao)
+            st.plotly_chart(figura, use_container_width=True)
+        elif erro_curva_s is not None:
+            st.error(f"Não foi possível calcular a Curva S: {erro_curva_s}")
         else:
-            st.write("Por favor, carregue um arquivo Excel para processar os dados.")
+            st.info("Calculando a Curva S...")
 
     with col2:
-        # Formatar a coluna "% Acum." para exibir apenas duas casas decimais
-        CurvaS_agrupado['% Acum.'] = CurvaS_agrupado['% Acum.'].apply(lambda x: f"{x:.1f}%")
-        CurvaS_agrupado['Custo Total'] = CurvaS_agrupado['Custo Total'].apply(lambda x: f"R$ {x:,.0f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        CurvaS_agrupado.rename(columns={"Custo Total": "Custo"}, inplace=True)
-        CurvaS_agrupado_selected = CurvaS_agrupado[["% ", "% Acum.","Custo"]]
-        # Resetar o índice para que ele seja tratado como uma coluna normal
-        CurvaS_agrupado_selected = CurvaS_agrupado_selected.reset_index()
-        # Verificar o tipo de agrupamento e ajustar a exibição da tabela
-        if agrupamento_opcao == "Semana":
-            html_table_curva_s = CurvaS_agrupado_selected.to_html(index=False, classes=["dataframe"], justify="center", escape=False)
-            st.write(css_style + '<div class="scrollable-table">' + html_table_curva_s + '</div>', unsafe_allow_html=True)
-        else:
-            html_table_curva_s = CurvaS_agrupado_selected.to_html(index=False,classes=["dataframe"], justify="center", escape=False)
-            st.write(css_style + html_table_curva_s, unsafe_allow_html=True)
-
-    # Mostrar as tarefas críticas
-    tabela_critica, fig_gantt = caminho_critico_com_gantt(df)
-
-    valor_x=5
-
-    # Converter a coluna 'Folga' para o tipo numérico
-    df['Folga'] = pd.to_numeric(df['Folga'], errors='coerce')
-
-    # Filtrar as tarefas com folga curta
-    tarefas_folga_curta = df[(df['Folga'] > 0) & (df['Folga'] <= valor_x)]
-
-    # Convertendo as colunas de data para datetime, se não forem
-    tarefas_folga_curta['Início BL'] = pd.to_datetime(tarefas_folga_curta['Início BL'],
-                                                      format='%d.%m.%y').dt.date
-    tarefas_folga_curta['Término BL'] = pd.to_datetime(tarefas_folga_curta['Término BL'],
-                                                       format='%d.%m.%y').dt.date
-
-    # Selecionar colunas específicas para exibir
-    colunas_desejadas = ['Nome da tarefa', 'Início BL', 'Término BL',
-                         'Folga']
-    tarefas_folga_curta = tarefas_folga_curta[colunas_desejadas]
+        # Tabela da Curva S (percentuais e custo formatados só na página exibida)
+        if CurvaS_agrupado is not None:
+            tabela_curva_s = CurvaS_agrupado[['%', '% Acum.', 'Custo Total']].rename(columns={'Custo Total': 'Custo'})
+            exibir_tabela(tabela_curva_s.rename_axis('Data').reset_index(), "curva_s",
+                          {'%': formato_percentual, '% Acum.': formato_percentual, 'Custo': formato_reais})
+
+    # Mostrar as tarefas críticas (se o cálculo em segundo plano já terminou)
+    tarefas_criticas, erro_criticas = None, None
+    if futuro_criticas.done():
+        try:
+            with cronometrar(tempos, 'Tarefas críticas') as medicao:
+                tabela_critica, tarefas_criticas = futuro_criticas.result()
+                medicao['linhas'] = len(tarefas_criticas)
+        except Exception as erro:
+            erro_criticas = erro
+    else:
+        pendentes.append(futuro_criticas)
 
     # Dividir a tela em duas colunas
     col1, col2 = st.columns((1.5, 1))
@@ -519,33 +536,47 @@ if arquivo_excel is not None:
     # Exibir as tarefas críticas em uma coluna
     with col1:
         st.subheader(":blue[Tarefas Críticas:]")
-        # Converter a tabela em HTML e aplicar estilos CSS
-        html_table_critica = tabela_critica.to_html(index=False, classes=["dataframe"], justify="center")
-        st.write(css_style + html_table_critica, unsafe_allow_html=True)
+        if tarefas_criticas is not None:
+            exibir_tabela(tabela_critica, "tarefas_criticas")
+        elif erro_criticas is not None:
+            st.error(f"Não foi possível calcular as tarefas críticas: {erro_criticas}")
+        else:
+            st.info("Calculando as tarefas críticas...")
 
     # Exibir a interface do usuário e as tarefas com folga curta em outra coluna
     with col2:
         st.subheader(":blue[Tarefas com Folga Curta:]")
         # Interface do usuário para selecionar o valor de X (margem de atraso permitida)
         valor_x = st.selectbox("Selecione o valor para folga curta:", options=[1,2,3,4,5,6,7,8,9,10], index=5)
-        # Atualizar a filtragem das tarefas com folga curta com o valor de X selecionado
-        tarefas_folga_curta = df[(df['Folga'] > 0) & (df['Folga'] <= valor_x)]
+        # Filtrar as tarefas com folga curta com o valor de X selecionado
+        tarefas_folga_curta = folga_curta(df, valor_x)
 
-        # Convertendo as colunas de data para datetime, se não forem
-        tarefas_folga_curta['Início BL'] = pd.to_datetime(tarefas_folga_curta['Início BL'], format='%d.%m.%y').dt.date
-        tarefas_folga_curta['Término BL'] = pd.to_datetime(tarefas_folga_curta['Término BL'], format='%d.%m.%y').dt.date
-
-        # Selecionar colunas específicas para exibir
-        colunas_desejadas = ['Nome da tarefa', 'Início BL', 'Término BL', 'Folga']
-        tarefas_folga_curta = tarefas_folga_curta[colunas_desejadas]
-
-        # Converter a tabela em HTML e aplicar estilos CSS
-        html_table_folga_curta = tarefas_folga_curta.to_html(index=False, classes=["dataframe"], justify="center")
-        st.write(css_style + html_table_folga_curta, unsafe_allow_html=True)
+        exibir_tabela(tarefas_folga_curta, "folga_curta")
 
     st.write("")
     st.subheader(":blue[Gráfico de Gantt - Tarefas Críticas:]")
-    st.plotly_chart(fig_gantt)
+    if erro_criticas is not None:
+        st.error(f"Não foi possível calcular as tarefas críticas: {erro_criticas}")
+    elif tarefas_criticas is None:
+        st.info("Calculando as tarefas críticas...")
+    else:
+        # Muitas tarefas: visão geral por faixas de período ou as tarefas em janelas de MAX_LINHAS_GANTT linhas
+        modo_gantt, janela = "Tarefas", 0
+        if len(tarefas_criticas) > MAX_LINHAS_GANTT:
+            col1, col2, _ = st.columns((1.5, 1, 2))
+            with col1:
+                modo_gantt = st.radio("Exibição:", ["Faixas por período", "Tarefas"], horizontal=True)
+            if modo_gantt == "Tarefas":
+                n_janelas = -(-len(tarefas_criticas) // MAX_LINHAS_GANTT)
+                with col2:
+                    janela = st.number_input(f"Janela (de {n_janelas}):", min_value=1, max_value=n_janelas, value=1,
+                                             step=1) - 1
+                ultima = min((janela + 1) * MAX_LINHAS_GANTT, len(tarefas_criticas))
+                st.caption(f"Tarefas {janela * MAX_LINHAS_GANTT + 1} a {ultima} de {len(tarefas_criticas)}, "
+                           f"por data de início")
+        with cronometrar(tempos, 'Gráfico de Gantt', cache=True):
+            figura_gantt = etapa_gantt(tarefas_criticas, chave, feriados_texto, usar_cpm, modo_gantt, janela)
+        st.plotly_chart(figura_gantt, use_container_width=True)
 
     # Selecionar valores para alta e baixa duração lado a lado
     col1, col2 = st.columns(2)
@@ -554,13 +585,165 @@ if arquivo_excel is not None:
         valor_alta_duracao = st.number_input("Digite o valor para alta duração:", value=20, min_value=5, max_value=50,
                                              step=1, format="%d", key="input_inteiro_alta"
                                              )
-        calcular_high_duration(df, valor_alta_duracao)
+        indice_alta, tarefas_alta = calcular_high_duration(df, valor_alta_duracao)
     with col2:
         valor_baixa_duracao = st.number_input("Digite o valor para baixa duração:", value=5, min_value=0, max_value=10,
                                              step=1, format="%d", key="input_inteiro_baixa"
                                              )
-        calcular_low_duration(df, valor_baixa_duracao)
-else:
+        indice_baixa, tarefas_baixa = calcular_low_duration(df, valor_baixa_duracao)
+
+    st.subheader(":blue[Valor Agregado:]")
+    col1, col2 = st.columns((2.5, 1))
+    with col2:
+        # Data de status: hoje, limitada ao período do projeto
+        inicio_projeto = df['Início BL'].min().date()
+        termino_projeto = max(df['Término BL'].max(), df['Término Agendado'].max()).date()
+        data_status = st.date_input("Data de status:", value=min(max(pd.Timestamp.today().date(), inicio_projeto),
+                                                                 termino_projeto),
+                                    min_value=inicio_projeto, max_value=termino_projeto, format="DD/MM/YYYY")
+        agrupamento_valor = st.selectbox("Agrupamento do valor agregado:", AGRUPAMENTOS_VALOR_AGREGADO, index=2)
+    with cronometrar(tempos, 'Valor agregado', cache=True):
+        serie_valor, resumo_valor, figura_valor = etapa_valor_agregado(df, chave, feriados_texto, usar_cpm,
+                                                                       data_status, agrupamento_valor, perfil)
+    with col2:
+        faltando = [coluna for coluna in ('% Concluída', 'Custo Real') if coluna not in df.columns]
+        if faltando:
+            st.caption("Sem as colunas " + " e ".join(f"'{coluna}'" for coluna in faltando)
+                       + " no arquivo: VA/CR e os índices que dependem delas ficam vazios.")
+        resumo_valor = pd.Series(resumo_valor, dtype=float)
+        indices = resumo_valor.index.isin(['IDP', 'IDC'])
+        st.dataframe(pd.concat([formato_reais(resumo_valor[~indices]), formato_indice(resumo_valor[indices])])
+                     .reindex(resumo_valor.index).rename('Na data de status'), use_container_width=True)
+    with col1:
+        st.plotly_chart(figura_valor, use_container_width=True)
+    exibir_tabela(serie_valor.reset_index(), "valor_agregado",
+                  {**{coluna: formato_reais for coluna in ('VP', 'VA', 'CR', 'ENT')},
+                   'IDP': formato_indice, 'IDC': formato_indice})
+
+    st.subheader(":blue[Histograma de Recursos:]")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        medida = st.selectbox("Demanda:", MEDIDAS, format_func=lambda nome: {
+            "Equipes": "Equipes (quantidade / produtividade)", "Quantidade": "Quantidade prevista"}[nome])
+    with cronometrar(tempos, 'Carga de recursos', cache=True) as medicao:
+        medicao['linhas'] = len(df)
+        carga_diaria, resumo_carga = etapa_carga_recursos(df, chave, feriados_texto, medida)
+    if carga_diaria.empty:
+        st.write("Nenhuma tarefa com 'Quant. Prev.' e 'Produtividade' válidas.")
+    else:
+        # Um recurso por unidade da produtividade ("m²/dia" -> m²)
+        with col2:
+            recurso = st.selectbox("Recurso:", list(carga_diaria.columns))
+        with col3:
+            agrupamento_recursos = st.selectbox("Agrupamento dos recursos:", AGRUPAMENTOS_RECURSOS)
+        with col4:
+            capacidade = st.number_input("Capacidade diária (0 = sem limite):", value=0.0, min_value=0.0, step=1.0)
+        with cronometrar(tempos, 'Histograma de recursos', cache=True):
+            histograma, janelas, figura_recursos = etapa_histograma_recurso(
+                carga_diaria, chave, feriados_texto, medida, recurso, agrupamento_recursos, capacidade or None)
+        col1, col2 = st.columns((2.5, 1))
+        with col1:
+            st.plotly_chart(figura_recursos, use_container_width=True)
+        with col2:
+            exibir_tabela(resumo_carga.round(2).reset_index(), "resumo_recursos")
+        if janelas is not None:
+            st.subheader(":blue[Janelas de Superalocação:]")
+            if janelas.empty:
+                st.write("Nenhum dia acima da capacidade.")
+            else:
+                exibir_tabela(janelas.round(2).reset_index(), "janelas_superalocacao")
+        exibir_tabela(histograma.round(2).reset_index(), "histograma_recursos")
+
+    st.subheader(":blue[Riscos de Prazo e Custo (Monte Carlo):]")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        n_iteracoes = st.number_input("Iterações:", value=1000, min_value=100, max_value=50000, step=100)
+    with col2:
+        distribuicao = st.selectbox("Incerteza da duração:", DISTRIBUICOES,
+                                    format_func=lambda nome: {"Triangular": "Três pontos (triangular)",
+                                                              "Uniforme": "Percentual (uniforme)"}[nome])
+    with col3:
+        otimista = st.number_input("Otimista (-%):", value=10, min_value=0, max_value=90, step=5)
+    with col4:
+        pessimista = st.number_input("Pessimista (+%):", value=30, min_value=0, max_value=300, step=5)
+    with col5:
+        incerteza_custo = st.number_input("Incerteza do custo (±%):", value=0, min_value=0, max_value=90, step=5)
+    if st.checkbox("Simular riscos", value=False):
+        try:
+            with cronometrar(tempos, 'Simulação de riscos', cache=True):
+                resumo_riscos, criticidade, figura_termino, figura_faixas = etapa_riscos(
+                    df, chave, feriados_texto, n_iteracoes, distribuicao, otimista / 100, pessimista / 100,
+                    incerteza_custo / 100, agrupamento_opcao)
+        except CicloNaRede as erro:
+            st.error(f"{erro}. A simulação precisa de uma rede de Predecessoras sem ciclos.")
+        else:
+            st.caption(" · ".join(f"{nome}: {valor:%d/%m/%y}" for nome, valor in resumo_riscos.items()
+                                  if nome[1:].isdigit())
+                       + f" · Probabilidade de terminar até o Término BL: "
+                         f"{resumo_riscos['Probabilidade no prazo (%)']:.1f}%")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(figura_termino, use_container_width=True)
+            with col2:
+                st.plotly_chart(figura_faixas, use_container_width=True)
+            st.subheader(":blue[Índice de Criticidade:]")
+            exibir_tabela(criticidade, "criticidade", {'Criticidade (%)': formato_percentual})
+
+    st.subheader(":blue[Exportar Relatório:]")
+    # Valores numéricos e datas como tais (sem a formatação da tela); só é gerado quando pedido
+    col1, col2, col3 = st.columns((1, 1, 2))
+    with col1:
+        formato_relatorio = st.selectbox("Formato:", FORMATOS_RELATORIO, format_func=lambda formato: {
+            "xlsx": "Planilha (.xlsx)", "parquet": "Parquet (.zip)", "csv": "CSV (.zip)"}[formato])
+    with col2:
+        preparar_relatorio = st.checkbox("Preparar relatório", value=False)
+    if preparar_relatorio:
+        tabelas_relatorio = {'indicadores': tabela_indicadores_relatorio(
+            {**dict(zip(NOMES_INDICADORES, indicadores)),
+             **{f'{nome} (%)': valor for nome, valor in indicadores_de_logica.items()},
+             'Alta Duração (%)': indice_alta, 'Baixa Duração (%)': indice_baixa})}
+        if CurvaS_agrupado is not None:
+            tabelas_relatorio['curva_s'] = curva_s_numerica(CurvaS_agrupado)
+        if tarefas_criticas is not None:
+            tabelas_relatorio['tarefas_criticas'] = tabela_critica
+        tabelas_relatorio.update({'folga_curta': tarefas_folga_curta, 'alta_duracao': tarefas_alta,
+                                  'baixa_duracao': tarefas_baixa, 'valor_agregado': serie_valor.reset_index()})
+        with cronometrar(tempos, 'Relatório', cache=True) as medicao:
+            medicao['linhas'] = sum(len(tabela) for tabela in tabelas_relatorio.values())
+            conteudo_relatorio = etapa_relatorio(
+                tabelas_relatorio, tuple((nome, hash_tabela(tabela)) for nome, tabela in tabelas_relatorio.items()),
+                formato_relatorio)
+        nome_relatorio = os.path.splitext(arquivo_excel.name)[0] + (
+            " - relatório.xlsx" if formato_relatorio == "xlsx" else f" - relatório ({formato_relatorio}).zip")
+        with col3:
+            st.download_button("Baixar relatório", conteudo_relatorio, file_name=nome_relatorio,
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                               if formato_relatorio == "xlsx" else "application/zip")
+        if futuro_curva_s in pendentes or futuro_criticas in pendentes:
+            st.caption("A Curva S e as tarefas críticas entram no relatório quando o cálculo terminar.")
+
+    if versoes_excel:
+        st.subheader(":blue[Comparação de Versões:]")
+        # Versões anteriores em ordem de nome de arquivo, seguidas do arquivo principal
+        arquivos_versoes = sorted(versoes_excel, key=lambda arquivo: arquivo.name) + [arquivo_excel]
+        chaves_versoes = tuple(chave_do_upload(arquivo) for arquivo in arquivos_versoes)
+        nomes_versoes = tuple(nomes_unicos([arquivo.name for arquivo in arquivos_versoes]))
+        with cronometrar(tempos, 'Leitura das versões', cache=True):
+            versoes = [ler_arquivo_excel(arquivo, chave_versao)
+                       for arquivo, chave_versao in zip(arquivos_versoes, chaves_versoes)]
+        base_curva = st.radio("Curvas das versões por:", list(BASES_CURVA), horizontal=True)
+        with cronometrar(tempos, 'Comparação de versões', cache=True):
+            resumo_versoes, tarefas_versoes, figura_versoes = etapa_comparacao(
+                versoes, chaves_versoes, nomes_versoes, feriados_texto, agrupamento_opcao, base_curva, perfil)
+        st.plotly_chart(figura_versoes, use_container_width=True)
+        exibir_tabela(resumo_versoes, "resumo_versoes",
+                      {'Custo total': formato_reais, 'Variação de custo': formato_reais})
+        st.subheader(":blue[Tarefas por Deslocamento do Término:]")
+        exibir_tabela(tarefas_versoes.sort_values('Deslocamento do término (dias úteis)', ascending=False),
+                      "tarefas_versoes", {'Custo (primeira)': formato_reais, 'Custo (última)': formato_reais,
+                                          'Variação de custo': formato_reais})
+
+elif not pasta_carteira:
     # Mensagem inicial para o usuário
     st.write("AGUARDANDO ARQUIVO:")
 
@@ -583,6 +766,9 @@ else:
     - **Duração** 
     - **Quant. Prev.** 
     - **Produtividade** 
+    - **Id** (opcional; sem ela, as Predecessoras são lidas pela ordem das linhas)
+    - **% concluída** e **Custo real** (opcionais; usadas no valor agregado)
+    - **Perfil de custo** (opcional; Uniforme, Antecipado, Postergado, Sino ou percentuais como 10;20;40;20;10)
 
     ### Informação Adicional:
 
@@ -591,6 +777,70 @@ else:
     Verifique se todas essas colunas estão presentes e corretamente formatadas em seu arquivo XLSX.
     """)
 
+if pasta_carteira:
+    st.subheader(":blue[Carteira de Projetos:]")
+    if not os.path.isdir(pasta_carteira):
+        st.error(f"A pasta '{pasta_carteira}' não existe no servidor.")
+    else:
+        tempos.contexto['carteira'] = pasta_carteira
+        base = base_da_pasta(pasta_carteira)
+        # Só os arquivos novos ou alterados desde a última atualização são lidos, num único processo (como em
+        # etapa_riscos, sem criar processos dentro do servidor)
+        with cronometrar(tempos, 'Carteira: atualização da base'):
+            situacao = atualizar_carteira(pasta_carteira, base, processos=1)
+        for projeto, erro in situacao['erros'].items():
+            st.warning(f"{projeto}: não foi possível ler o arquivo ({erro}).")
+        st.caption(f"{len(situacao['novos'])} projeto(s) novo(s), {len(situacao['alterados'])} alterado(s), "
+                   f"{len(situacao['inalterados'])} inalterado(s) e {len(situacao['removidos'])} removido(s).")
+        if not (situacao['novos'] or situacao['alterados'] or situacao['inalterados']):
+            st.write("Nenhum arquivo .xlsx na pasta.")
+        else:
+            col1, col2 = st.columns((2.5, 1))
+            with col2:
+                agrupamento_carteira = st.selectbox("Agrupamento:", ["Mês", "Semana"], key="agrupamento_carteira")
+            with cronometrar(tempos, 'Carteira', cache=True) as medicao:
+                curva_da_carteira, indicadores_por_projeto, picos, figura_curva, figura_custos = etapa_carteira(
+                    base, versao_carteira(base), feriados_texto, agrupamento_carteira, 2.5, 2.5, 2.5)
+                medicao['linhas'] = int(indicadores_por_projeto['Tarefas'].sum())
+            with col1:
+                st.plotly_chart(figura_curva, use_container_width=True)
+            with col2:
+                tabela_curva = curva_da_carteira[['%', '% Acum.', 'Custo Total']].rename(
+                    columns={'Custo Total': 'Custo'}).rename_axis('Data').reset_index()
+                exibir_tabela(tabela_curva, "curva_carteira",
+                              {'%': formato_percentual, '% Acum.': formato_percentual, 'Custo': formato_reais})
+            st.subheader(":blue[Custo por Projeto e Período:]")
+            st.plotly_chart(figura_custos, use_container_width=True)
+            st.subheader(":blue[Picos de Custo da Carteira:]")
+            exibir_tabela(picos.reset_index(), "picos_carteira",
+                          {'Custo Total': formato_reais, 'Custo do maior projeto': formato_reais,
+                           '% do maior projeto': formato_percentual})
+            st.subheader(":blue[Indicadores por Projeto:]")
+            exibir_tabela(indicadores_por_projeto.reset_index(), "indicadores_carteira",
+                          {'Custo': formato_reais, 'Início BL': formato_data, 'Término BL': formato_data,
+                           **{coluna: formato_percentual for coluna in indicadores_por_projeto.columns
+                              if coluna.endswith('(%)')}})
+
+if len(tempos):
+    tempos.encerrar()
+    with st.sidebar.expander("Tempos por etapa", expanded=depuracao):
+        if depuracao:
+            st.dataframe(tempos.tabela().round(1), use_container_width=True)
+            st.download_button("Métricas (Prometheus)", metricas_prometheus(), file_name="metricas.prom",
+                               mime="text/plain")
+        else:
+            st.dataframe(pd.DataFrame({'ms': tempos}).round(1))
+    if ARQUIVO_METRICAS:
+        try:
+            gravar_metricas()
+        except OSError as erro:
+            st.sidebar.caption(f"Não foi possível gravar as métricas em {ARQUIVO_METRICAS}: {erro}")
+
+# Cálculos em segundo plano ainda em andamento: esperar o primeiro terminar (ou ESPERA_S) e rodar a página de novo
+if pendentes:
+    wait(pendentes, timeout=ESPERA_S, return_when=FIRST_COMPLETED)
+    st.rerun()
+
 
 
 
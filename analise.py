@@ -0,0 +1,82 @@
+import pandas as pd
+
+from cache_disco import ler_cronograma_em_cache
+from curva_s import agrupar_curva, ajustar_s, formatar_curva_s, gerar_curvas
+from distribuicao import curva_custos, recortar_eixo
+from indicadores import indicadores_logica
+
+# Núcleo de cálculo do app, sem dependência do Streamlit (usado pelo Project.py e pelo modo em lote)
+
+COLUNAS_CRITICAS = ['Nome da tarefa', 'Início BL', 'Término BL', 'Duração', 'Quant. Prev.', 'Produtividade']
+COLUNAS_DURACAO = ['Nome da tarefa', 'Início BL', 'Término BL', 'Duração BL']
+COLUNAS_FOLGA = ['Nome da tarefa', 'Início BL', 'Término BL', 'Folga']
+
+
+#ler o arquivo e formatar (com cache em disco pelo hash do conteúdo)#
+def ler_arquivo_excel(arquivo_excel):
+    return ler_cronograma_em_cache(arquivo_excel)
+
+
+# Tabela da Curva S a partir da curva agrupada, com as curvas de referência 30/50/70. Com ajustar=True, os valores
+# de S de cada curva são os que melhor se ajustam ao % acumulado real (ficam em CurvaS_agrupado.attrs['S ajustado']).
+# gerar calcula as curvas (n períodos, famílias), para quem quiser memorizá-las (compartilhado.py).
+def curva_s_com_referencias(curva_s_agrupado, S30, S50, S70, ajustar=False, gerar=gerar_curvas):
+    familias = ((30, S30), (50, S50), (70, S70))
+    if ajustar:
+        acumulado = curva_s_agrupado['%'].cumsum()
+        familias = tuple((I, ajustar_s(acumulado, I)[0]) for I, _ in familias)
+
+    CurvaS_agrupado = formatar_curva_s(curva_s_agrupado, gerar(len(curva_s_agrupado), familias)).round(1)
+    CurvaS_agrupado.attrs['S ajustado'] = dict(familias) if ajustar else {}
+    return CurvaS_agrupado
+
+
+# Curva S agrupada com as curvas de referência 30/50/70 (ou com S ajustado à curva real); o custo de cada tarefa
+# é distribuído pelo perfil de carga (ver distribuicao.PERFIS)
+def processar_dados(df, calendario, agrupamento_opcao, S30, S50, S70, ajustar=False, perfil='Uniforme'):
+    CurvaS = recortar_eixo(curva_custos(df, calendario, 'Mês', perfil), df['Início BL'].min(), agrupamento_opcao)
+    return curva_s_com_referencias(agrupar_curva(CurvaS, agrupamento_opcao), S30, S50, S70, ajustar)
+
+
+# Tarefas críticas ordenadas por data de início
+def tarefas_criticas(df):
+    return df[df['Crítica'] == 'Sim'].sort_values(by='Início BL')
+
+
+# Função para calcular indicadores (os de lógica vêm da tabela de vínculos, ver indicadores.py)
+def calcular_indicadores(df, calendario, vinculos=None):
+    logica = indicadores_logica(df, vinculos)
+    leads_pct = logica['Latências -']
+    lags_pct = logica['Latências +']
+    relationship_types_pct = logica['Relacionamento TI']
+    logic_pct = logica['Sem Relacionamento']
+
+    # Calcular Data de Início, Data de Término e Duração
+    data_inicio = df['Início BL'].min()
+    data_termino = df['Término BL'].max()
+    duracao_total = (data_termino - data_inicio).days
+    duracao_util = int(calendario.contar(data_inicio, data_termino + pd.Timedelta(days=1)))
+
+    data_inicio = pd.to_datetime(data_inicio).strftime("%d/%m/%y")
+    data_termino = pd.to_datetime(data_termino).strftime("%d/%m/%y")
+
+
+    return leads_pct, lags_pct, relationship_types_pct, logic_pct, data_inicio, data_termino, duracao_total, duracao_util
+
+
+# Índice de alta duração (% de tarefas com Duração BL > valor) e as tarefas correspondentes
+def alta_duracao(df, valor_alta_duracao):
+    tarefas = df[df['Duração BL'] > valor_alta_duracao]
+    return (len(tarefas) / len(df)) * 100, tarefas[COLUNAS_DURACAO]
+
+
+# Índice de baixa duração (% de tarefas com Duração BL < valor) e as tarefas correspondentes
+def baixa_duracao(df, valor_baixa_duracao):
+    tarefas = df[df['Duração BL'] < valor_baixa_duracao]
+    return (len(tarefas) / len(df)) * 100, tarefas[COLUNAS_DURACAO]
+
+
+# Tarefas com folga curta (0 < Folga <= valor_x)
+def folga_curta(df, valor_x):
+    folga = pd.to_numeric(df['Folga'], errors='coerce')
+    return df[(folga > 0) & (folga <= valor_x)][COLUNAS_FOLGA]
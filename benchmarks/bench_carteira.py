@@ -0,0 +1,91 @@
+# Benchmark da carteira: Curva S combinada e indicadores por projeto agrupados sobre a base inteira x um
+# processar_dados / calcular_indicadores por projeto, e a atualização incremental da base
+# Uso: python -m benchmarks.bench_carteira
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from analise import calcular_indicadores, processar_dados
+from benchmarks.gerador import gerar_cronograma, gravar_planilha
+from calendario import Calendario
+from carteira import atualizar_carteira, curva_carteira, indicadores_carteira, ler_carteira
+from indicadores import indicadores_logica
+from leitura import normalizar_cronograma
+
+
+# Carteira em memória: n_projetos cronogramas sintéticos normalizados como na leitura, com a coluna Projeto
+def carteira_sintetica(n_projetos, n_tarefas):
+    projetos = []
+    for k in range(n_projetos):
+        df, _ = gerar_cronograma(n_tarefas, horizonte_dias=365 + 10 * (k % 60), semente=k)
+        projetos.append(normalizar_cronograma(df).assign(Projeto=f'Projeto {k:03d}'))
+    df = pd.concat(projetos, ignore_index=True)
+    return df.assign(Projeto=df['Projeto'].astype('category'))
+
+
+# Um processar_dados e um calcular_indicadores por projeto (o que o app faz com um arquivo de cada vez)
+def por_projeto(df, calendario):
+    resultados = {}
+    for projeto, tarefas in df.groupby('Projeto', observed=True):
+        resultados[projeto] = (processar_dados(tarefas, calendario, 'Mês', 2.5, 2.5, 2.5),
+                               calcular_indicadores(tarefas, calendario), indicadores_logica(tarefas))
+    return resultados
+
+
+def carteira_agrupada(df, calendario):
+    return curva_carteira(df, calendario, 'Mês'), indicadores_carteira(df, calendario)
+
+
+def medir(funcao, *args):
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - t0
+
+
+def main():
+    warnings.simplefilter('ignore', FutureWarning)
+    calendario = Calendario(pd.to_datetime(['2024-05-01', '2024-12-25', '2025-05-01']))
+
+    print(f"{'projetos':>9} {'tarefas':>9} {'por projeto s':>14} {'agrupado s':>11} {'razão':>7}")
+    for n_projetos, n_tarefas in [(50, 1_000), (200, 1_000), (200, 5_000)]:
+        df = carteira_sintetica(n_projetos, n_tarefas)
+        separados, t_separados = medir(por_projeto, df, calendario)
+        ((curva, custos), indicadores), t_agrupado = medir(carteira_agrupada, df, calendario)
+
+        # Conferência: os mesmos indicadores e o mesmo custo de cada projeto
+        for projeto, (curva_projeto, gerais, logica) in separados.items():
+            np.testing.assert_allclose(custos[projeto].sum(), curva_projeto['Custo Total'].sum(), rtol=1e-6)
+            assert indicadores.loc[projeto, 'Duração (dias úteis)'] == gerais[7]
+            for nome, valor in logica.items():
+                assert np.isclose(indicadores.loc[projeto, f'{nome} (%)'], valor), (projeto, nome)
+        np.testing.assert_allclose(curva['Custo Total'].sum(), df['Custo'].sum(), rtol=1e-6)
+        print(f'{n_projetos:>9} {len(df):>9} {t_separados:>14.2f} {t_agrupado:>11.2f} '
+              f'{t_separados / t_agrupado:>6.1f}x')
+
+    # Atualização incremental: só os arquivos alterados são lidos de novo
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta_xlsx, base = os.path.join(pasta, 'xlsx'), os.path.join(pasta, 'base')
+        os.makedirs(pasta_xlsx)
+        n_arquivos = 20
+        for k in range(n_arquivos):
+            df, feriados_texto = gerar_cronograma(500, semente=k)
+            gravar_planilha(df, feriados_texto, os.path.join(pasta_xlsx, f'Obra {k:02d}.xlsx'))
+        situacao, t_inicial = medir(atualizar_carteira, pasta_xlsx, base, 1)
+        assert len(situacao['novos']) == n_arquivos
+        situacao, t_sem_mudanca = medir(atualizar_carteira, pasta_xlsx, base, 1)
+        assert len(situacao['inalterados']) == n_arquivos
+        df, feriados_texto = gerar_cronograma(500, semente=99)
+        gravar_planilha(df, feriados_texto, os.path.join(pasta_xlsx, 'Obra 07.xlsx'))
+        situacao, t_um_alterado = medir(atualizar_carteira, pasta_xlsx, base, 1)
+        assert situacao['alterados'] == ['Obra 07']
+        _, t_leitura = medir(ler_carteira, base)
+        print(f'Base com {n_arquivos} arquivos: carga inicial {t_inicial:.2f} s | sem mudanças {t_sem_mudanca:.3f} s | '
+              f'um alterado {t_um_alterado:.2f} s | leitura da base {t_leitura:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
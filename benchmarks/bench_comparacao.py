@@ -0,0 +1,61 @@
+# Benchmark da comparação de versões: 52 exportações semanais de um cronograma de 10 mil tarefas
+# Uso: python -m benchmarks.bench_comparacao
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_distribuicao import cronograma_sintetico
+from calendario import Calendario
+from comparacao import comparar_versoes, curvas_versoes
+
+
+# Versões semanais: a cada semana algumas tarefas atrasam ou adiantam, o custo varia, a criticidade muda
+# para uma parte das tarefas, e tarefas são removidas ou incluídas
+def versoes_sinteticas(n_tarefas, n_versoes, semente=0):
+    rng = np.random.default_rng(semente)
+    df = cronograma_sintetico(n_tarefas, semente=semente)
+    df = df.assign(**{'Id': np.arange(1, n_tarefas + 1), 'Início Agendado': df['Início BL'],
+                      'Término Agendado': df['Término BL'], 'Duração': df['Duração BL'],
+                      'Crítica': np.where(rng.random(n_tarefas) < 0.2, 'Sim', 'Não')})
+    versoes = [df]
+    for _ in range(1, n_versoes):
+        anterior = versoes[-1]
+        deslocamento = pd.to_timedelta(rng.choice([0, 0, 0, 1, 2, -1], len(anterior)), unit='D')
+        troca_critica = rng.random(len(anterior)) < 0.02
+        nova = anterior.assign(**{
+            'Início Agendado': anterior['Início Agendado'] + deslocamento,
+            'Término Agendado': anterior['Término Agendado'] + deslocamento,
+            'Custo': anterior['Custo'] * rng.uniform(0.99, 1.02, len(anterior)),
+            'Crítica': np.where(troca_critica, np.where(anterior['Crítica'] == 'Sim', 'Não', 'Sim'),
+                                anterior['Crítica']),
+        })
+        incluidas = nova.sample(10, random_state=rng.integers(1 << 31)).assign(
+            Id=lambda tarefas: np.arange(tarefas['Id'].max() + 1, tarefas['Id'].max() + 11) + len(versoes) * 1000)
+        nova = pd.concat([nova.sample(frac=0.998, random_state=rng.integers(1 << 31)), incluidas])
+        versoes.append(nova.sample(frac=1, random_state=rng.integers(1 << 31)).reset_index(drop=True))
+    return versoes
+
+
+def medir(funcao, *args):
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - t0
+
+
+def main():
+    calendario = Calendario(pd.to_datetime(['2024-05-01', '2024-12-25', '2025-05-01']))
+    print(f"{'tarefas':>8} {'versões':>8} {'comparar s':>11} {'curvas BL s':>12} {'curvas agendado s':>18}")
+    for n_tarefas, n_versoes in [(2_000, 12), (10_000, 52), (50_000, 52)]:
+        versoes = versoes_sinteticas(n_tarefas, n_versoes)
+        nomes = [f'Semana {k + 1}' for k in range(n_versoes)]
+        (resumo, tarefas), t_comparar = medir(comparar_versoes, versoes, nomes, calendario)
+        _, t_curvas = medir(curvas_versoes, versoes, nomes, calendario, 'Mês')
+        _, t_agendado = medir(curvas_versoes, versoes, nomes, calendario, 'Semana', 'Agendado')
+        print(f'{n_tarefas:>8} {n_versoes:>8} {t_comparar:>11.2f} {t_curvas:>12.2f} {t_agendado:>18.2f}')
+    print()
+    print(resumo.iloc[-3:, [0, 1, 3, 6, 7, 8, 9, 10, 11]].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
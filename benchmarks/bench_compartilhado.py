@@ -0,0 +1,76 @@
+# Benchmark dos cálculos compartilhados: N sessões abrindo ao mesmo tempo o mesmo cronograma sintético pedem a
+# Curva S e as tarefas críticas. Sem compartilhamento, cada sessão calcula tudo (analise.processar_dados); com os
+# CalculosCompartilhados, o cálculo é feito uma vez e as outras sessões esperam o mesmo Future.
+# Uso: python -m benchmarks.bench_compartilhado [--sessoes 10] [--tarefas 10000]
+import argparse
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from analise import processar_dados, tarefas_criticas
+from benchmarks.gerador import planilha_sintetica
+from cache_disco import chave_arquivo
+from calendario import calendario_de_texto
+from compartilhado import CalculosCompartilhados, curva_s_compartilhada
+from leitura import ler_cronograma
+
+
+def sessao_isolada(df, feriados_texto):
+    calendario, _ = calendario_de_texto(feriados_texto)
+    return processar_dados(df, calendario, 'Mês', 2.5, 2.5, 2.5), tarefas_criticas(df)
+
+
+def sessao_compartilhada(calculos, df, chave, feriados_texto):
+    curva = calculos.enviar(('Curva S', chave, feriados_texto, 'Mês', 2.5, 2.5, 2.5, False, 'Uniforme'),
+                            curva_s_compartilhada, calculos, df, chave, feriados_texto, 'Mês', 2.5, 2.5, 2.5)
+    criticas = calculos.enviar(('Tarefas críticas', chave, feriados_texto, False), tarefas_criticas, df)
+    return curva.result(), criticas.result()
+
+
+# Todas as sessões ao mesmo tempo, cada uma na sua thread (como as threads de script do servidor)
+def sessoes_simultaneas(n_sessoes, funcao, *args):
+    with ThreadPoolExecutor(n_sessoes) as sessoes:
+        inicio = time.perf_counter()
+        resultados = list(sessoes.map(lambda _: funcao(*args), range(n_sessoes)))
+    return resultados, time.perf_counter() - inicio
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Mede N sessões simultâneas com e sem cálculos compartilhados.')
+    parser.add_argument('--sessoes', type=int, default=10)
+    parser.add_argument('--tarefas', type=int, default=10_000)
+    args = parser.parse_args(argumentos)
+    warnings.simplefilter('ignore', FutureWarning)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho, feriados_texto = planilha_sintetica(pasta, args.tarefas)
+        df = ler_cronograma(caminho)
+        with open(caminho, 'rb') as f:
+            chave = chave_arquivo(f.read())
+
+    isoladas, t_isoladas = sessoes_simultaneas(args.sessoes, sessao_isolada, df, feriados_texto)
+    calculos = CalculosCompartilhados()
+    compartilhadas, t_compartilhadas = sessoes_simultaneas(args.sessoes, sessao_compartilhada, calculos, df, chave,
+                                                           feriados_texto)
+    situacao = calculos.situacao()
+    calculos.encerrar()
+
+    # Conferência: o mesmo resultado em todas as sessões, igual ao cálculo sem compartilhamento
+    curva, criticas = isoladas[0]
+    for curva_sessao, criticas_sessao in compartilhadas:
+        pd.testing.assert_frame_equal(curva_sessao, curva)
+        pd.testing.assert_frame_equal(criticas_sessao, criticas)
+    # Cada chave (os dois pedidos e as etapas internas da Curva S) calculada uma vez só
+    assert situacao['calculos'] == situacao['guardados'], situacao
+    assert situacao['compartilhados'] == 2 * (args.sessoes - 1), situacao
+
+    print(f'{args.sessoes} sessões, {len(df)} tarefas: isoladas {t_isoladas:.2f} s | '
+          f'compartilhadas {t_compartilhadas:.2f} s ({t_isoladas / t_compartilhadas:.1f}x) | '
+          f"cálculos {situacao['calculos']}, pedidos atendidos por um cálculo existente {situacao['compartilhados']}")
+
+
+if __name__ == '__main__':
+    main()
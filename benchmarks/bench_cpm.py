@@ -0,0 +1,71 @@
+# Benchmark do caminho crítico (CPM) calculado a partir das Predecessoras
+# Uso: python -m benchmarks.bench_cpm
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.gerador import gerar_cronograma
+from calendario import Calendario, calendario_de_texto
+from cpm import Rede, calcular_cpm, passagens
+from leitura import normalizar_cronograma
+from vinculos import tabela_vinculos
+
+
+# Rede sintética: cada tarefa tem até 3 predecessoras entre as 50 anteriores, com tipos e latências variados
+def rede_sintetica(n_tarefas, semente=0):
+    rng = np.random.default_rng(semente)
+    tipos = rng.choice(['', 'II', 'TT', 'IT'], size=(n_tarefas, 3), p=[0.85, 0.08, 0.05, 0.02])
+    latencias = rng.choice(['', '+2 ', '-1 ', '+50%'], size=(n_tarefas, 3), p=[0.8, 0.1, 0.05, 0.05])
+    predecessoras = []
+    for tarefa in range(1, n_tarefas + 1):
+        quantidade = min(tarefa - 1, rng.integers(1, 4))
+        ids = rng.choice(np.arange(max(1, tarefa - 50), tarefa), size=quantidade, replace=False) if quantidade else []
+        predecessoras.append(';'.join(f'{i}{tipos[tarefa - 1, k]}{latencias[tarefa - 1, k]}' for k, i in enumerate(ids)))
+    return pd.DataFrame({
+        'Id': np.arange(1, n_tarefas + 1),
+        'Nome da tarefa': [f'Tarefa {i}' for i in range(1, n_tarefas + 1)],
+        'Duração': rng.integers(0, 30, n_tarefas),
+        'Início Agendado': pd.Timestamp('2024-01-08'),
+        'Predecessoras': predecessoras,
+    })
+
+
+# Conferência: as datas do cronograma gerado atendem às suas Predecessoras (nenhuma tarefa termina antes do que
+# a passagem de ida do CPM permite), na linha de base e nas datas agendadas
+def conferir_gerador(n_tarefas=20_000):
+    bruto, feriados_texto = gerar_cronograma(n_tarefas)
+    df = normalizar_cronograma(bruto)
+    calendario, _ = calendario_de_texto(feriados_texto)
+    vinculos = tabela_vinculos(df)
+    assert len(vinculos) > len(df)
+    for duracao, inicio, termino in [('Duração BL', 'Início BL', 'Término BL'),
+                                     ('Duração', 'Início Agendado', 'Término Agendado')]:
+        cedo = calcular_cpm(df, calendario, coluna_duracao=duracao, coluna_inicio=inicio, vinculos=vinculos)
+        assert (cedo['Início Cedo'] <= df[inicio].dt.normalize()).all(), inicio
+        assert (cedo['Término Cedo'] <= df[termino].dt.normalize()).all(), termino
+
+
+def medir(funcao, *args):
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - t0
+
+
+def main():
+    conferir_gerador()
+    calendario = Calendario(pd.to_datetime(['2024-05-01', '2024-12-25', '2025-05-01']))
+    print(f"{'tarefas':>8} {'vínculos':>9} {'leitura s':>10} {'rede s':>8} {'passagens s':>12} {'total s':>8} {'críticas':>9}")
+    for n in [1_000, 10_000, 50_000]:
+        df = rede_sintetica(n)
+        duracao = df['Duração'].to_numpy(dtype=float)
+        vinculos, t_vinculos = medir(tabela_vinculos, df)
+        rede, t_rede = medir(Rede.de_tarefas, df, duracao, vinculos)
+        _, t_passagens = medir(passagens, rede, duracao)
+        resultado, t_total = medir(calcular_cpm, df, calendario)
+        print(f"{n:>8} {len(vinculos):>9} {t_vinculos:>10.3f} {t_rede:>8.3f} {t_passagens:>12.3f} {t_total:>8.3f} "
+              f"{int(resultado['Crítica CPM'].sum()):>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# Benchmark das curvas de referência da Curva S (10 anos semanais, dezenas de famílias I/S)
+# Uso: python -m benchmarks.bench_curva_s
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from curva_s import ajustar_s, curva_referencia, gerar_curvas
+
+
+# Cálculo original (apply por elemento), mantido só para comparação
+def curvas_legado(N, familias):
+    curvas = pd.DataFrame({'n': range(0, N)})
+    for I, S in familias:
+        curvas[f'Curva{I:g}'] = curvas['n'].apply(lambda n: (1 - ((1 - ((n / (N-1)) ** (math.log10(I)))) ** S)) * 100)
+    return curvas
+
+
+def medir(funcao, *args, repeticoes=5):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - t0)
+    return resultado, min(tempos) * 1000
+
+
+def main():
+    N = 52 * 10
+    familias = [(I, S) for I in range(10, 100, 5) for S in (1.5, 2.5)][:36]
+    unicas = [(I, S) for I, S in familias if S == 2.5]
+
+    legado, t_legado = medir(curvas_legado, N, unicas)
+    curva_referencia.cache_clear()
+    novo, t_frio = medir(gerar_curvas, N, unicas, repeticoes=1)
+    _, t_quente = medir(gerar_curvas, N, unicas)
+    np.testing.assert_allclose(legado.drop(columns='n').to_numpy(), novo.drop(columns='n').to_numpy())
+    print(f'{len(unicas)} famílias x {N} semanas: legado {t_legado:.1f} ms | NumPy {t_frio:.2f} ms | memorizado {t_quente:.2f} ms')
+
+    curva_referencia.cache_clear()
+    _, t_todas = medir(gerar_curvas, N, familias, repeticoes=1)
+    print(f'{len(familias)} famílias x {N} semanas: {t_todas:.2f} ms')
+
+    real = curva_referencia(N, 2.2, 50) + np.random.default_rng(0).normal(0, 0.5, N)
+    (S, erro), t_ajuste = medir(ajustar_s, real, 50)
+    print(f'Ajuste de S (I=50, real S=2.2): S={S:.2f}, erro RMS={erro:.2f} em {t_ajuste:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
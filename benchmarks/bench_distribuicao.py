@@ -0,0 +1,117 @@
+# Benchmark da distribuição de custos da Curva S
+# Uso: python -m benchmarks.bench_distribuicao
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from calendario import Calendario
+from distribuicao import PERFIS, CargaCustos, curva_custos, distribuir_custos, eixo_dias_uteis
+
+
+# Cronograma sintético com as colunas usadas pela Curva S
+def cronograma_sintetico(n_tarefas, anos=3, semente=0):
+    rng = np.random.default_rng(semente)
+    inicio_projeto = pd.Timestamp('2024-01-01')
+    dias_projeto = 365 * anos
+    inicio = inicio_projeto + pd.to_timedelta(rng.integers(0, dias_projeto - 60, n_tarefas), unit='D')
+    duracao = rng.integers(1, 60, n_tarefas)
+    termino = inicio + pd.to_timedelta(duracao, unit='D')
+    custo = rng.uniform(1_000, 100_000, n_tarefas).round(2)
+    duracao_bl = np.maximum(np.busday_count(inicio.values.astype('datetime64[D]'),
+                                            termino.values.astype('datetime64[D]')), 1)
+    df = pd.DataFrame({
+        'Nome da tarefa': [f'Tarefa {i}' for i in range(n_tarefas)],
+        'Início BL': inicio,
+        'Término BL': termino,
+        'Duração BL': duracao_bl,
+        'Custo': custo,
+    })
+    df['Custo Diário'] = df['Custo'] / df['Duração BL']
+    return df
+
+
+# Cálculo original de processar_dados (laço por tarefa e por dia), mantido só para comparação
+def curva_custos_legado(df, feriados, agrupamento_opcao):
+    warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+    datas_uteis = pd.date_range(start=df['Início BL'].min(), end=df['Término BL'].max(), freq='B')
+    if agrupamento_opcao == 'Mês':
+        datas_uteis = pd.date_range(start=df['Início BL'].min() - pd.DateOffset(months=1),
+                                    end=df['Término BL'].max(), freq='B')
+    elif agrupamento_opcao == 'Semana':
+        datas_uteis = pd.date_range(start=df['Início BL'].min() - pd.DateOffset(weeks=1),
+                                    end=df['Término BL'].max(), freq='B')
+    DataS = pd.DataFrame(index=datas_uteis)
+    for index, row in df.iterrows():
+        tarefa = row['Nome da tarefa'].strip()
+        if tarefa not in DataS.columns:
+            DataS[tarefa] = 0.0
+        for data in pd.date_range(start=row['Início BL'], end=row['Término BL'], freq='B'):
+            if data not in feriados:
+                DataS.loc[data, tarefa] += row['Custo Diário']
+        CurvaS = DataS.sum(axis=1).reset_index()
+        CurvaS.columns = ['Data', 'Custo Total']
+        CurvaS.set_index('Data', inplace=True)
+        CurvaS['Custo Total'] = CurvaS['Custo Total'].replace([np.inf, -np.inf], 0)
+        custo_total = CurvaS['Custo Total'].sum()
+        CurvaS['%'] = round((CurvaS['Custo Total'] / custo_total) * 100, 2)
+    return CurvaS
+
+
+def medir(funcao, *args, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao(*args)
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos)
+
+
+def main():
+    feriados = list(pd.to_datetime(['2024-04-21', '2024-05-01', '2024-09-07', '2025-11-15', '2026-12-25']))
+
+    calendario = Calendario(feriados)
+
+    # O eixo novo não tem os feriados; no original eles aparecem com custo zero. O original espalha o
+    # Custo Diário (Custo / Duração BL), como a MatrizCustos.
+    print('Conferência com o cálculo original')
+    df = cronograma_sintetico(200)
+    for agrupamento in ['Mês', 'Semana']:
+        legado = curva_custos_legado(df, feriados, agrupamento)
+        datas_uteis = eixo_dias_uteis(df['Início BL'].min(), df['Término BL'].max(), agrupamento, calendario)
+        novo = distribuir_custos(df, datas_uteis, calendario).reindex(legado.index, fill_value=0.0)
+        np.testing.assert_allclose(novo.to_numpy(), legado['Custo Total'].to_numpy(), rtol=1e-9)
+        print(f'  {agrupamento}: OK ({len(novo)} dias)')
+
+    # Com perfis de carga, cada tarefa recebe exatamente o seu Custo, qualquer que seja a Duração BL
+    print('\nConferência dos perfis (custo de cada tarefa conservado)')
+    datas_uteis = eixo_dias_uteis(df['Início BL'].min(), df['Término BL'].max(), 'Mês', calendario)
+    for perfil in list(PERFIS) + ['10;20;40;20;10']:
+        carga = CargaCustos.de_tarefas(df, datas_uteis, calendario, perfil)
+        assert carga.conferir().empty
+        por_tarefa = [CargaCustos.de_tarefas(df.iloc[[i]], datas_uteis, calendario, perfil).total_diario().sum()
+                      for i in range(len(df))]
+        np.testing.assert_allclose(por_tarefa, df['Custo'], rtol=1e-9)
+        np.testing.assert_allclose(carga.total_diario().sum(), df['Custo'].sum(), rtol=1e-9)
+        print(f'  {perfil}: OK')
+
+    print('\nLegado (laço por tarefa/dia)')
+    for n in [100, 200, 400]:
+        print(f'  {n:>6} tarefas: {medir(curva_custos_legado, cronograma_sintetico(n), feriados, "Mês", repeticoes=1):8.3f} s')
+
+    print('\nVetorizado')
+    for n in [1_000, 5_000, 10_000, 50_000]:
+        t = medir(curva_custos, cronograma_sintetico(n), calendario, 'Mês')
+        print(f'  {n:>6} tarefas: {t:8.4f} s  ({t / n * 1e6:6.2f} µs/tarefa)')
+
+    print('\nPerfis de carga (50.000 tarefas, relativo ao Uniforme)')
+    df = cronograma_sintetico(50_000)
+    uniforme = medir(curva_custos, df, calendario, 'Mês', 'Uniforme', repeticoes=7)
+    for perfil in list(PERFIS) + ['10;20;40;20;10']:
+        t = medir(curva_custos, df, calendario, 'Mês', perfil, repeticoes=7)
+        print(f'  {perfil:>16}: {t:8.4f} s  ({t / uniforme:5.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
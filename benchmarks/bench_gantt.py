@@ -0,0 +1,58 @@
+# Benchmark do Gantt das tarefas críticas: px.timeline com todas as tarefas x faixas de período / janela
+# Uso: python -m benchmarks.bench_gantt
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from graficos import MAX_LINHAS_GANTT, faixas_por_periodo, figura_gantt_faixas, figura_gantt_tarefas
+
+
+# Tarefas críticas sintéticas, no formato de analise.tarefas_criticas (ordenadas por início)
+def tarefas_criticas_sinteticas(n_tarefas, anos=3, semente=0):
+    rng = np.random.default_rng(semente)
+    inicio = pd.Timestamp('2024-01-08') + pd.to_timedelta(np.sort(rng.integers(0, 365 * anos, n_tarefas)), unit='D')
+    duracao = rng.integers(1, 40, n_tarefas)
+    return pd.DataFrame({
+        'Nome da tarefa': [f'Tarefa {i}' for i in range(1, n_tarefas + 1)],
+        'Início BL': inicio,
+        'Término BL': inicio + pd.to_timedelta(duracao, unit='D'),
+        'Duração': duracao,
+    })
+
+
+# Gantt original: uma barra por tarefa crítica
+def gantt_legado(tarefas):
+    fig = px.timeline(tarefas, x_start='Início BL', x_end='Término BL', y='Nome da tarefa',
+                      color_discrete_sequence=['#0068C9'])
+    fig.update_yaxes(categoryorder='array', categoryarray=tarefas['Nome da tarefa'].tolist()[::-1])
+    return fig.to_json()
+
+
+def gantt_faixas(tarefas):
+    return figura_gantt_faixas(faixas_por_periodo(tarefas)).to_json()
+
+
+def gantt_janela(tarefas):
+    return figura_gantt_tarefas(tarefas.iloc[:MAX_LINHAS_GANTT]).to_json()
+
+
+def medir(funcao, *args):
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    return (time.perf_counter() - t0) * 1000, len(resultado) / 1024
+
+
+def main():
+    gantt_legado(tarefas_criticas_sinteticas(10))  # aquecimento
+    print(f"{'tarefas':>8} {'legado ms':>10} {'legado KiB':>11} {'faixas ms':>10} {'faixas KiB':>11} "
+          f"{'janela ms':>10} {'janela KiB':>11}")
+    for n in [500, 5_000, 20_000, 50_000]:
+        tarefas = tarefas_criticas_sinteticas(n)
+        resultados = [medir(funcao, tarefas) for funcao in (gantt_legado, gantt_faixas, gantt_janela)]
+        print(f'{n:>8} ' + ' '.join(f'{ms:>10.0f} {kib:>11.1f}' for ms, kib in resultados))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Benchmark do gráfico da Curva S semanal: Matplotlib original (PNG) x figura Plotly amostrada
+# Uso: python -m benchmarks.bench_grafico_curva_s
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from curva_s import formatar_curva_s, gerar_curvas
+from graficos import figura_curva_s
+
+
+# Curva S semanal sintética com N períodos, no formato devolvido por processar_dados
+def curva_semanal(N, semente=0):
+    rng = np.random.default_rng(semente)
+    custo = rng.uniform(0, 1, N) * np.sin(np.linspace(0, np.pi, N)) * 1e6
+    datas = pd.date_range('2024-01-08', periods=N, freq='W-MON').strftime('%d/%m/%y')
+    curva = pd.DataFrame({'Custo Total': custo, '%': custo / custo.sum() * 100}, index=datas)
+    return formatar_curva_s(curva, gerar_curvas(N, ((30, 2.5), (50, 2.5), (70, 2.5)))).round(1)
+
+
+# Gráfico original (uma figura nova e um plt.text por ponto), renderizado em PNG como o st.pyplot
+def grafico_legado(CurvaS_agrupado):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    plt.plot(CurvaS_agrupado.index, CurvaS_agrupado['% Acum.'], marker='o', markerfacecolor="#0068C9", label='% Acum.')
+    plt.plot(CurvaS_agrupado.index, CurvaS_agrupado['Curva30'], linestyle=":", color='lightpink', label='S30')
+    plt.plot(CurvaS_agrupado.index, CurvaS_agrupado['Curva50'], linestyle=":", color='lightgreen', label='S50')
+    plt.plot(CurvaS_agrupado.index, CurvaS_agrupado['Curva70'], linestyle=":", color='Lightgray', label='S70')
+    plt.xticks(CurvaS_agrupado.index[::4], rotation=0)
+    for i in range(len(CurvaS_agrupado.index)):
+        plt.text(CurvaS_agrupado.index[i], CurvaS_agrupado['% Acum.'].iloc[i] + 4,
+                 f"{CurvaS_agrupado['% Acum.'].iloc[i]:.1f}%", ha="center", va="bottom", color="#0068C9",
+                 weight="bold")
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png')
+    plt.close()
+    return buffer.getvalue()
+
+
+def grafico_novo(CurvaS_agrupado):
+    return figura_curva_s(CurvaS_agrupado, 'Semana').to_json()
+
+
+def medir(funcao, *args):
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    try:
+        import matplotlib  # noqa: F401
+        com_legado = True
+    except ImportError:
+        com_legado = False
+        print('Matplotlib não instalado: só a figura Plotly é medida')
+
+    grafico_novo(curva_semanal(10))  # aquecimento (importação do Plotly)
+    print(f"{'semanas':>8} {'legado ms':>10} {'PNG KiB':>8} {'Plotly ms':>10} {'JSON KiB':>9}")
+    for anos in [2, 5, 10, 20, 40]:
+        curva = curva_semanal(52 * anos)
+        t_legado, tamanho_legado = float('nan'), float('nan')
+        if com_legado:
+            png, t_legado = medir(grafico_legado, curva)
+            tamanho_legado = len(png) / 1024
+        spec, t_novo = medir(grafico_novo, curva)
+        print(f'{len(curva):>8} {t_legado:>10.0f} {tamanho_legado:>8.0f} {t_novo:>10.1f} {len(spec) / 1024:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Benchmark dos indicadores de lógica: apply por tarefa (original) x tabela de vínculos + operações vetoriais
+# Uso: python -m benchmarks.bench_indicadores
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicadores import indicadores_logica
+from vinculos import id_repetido, tabela_vinculos
+
+
+# Cronograma sintético com até vinculos_por_tarefa predecessoras por tarefa, tipos e latências variados
+def cronograma_vinculos(n_tarefas, vinculos_por_tarefa=4, semente=0):
+    rng = np.random.default_rng(semente)
+    tipos = rng.choice(['', 'II', 'TT', 'IT'], size=(n_tarefas, vinculos_por_tarefa), p=[0.85, 0.08, 0.05, 0.02])
+    latencias = rng.choice(['', '+2 ', '-1 ', '+50%'], size=(n_tarefas, vinculos_por_tarefa),
+                           p=[0.85, 0.08, 0.04, 0.03])
+    ids = rng.integers(-60, 0, size=(n_tarefas, vinculos_por_tarefa)) + np.arange(1, n_tarefas + 1)[:, np.newaxis]
+    predecessoras = [';'.join(f'{i}{t}{l}' for i, t, l in zip(ids[k], tipos[k], latencias[k]) if i > 0)
+                     for k in range(n_tarefas)]
+    return pd.DataFrame({
+        'Id': np.arange(1, n_tarefas + 1),
+        'Predecessoras': predecessoras,
+        'Sucessoras': '',
+        'Folga': rng.integers(-5, 60, n_tarefas).astype(np.float32),
+    })
+
+
+# Indicadores originais (quatro passagens de apply sobre o texto das Predecessoras)
+def indicadores_legado(df):
+    quant_tarefas = len(df)
+    leads = df['Predecessoras'].apply(lambda x: '+' in x).sum()
+    lags = df['Predecessoras'].apply(lambda x: '-' in x).sum()
+    relationship_types = df['Predecessoras'].apply(lambda x: all(s not in x for s in ['II', 'IT', 'TT'])).sum()
+    logic = len(df[(df['Predecessoras'] == '') & (df['Sucessoras'] == '')])
+    return [valor / quant_tarefas * 100 for valor in (leads, lags, relationship_types, logic)]
+
+
+# Conferência: Ids repetidos não impedem a tabela de vínculos (sozinha ou numa carteira) e ligam os vínculos à
+# primeira tarefa com o Id
+def conferir_ids_repetidos():
+    df = pd.DataFrame({'Id': [1, 2, 2, 3], 'Predecessoras': ['', '1', '1', '2'], 'Sucessoras': '',
+                       'Folga': np.float32(0)})
+    vinculos = tabela_vinculos(df)
+    assert vinculos['origem'].tolist() == [0, 0, 1] and vinculos['destino'].tolist() == [1, 2, 3]
+    assert id_repetido(df).tolist() == [False, False, True, False]
+    indicadores_logica(df, vinculos)
+    # Dois projetos com os mesmos Ids: os vínculos ficam dentro do projeto de cada tarefa
+    carteira = pd.concat([df, df], ignore_index=True)
+    grupos = np.repeat([0, 1], len(df))
+    vinculos_carteira = tabela_vinculos(carteira, grupos)
+    assert vinculos_carteira['origem'].tolist() == [0, 0, 1, 4, 4, 5]
+    assert id_repetido(carteira, grupos).sum() == 2
+
+
+def medir(funcao, *args, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - t0)
+    return resultado, min(tempos) * 1000
+
+
+def main():
+    conferir_ids_repetidos()
+    print(f"{'tarefas':>8} {'vínculos':>9} {'legado ms':>10} {'vínculos ms':>12} {'indicadores ms':>15}")
+    for n in [5_000, 20_000, 50_000]:
+        df = cronograma_vinculos(n)
+        _, t_legado = medir(indicadores_legado, df)
+        vinculos, t_vinculos = medir(tabela_vinculos, df)
+        _, t_indicadores = medir(indicadores_logica, df, vinculos)
+        print(f'{n:>8} {len(vinculos):>9} {t_legado:>10.1f} {t_vinculos:>12.1f} {t_indicadores:>15.1f}')
+
+    indicadores = indicadores_logica(df, vinculos)
+    print('\n' + '\n'.join(f'{nome:>20}: {valor:6.2f}%' for nome, valor in indicadores.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# Benchmark da leitura da planilha: ler_arquivo_excel original x leitura.ler_cronograma
+# Uso: python -m benchmarks.bench_leitura
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from cache_disco import ler_cronograma_em_cache
+from leitura import MOTOR_EXCEL, juntar_lotes, ler_cronograma, ler_cronograma_em_lotes
+
+
+# Planilha sintética no layout exportado (com colunas extras que o app não usa)
+def planilha_sintetica(n_tarefas, caminho, semente=0):
+    rng = np.random.default_rng(semente)
+    inicio = pd.Timestamp('2024-01-08 08:00') + pd.to_timedelta(rng.integers(0, 700, n_tarefas), unit='D')
+    duracao = rng.integers(1, 40, n_tarefas)
+    termino = inicio + pd.to_timedelta(duracao, unit='D') + pd.Timedelta(hours=9)
+    predecessoras = [';'.join(str(p) for p in rng.integers(max(1, i - 20), i + 1, 2)) if i > 1 else ''
+                     for i in range(1, n_tarefas + 1)]
+    df = pd.DataFrame({
+        'Id': np.arange(1, n_tarefas + 1),
+        'Resumo': rng.choice(['Não', 'Sim'], n_tarefas, p=[0.9, 0.1]),
+        'Nome da tarefa': [f'Tarefa {i}' for i in range(1, n_tarefas + 1)],
+        'Duração': [f'{d} dias' for d in duracao],
+        'Início Agendado': inicio,
+        'Término Agendado': termino,
+        'Início da Linha de Base': inicio,
+        'Término da linha de base': termino,
+        'Duração da Linha de Base': [f'{d} dias' for d in duracao],
+        'Margem de atraso permitida': [f'{f} dias' for f in rng.integers(0, 15, n_tarefas)],
+        'Predecessoras': predecessoras,
+        'Sucessoras': '',
+        'Custo': rng.uniform(1_000, 100_000, n_tarefas).round(2),
+        'Crítica': rng.choice(['Sim', 'Não'], n_tarefas, p=[0.2, 0.8]),
+        'Quant. Prev.': rng.integers(1, 500, n_tarefas),
+        'Produtividade': [f'{p} m²/dia' for p in rng.integers(1, 50, n_tarefas)],
+        'Notas': 'Observação da tarefa',
+        'Recursos': 'Equipe A;Equipe B',
+        'EDT': [f'1.{i // 100}.{i % 100}' for i in range(n_tarefas)],
+    })
+    df.to_excel(caminho, sheet_name='Planilha1', index=False)
+
+
+# ler_arquivo_excel original (sem o cache do Streamlit), mantido só para comparação
+def ler_arquivo_excel_legado(arquivo_excel):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        df = pd.read_excel(arquivo_excel, sheet_name="Planilha1",
+                           parse_dates=["Início Agendado", "Término Agendado",
+                                        "Início da Linha de Base", "Término da linha de base"],
+                           date_parser=lambda x: pd.to_datetime(x, format='mixed'))
+        df.rename(columns={"Início da Linha de Base": "Início BL", "Término da linha de base": "Término BL",
+                           "Duração da Linha de Base": "Duração BL", "Margem de atraso permitida": "Folga"},
+                  inplace=True)
+        df = df.apply(
+            lambda col: col.str.replace('diasd', '') if col.dtype == 'object' and col.name != 'Produtividade' else col)
+        df = df.apply(
+            lambda col: col.str.replace('dias', '') if col.dtype == 'object' and col.name != 'Produtividade' else col)
+        df = df.apply(
+            lambda col: col.str.replace('dia', '') if col.dtype == 'object' and col.name != 'Produtividade' else col)
+        df[['Predecessoras', 'Sucessoras']] = df[['Predecessoras', 'Sucessoras']].astype(str)
+        df['Duração BL'] = df['Duração BL'].astype(str).str.replace(',', '.').str.strip()
+        df['Duração BL'] = df['Duração BL'].astype(float).astype(int)
+        df = df.query("Resumo == 'Não'")
+        df['Custo Diário'] = df['Custo'] / df['Duração BL']
+    return df
+
+
+# Conferência: com números e textos na mesma coluna ("Quant. Prev."), a leitura do arquivo, a leitura pelo cache
+# em disco e a leitura em lotes devolvem o mesmo DataFrame
+def conferir_coluna_mista(pasta):
+    caminho = os.path.join(pasta, 'cronograma_misto.xlsx')
+    planilha_sintetica(200, caminho)
+    df = pd.read_excel(caminho, sheet_name='Planilha1')
+    df['Quant. Prev.'] = df['Quant. Prev.'].astype(object).where(df.index % 3 > 0, '12 m³')
+    df.to_excel(caminho, sheet_name='Planilha1', index=False)
+
+    arquivo = ler_cronograma(caminho)
+    assert arquivo['Quant. Prev.'].map(type).eq(str).all()
+    cache = os.path.join(pasta, 'cache')
+    primeira = ler_cronograma_em_cache(caminho, cache)
+    assert len(os.listdir(cache)) == 1
+    do_cache = ler_cronograma_em_cache(caminho, cache)
+    pd.testing.assert_frame_equal(primeira, arquivo)
+    pd.testing.assert_frame_equal(do_cache, arquivo)
+    # Lotes pequenos: alguns só com números, outros com números e textos
+    em_lotes = juntar_lotes(ler_cronograma_em_lotes(caminho, 2))
+    pd.testing.assert_series_equal(em_lotes['Quant. Prev.'], arquivo['Quant. Prev.'])
+
+
+def medir(funcao, *args):
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - t0
+
+
+def main():
+    print(f'Leitor: {MOTOR_EXCEL}')
+    print(f"{'tarefas':>8} {'legado s':>9} {'novo s':>8} {'legado MiB':>11} {'novo MiB':>9}")
+    with tempfile.TemporaryDirectory() as pasta:
+        conferir_coluna_mista(pasta)
+        for n in [1_000, 5_000, 20_000]:
+            caminho = os.path.join(pasta, f'cronograma_{n}.xlsx')
+            planilha_sintetica(n, caminho)
+            legado, t_legado = medir(ler_arquivo_excel_legado, caminho)
+            novo, t_novo = medir(ler_cronograma, caminho)
+
+            # Mesmas tarefas, datas e custos diários
+            assert len(legado) == len(novo)
+            np.testing.assert_array_equal(legado['Início BL'].to_numpy(), novo['Início BL'].to_numpy())
+            np.testing.assert_allclose(legado['Custo Diário'].to_numpy(), novo['Custo Diário'].to_numpy())
+
+            memoria_legado = legado.memory_usage(deep=True).sum() / 2 ** 20
+            memoria_novo = novo.memory_usage(deep=True).sum() / 2 ** 20
+            print(f'{n:>8} {t_legado:>9.2f} {t_novo:>8.2f} {memoria_legado:>11.1f} {memoria_novo:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
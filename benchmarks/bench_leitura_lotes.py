@@ -0,0 +1,50 @@
+# Benchmark de memória da leitura: read_excel (planilha inteira) x leitura em lotes (openpyxl read_only)
+# Uso: python -m benchmarks.bench_leitura_lotes
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.bench_leitura import planilha_sintetica
+from leitura import juntar_lotes, ler_cronograma, ler_cronograma_em_lotes
+
+
+# Tempo e pico de memória alocada pelo Python durante a leitura
+def medir(funcao, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    tempo = time.perf_counter() - t0
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tempo, pico / 2 ** 20
+
+
+# Percorrer os lotes sem guardá-los (o uso típico de um consumidor que grava ou agrega lote a lote)
+def percorrer_lotes(arquivo_excel, tamanho_lote):
+    return sum(len(lote) for lote in ler_cronograma_em_lotes(arquivo_excel, tamanho_lote))
+
+
+def main():
+    tamanho_lote = 5_000
+    print(f'Lote de {tamanho_lote} linhas; "percorrer" não guarda os lotes, "juntar" monta o DataFrame inteiro')
+    print(f"{'tarefas':>8} {'inteira s':>10} {'lotes s':>8} {'inteira MiB':>12} {'juntar MiB':>11} "
+          f"{'percorrer MiB':>14}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in [5_000, 20_000, 50_000]:
+            caminho = os.path.join(pasta, f'cronograma_{n}.xlsx')
+            planilha_sintetica(n, caminho)
+            inteira, t_inteira, pico_inteira = medir(ler_cronograma, caminho, 'openpyxl')
+            lotes, t_lotes, pico_lotes = medir(
+                lambda arquivo: juntar_lotes(ler_cronograma_em_lotes(arquivo, tamanho_lote)), caminho)
+            pd.testing.assert_frame_equal(inteira, lotes)
+            linhas, _, pico_percorrer = medir(percorrer_lotes, caminho, tamanho_lote)
+            assert linhas == len(inteira)
+            print(f'{n:>8} {t_inteira:>10.2f} {t_lotes:>8.2f} {pico_inteira:>12.1f} {pico_lotes:>11.1f} '
+                  f'{pico_percorrer:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# Benchmark de memória: DataS denso (uma coluna por tarefa) x MatrizCustos compacta
+# Uso: python -m benchmarks.bench_memoria
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_distribuicao import cronograma_sintetico
+from calendario import Calendario
+from distribuicao import MatrizCustos, eixo_dias_uteis
+
+
+# Abordagem densa original: DataFrame dias x tarefas preenchido e somado por linha.
+# Preenchido por fatias numpy (o laço original seria lento demais em 10k tarefas), o que só subestima o pico.
+def total_denso(df, datas_uteis, calendario):
+    matriz = MatrizCustos.de_tarefas(df, datas_uteis, calendario)
+    DataS = pd.DataFrame(np.zeros(matriz.shape), index=datas_uteis, columns=matriz.tarefas)
+    valores = DataS.to_numpy()
+    for coluna in range(len(matriz.tarefas)):
+        valores[matriz.pos_inicio[coluna]:matriz.pos_fim[coluna], coluna] += matriz.custo_diario[coluna]
+    DataS = pd.DataFrame(valores, index=datas_uteis, columns=matriz.tarefas)
+    return DataS.sum(axis=1)
+
+
+def total_compacto(df, datas_uteis, calendario):
+    return MatrizCustos.de_tarefas(df, datas_uteis, calendario).total_diario()
+
+
+def pico_memoria(funcao, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = funcao(*args)
+    tempo = time.perf_counter() - t0
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, pico / 2 ** 20, tempo
+
+
+def main():
+    calendario = Calendario(pd.to_datetime(['2024-04-21', '2024-05-01', '2024-09-07', '2025-11-15', '2026-12-25']))
+    print(f"{'tarefas':>8} {'dias':>6} {'denso MiB':>10} {'compacto MiB':>13} {'razão':>7}")
+    for n in [1_000, 5_000, 10_000]:
+        df = cronograma_sintetico(n, anos=3)
+        datas_uteis = eixo_dias_uteis(df['Início BL'].min(), df['Término BL'].max(), 'Mês', calendario)
+        denso, pico_denso, _ = pico_memoria(total_denso, df, datas_uteis, calendario)
+        compacto, pico_compacto, _ = pico_memoria(total_compacto, df, datas_uteis, calendario)
+        np.testing.assert_allclose(denso.to_numpy(), compacto.to_numpy(), rtol=1e-9, atol=1e-6)
+        print(f'{n:>8} {len(datas_uteis):>6} {pico_denso:>10.1f} {pico_compacto:>13.2f} {pico_denso / pico_compacto:>6.0f}x')
+
+
+if __name__ == '__main__':
+    main()
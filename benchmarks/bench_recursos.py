@@ -0,0 +1,75 @@
+# Benchmark da carga de recursos: demanda diária por recurso, histograma semanal e janelas de superalocação de
+# cronogramas sintéticos com horizonte de 5 anos, conferidos com a soma tarefa a tarefa (coluna a coluna) num
+# cronograma pequeno
+# Uso: python -m benchmarks.bench_recursos [--tarefas 50000] [--anos 5]
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.gerador import gerar_cronograma
+from calendario import calendario_de_texto
+from leitura import normalizar_cronograma
+from recursos import carga_recursos, demanda_tarefas, histograma_recurso, janelas_superalocacao
+
+
+def cronograma(n_tarefas, anos, semente=0):
+    df, feriados_texto = gerar_cronograma(n_tarefas, horizonte_dias=365 * anos, semente=semente)
+    return normalizar_cronograma(df), calendario_de_texto(feriados_texto)[0]
+
+
+# Uma coluna de demanda diária por tarefa, somadas no fim (o que a agregação por intervalos evita)
+def carga_por_tarefa(df, calendario, medida):
+    dias = calendario.dias_uteis(df['Início BL'].min(), df['Término BL'].max())
+    total, recursos = demanda_tarefas(df, medida)
+    colunas = {}
+    for k, (inicio, termino) in enumerate(zip(df['Início BL'], df['Término BL'])):
+        if pd.isna(inicio) or pd.isna(termino) or not total[k]:
+            continue
+        ocupados = np.flatnonzero((dias >= inicio.normalize()) & (dias <= termino))
+        if not len(ocupados):
+            ocupados = np.flatnonzero(dias >= inicio.normalize())[:1]
+        coluna = np.zeros(len(dias))
+        coluna[ocupados] = total[k] / len(ocupados)
+        colunas[k] = coluna
+    densa = pd.DataFrame(colunas, index=dias)
+    return densa.T.groupby(recursos[densa.columns.to_numpy()]).sum().T
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Mede a carga de recursos em cronogramas sintéticos.')
+    parser.add_argument('--tarefas', type=int, default=50_000)
+    parser.add_argument('--anos', type=int, default=5)
+    args = parser.parse_args(argumentos)
+    warnings.simplefilter('ignore', FutureWarning)
+
+    # Conferência com a soma coluna a coluna
+    df, calendario = cronograma(2_000, args.anos, semente=1)
+    for medida in ('Equipes', 'Quantidade'):
+        (carga, t_intervalos), (densa, t_densa) = (medir(carga_recursos, df, calendario, medida),
+                                                   medir(carga_por_tarefa, df, calendario, medida))
+        pd.testing.assert_frame_equal(carga, densa.reindex(index=carga.index, columns=carga.columns),
+                                      check_names=False, check_freq=False, rtol=1e-9)
+    print(f'{len(df)} tarefas: por intervalos {t_intervalos:.3f} s | uma coluna por tarefa {t_densa:.2f} s')
+
+    df, calendario = cronograma(args.tarefas, args.anos)
+    carga, t_carga = medir(carga_recursos, df, calendario, 'Equipes')
+    demanda = carga.iloc[:, 0]
+    capacidade = float(demanda.quantile(0.9))
+    _, t_histograma = medir(histograma_recurso, demanda, 'Semana', capacidade)
+    janelas, t_janelas = medir(janelas_superalocacao, demanda, capacidade, 'Semana')
+    assert janelas['Dias acima'].sum() == (demanda > capacidade).sum()
+    print(f'{len(df)} tarefas x {len(carga)} dias úteis: carga {t_carga:.3f} s | histograma semanal '
+          f'{t_histograma:.3f} s | {len(janelas)} janelas de superalocação {t_janelas:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
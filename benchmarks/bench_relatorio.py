@@ -0,0 +1,68 @@
+# Benchmark da exportação do relatório: a tabela de tarefas de um cronograma sintético gravada em xlsx (escrita
+# em trechos do relatorio) e nos pacotes Parquet e CSV, com tempo, pico de memória e tamanho de cada arquivo, e o
+# xlsx do pandas com openpyxl (célula a célula) como referência. O xlsx é conferido lendo-o de volta.
+# Uso: python -m benchmarks.bench_relatorio [--tarefas 100000]
+import argparse
+import io
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+from benchmarks.gerador import gerar_cronograma
+from leitura import normalizar_cronograma
+from relatorio import FORMATOS_RELATORIO, relatorio_bytes
+
+
+# Tempo sem o tracemalloc (que deixa a escrita várias vezes mais lenta) e pico de memória numa segunda execução
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    tempo = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcao(*args)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, tempo, pico / 2 ** 20
+
+
+def xlsx_pandas(tabelas):
+    saida = io.BytesIO()
+    with pd.ExcelWriter(saida, engine='openpyxl') as escritor:
+        for nome, tabela in tabelas.items():
+            tabela.to_excel(escritor, sheet_name=nome, index=False)
+    return saida.getvalue()
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Mede a exportação do relatório em xlsx, Parquet e CSV.')
+    parser.add_argument('--tarefas', type=int, default=100_000)
+    args = parser.parse_args(argumentos)
+    warnings.simplefilter('ignore', FutureWarning)
+
+    df, _ = gerar_cronograma(args.tarefas)
+    tarefas = normalizar_cronograma(df)[['Nome da tarefa', 'Início BL', 'Término BL', 'Duração', 'Custo',
+                                        'Quant. Prev.', 'Produtividade']]
+    tabelas = {'tarefas': tarefas}
+
+    # Conferência: o xlsx lido de volta tem as mesmas datas e números
+    amostra = tarefas.head(2_000)
+    lida = pd.read_excel(io.BytesIO(relatorio_bytes({'tarefas': amostra}, 'xlsx')))
+    for coluna in ('Início BL', 'Término BL'):
+        pd.testing.assert_series_equal(lida[coluna], amostra[coluna].dt.round('s').reset_index(drop=True),
+                                       check_dtype=False)
+    pd.testing.assert_series_equal(lida['Custo'], amostra['Custo'].reset_index(drop=True), check_dtype=False)
+
+    linhas = []
+    for formato in FORMATOS_RELATORIO:
+        dados, tempo, pico = medir(relatorio_bytes, tabelas, formato)
+        linhas.append(f'{formato} {tempo:.2f} s, pico {pico:.0f} MiB, {len(dados) / 2 ** 20:.1f} MiB')
+    inicio = time.perf_counter()
+    xlsx_pandas(tabelas)
+    linhas.append(f'xlsx pandas/openpyxl {time.perf_counter() - inicio:.2f} s')
+    print(f'{len(tarefas)} tarefas x {tarefas.shape[1]} colunas: ' + ' | '.join(linhas))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Benchmark da simulação de Monte Carlo (prazo, criticidade e faixas da Curva S)
+# Uso: python -m benchmarks.bench_risco
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_cpm import rede_sintetica
+from calendario import Calendario
+from cpm import Rede, RedeEmNiveis, passagens, passagens_em_lote
+from risco import resumo_termino, simular_riscos
+
+
+# Rede sintética com as colunas de linha de base usadas pela simulação
+def cronograma_rede(n_tarefas, semente=0):
+    rng = np.random.default_rng(semente)
+    df = rede_sintetica(n_tarefas, semente)
+    df['Duração BL'] = df['Duração']
+    df['Início BL'] = df['Início Agendado']
+    df['Término BL'] = df['Início BL'] + pd.to_timedelta(df['Duração BL'], unit='D')
+    df['Custo'] = rng.uniform(1_000, 100_000, n_tarefas).round(2)
+    return df
+
+
+def main():
+    calendario = Calendario(pd.to_datetime(['2024-05-01', '2024-12-25', '2025-05-01']))
+
+    # Conferência: as passagens em lote reproduzem as passagens tarefa a tarefa em cada coluna
+    df = cronograma_rede(3_000)
+    rng = np.random.default_rng(1)
+    duracoes = df['Duração BL'].to_numpy(dtype=float)[:, np.newaxis] * rng.uniform(0.8, 1.5, (len(df), 4))
+    rede = Rede.de_tarefas(df, df['Duração BL'].to_numpy(dtype=float))
+    inicio_cedo, termino_cedo, folga = passagens_em_lote(RedeEmNiveis(rede), duracoes)
+    for k in range(duracoes.shape[1]):
+        ic, tc, it, tt = passagens(rede, duracoes[:, k])
+        np.testing.assert_allclose(inicio_cedo[:, k], ic, atol=1e-9)
+        np.testing.assert_allclose(folga[:, k], it - ic, atol=1e-9)
+
+    # Sem incerteza, toda iteração é o cronograma determinístico
+    termino, criticidade, faixas = simular_riscos(df, calendario, n_iteracoes=20, otimista=0.0, pessimista=0.0,
+                                                  processos=1)
+    assert termino.nunique() == 1
+    assert set(np.unique(criticidade['Criticidade (%)'])) <= {0.0, 100.0}
+    np.testing.assert_allclose(faixas['P10'], faixas['P90'])
+    np.testing.assert_allclose(faixas['P90'].iloc[-1], df['Custo'].sum())
+
+    processos = os.cpu_count()
+    print(f"{'tarefas':>8} {'iterações':>10} {'níveis':>7} {'processos':>10} {'s':>7} {'P50':>10} {'P80':>10}")
+    for n_tarefas, n_iteracoes in [(1_000, 2_000), (5_000, 10_000)]:
+        df = cronograma_rede(n_tarefas)
+        niveis = RedeEmNiveis(Rede.de_tarefas(df, df['Duração BL'].to_numpy(dtype=float)))
+        t0 = time.perf_counter()
+        termino, criticidade, faixas = simular_riscos(df, calendario, n_iteracoes, processos=processos)
+        segundos = time.perf_counter() - t0
+        resumo = resumo_termino(termino, df['Término BL'].max())
+        print(f"{n_tarefas:>8} {n_iteracoes:>10} {niveis.n_niveis:>7} {processos:>10} {segundos:>7.1f} "
+              f"{resumo['P50']:%d/%m/%y} {resumo['P80']:%d/%m/%y}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Benchmark da saída das tabelas: to_html da tabela inteira x página filtrada/ordenada/formatada
+# Uso: python -m benchmarks.bench_tabelas
+import time
+
+import numpy as np
+import pandas as pd
+
+from tabelas import TAMANHO_PAGINA, hash_tabela, ordenar_filtrar, pagina_tabela
+
+
+# Tabela de tarefas sintética com as colunas da tabela de tarefas críticas
+def tabela_sintetica(n_tarefas, semente=0):
+    rng = np.random.default_rng(semente)
+    inicio = pd.Timestamp('2024-01-08') + pd.to_timedelta(rng.integers(0, 1000, n_tarefas), unit='D')
+    duracao = rng.integers(1, 40, n_tarefas)
+    return pd.DataFrame({
+        'Nome da tarefa': [f'Tarefa {i}' for i in range(1, n_tarefas + 1)],
+        'Início BL': inicio,
+        'Término BL': inicio + pd.to_timedelta(duracao, unit='D'),
+        'Duração': duracao,
+        'Quant. Prev.': rng.integers(1, 500, n_tarefas),
+        'Produtividade': [f'{p} m²/dia' for p in rng.integers(1, 50, n_tarefas)],
+    })
+
+
+# Saída original: a tabela inteira em HTML (datas como date), reenviada a cada execução
+def tabela_legado(tabela):
+    tabela = tabela.assign(**{'Início BL': tabela['Início BL'].dt.date, 'Término BL': tabela['Término BL'].dt.date})
+    return tabela.to_html(index=False, classes=["dataframe"], justify="center")
+
+
+# Página ordenada por duração com filtro de texto, serializada como o st.dataframe envia (Arrow)
+def tabela_paginada(tabela):
+    recorte, _, _, _ = pagina_tabela(tabela, 3, TAMANHO_PAGINA, 'Tarefa 1', 'Duração', False)
+    return recorte.to_json(orient='split')
+
+
+def medir(funcao, *args, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - t0)
+    return resultado, min(tempos) * 1000
+
+
+# Ordenar por uma coluna que mistura números e textos (como "Quant. Prev." exportada com unidade em algumas
+# linhas): números em ordem numérica, depois os textos, vazios por último
+def conferir_coluna_mista():
+    tabela = pd.DataFrame({'Quant. Prev.': [5, '12 m³', None, 2.5, 'abc', 100]})
+    for crescente, esperado in [(True, [2.5, 5, 100, '12 m³', 'abc', None]),
+                                (False, [100, 5, 2.5, 'abc', '12 m³', None])]:
+        ordenada = tabela['Quant. Prev.'].iloc[ordenar_filtrar(tabela, '', 'Quant. Prev.', crescente)].tolist()
+        assert ordenada == esperado, ordenada
+
+
+def main():
+    conferir_coluna_mista()
+    print(f"{'linhas':>8} {'HTML ms':>8} {'HTML KiB':>9} {'página ms':>10} {'página KiB':>11} {'hash ms':>8}")
+    for n in [1_000, 10_000, 100_000]:
+        tabela = tabela_sintetica(n)
+        html, t_html = medir(tabela_legado, tabela)
+        pagina, t_pagina = medir(tabela_paginada, tabela)
+        _, t_hash = medir(hash_tabela, tabela)
+        print(f'{n:>8} {t_html:>8.0f} {len(html) / 1024:>9.0f} {t_pagina:>10.1f} {len(pagina) / 1024:>11.1f} '
+              f'{t_hash:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
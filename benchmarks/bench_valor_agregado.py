@@ -0,0 +1,72 @@
+# Benchmark do valor agregado: série completa (VP/VA/CR, IDP/IDC/ENT) por dia, semana e mês
+# Uso: python -m benchmarks.bench_valor_agregado
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_distribuicao import cronograma_sintetico
+from calendario import Calendario
+from valor_agregado import AGRUPAMENTOS, serie_valor_agregado
+
+DATA_STATUS = pd.Timestamp('2025-06-30')
+
+
+# Cronograma com datas agendadas deslocadas da linha de base, % concluída coerente com a data de status
+# e custo real com desvio aleatório
+def cronograma_com_avanco(n_tarefas, semente=0):
+    rng = np.random.default_rng(semente)
+    df = cronograma_sintetico(n_tarefas, semente=semente)
+    df['Início Agendado'] = df['Início BL'] + pd.to_timedelta(rng.integers(0, 20, n_tarefas), unit='D')
+    df['Término Agendado'] = df['Término BL'] + pd.to_timedelta(rng.integers(0, 20, n_tarefas), unit='D')
+    decorrido = (DATA_STATUS - df['Início Agendado']) / (df['Término Agendado'] - df['Início Agendado'])
+    df['% Concluída'] = decorrido.clip(0, 1).astype(np.float32)
+    df['Custo Real'] = df['Custo'] * df['% Concluída'] * rng.uniform(0.9, 1.3, n_tarefas)
+    return df
+
+
+# VA e CR na data de status somando tarefa a tarefa (conferência do cálculo em lote): o orçamento de cada
+# tarefa é o seu custo (conservado pela distribuição da Curva S)
+def valores_na_data_de_status(df):
+    va = cr = 0.0
+    for tarefa in df.to_dict('records'):
+        va += tarefa['% Concluída'] * tarefa['Custo']
+        cr += tarefa['Custo Real']
+    return va, cr
+
+
+def main():
+    calendario = Calendario(pd.to_datetime(['2024-05-01', '2024-12-25', '2025-05-01']))
+
+    # Conferência: o acumulado na data de status é a soma das tarefas
+    df = cronograma_com_avanco(2_000)
+    serie, resumo = serie_valor_agregado(df, calendario, DATA_STATUS, 'Mês')
+    va, cr = valores_na_data_de_status(df)
+    np.testing.assert_allclose([resumo['VA'], resumo['CR']], [va, cr], rtol=1e-9)
+    # VP com o perfil de carga da Curva S: o orçamento no término é a soma dos custos em qualquer perfil
+    for perfil in ('Uniforme', 'Sino', '10;20;40;20;10'):
+        serie_perfil, resumo_perfil = serie_valor_agregado(df, calendario, DATA_STATUS, 'Mês', perfil)
+        np.testing.assert_allclose([resumo_perfil['ONT'], serie_perfil['VP'].iloc[-1]], df['Custo'].sum(), rtol=1e-9)
+    # O resumo na data de status é o mesmo em qualquer agrupamento
+    for agrupamento in AGRUPAMENTOS:
+        _, resumo_agrupado = serie_valor_agregado(df, calendario, DATA_STATUS, agrupamento)
+        np.testing.assert_allclose(list(resumo_agrupado.values()), list(resumo.values()), rtol=1e-9)
+
+    print(f"{'tarefas':>8} " + ' '.join(f'{agrupamento + " ms":>10}' for agrupamento in AGRUPAMENTOS)
+          + f" {'períodos (dia)':>15}")
+    for n_tarefas in [2_000, 20_000, 100_000]:
+        df = cronograma_com_avanco(n_tarefas)
+        tempos = []
+        for agrupamento in AGRUPAMENTOS:
+            t0 = time.perf_counter()
+            serie, resumo = serie_valor_agregado(df, calendario, DATA_STATUS, agrupamento)
+            tempos.append((time.perf_counter() - t0) * 1000)
+            if agrupamento == 'Dia':
+                n_periodos = len(serie)
+        print(f'{n_tarefas:>8} ' + ' '.join(f'{ms:>10.1f}' for ms in tempos) + f' {n_periodos:>15}')
+    print()
+    print({nome: round(valor, 3) for nome, valor in resumo.items()})
+
+
+if __name__ == '__main__':
+    main()
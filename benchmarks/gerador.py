@@ -0,0 +1,229 @@
+# Gerador de cronogramas sintéticos no layout exportado (colunas em português, resumos, vínculos com tipos e
+# latências, linha de base, avanço e custo), para medir o desempenho sem depender de arquivos de clientes.
+# Uso: python -m benchmarks.gerador saida.xlsx --tarefas 10000 [--horizonte 730] [--vinculos 1.5]
+#      [--feriados 12] [--resumos 0.1] [--semente 0]
+# Grava também os feriados (um por linha, DD/MM/YYYY) em saida.feriados.txt, no formato do lote.py --feriados.
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from calendario import Calendario
+from cpm import Rede, passagens
+
+INICIO_PROJETO = pd.Timestamp('2024-01-08')
+# Mudar quando as planilhas geradas mudarem, para planilha_sintetica não reaproveitar arquivos antigos
+VERSAO_GERADOR = '2'
+
+# Tipos de vínculo e latências como aparecem na coluna Predecessoras (término-início não é escrito), e a
+# latência em dias úteis (ou, com %, em fração da duração da predecessora)
+TIPOS_VINCULO = (['', 'II', 'TT', 'IT'], [0.85, 0.08, 0.05, 0.02])
+LATENCIAS = (['', '+2 dias', '+5 dias', '-1 dia', '+50%'], [0.8, 0.08, 0.04, 0.05, 0.03])
+LATENCIAS_DIAS = np.array([0.0, 2.0, 5.0, -1.0, 0.5])
+LATENCIAS_PERCENTUAIS = np.array([False, False, False, False, True])
+
+# Predecessoras são sorteadas entre as tarefas desta janela: as que terminam por último antes do início da
+# sucessora (cronogramas reais vinculam tarefas próximas)
+JANELA_VINCULOS = 50
+
+
+# Feriados sorteados entre os dias úteis do horizonte do projeto
+def sortear_feriados(rng, n_feriados, horizonte_dias, inicio=INICIO_PROJETO):
+    dias = Calendario().dias_uteis(inicio, inicio + pd.Timedelta(days=horizonte_dias))
+    return pd.DatetimeIndex(np.sort(rng.choice(dias, size=min(n_feriados, len(dias)), replace=False)))
+
+
+# Coluna de vínculos ("12;15II+2 dias") de cada tarefa a partir dos pares (tarefa, outra tarefa)
+def _coluna_vinculos(n_linhas, linhas, ids, tipos, latencias):
+    textos = pd.Series(ids.astype(str)) + tipos + latencias
+    coluna = textos.groupby(linhas).agg(';'.join)
+    return coluna.reindex(np.arange(n_linhas), fill_value='').to_numpy()
+
+
+# Cronograma sintético com n_tarefas linhas (resumos incluídos), das quais a fração proporcao_resumo é de
+# resumos (cabeçalhos de grupo, com datas e custo das tarefas do grupo), num horizonte de horizonte_dias
+# corridos, com em média densidade_vinculos predecessoras por tarefa e n_feriados feriados.
+# Devolve o DataFrame no layout da planilha exportada e o texto dos feriados.
+def gerar_cronograma(n_tarefas, horizonte_dias=730, densidade_vinculos=1.5, n_feriados=12, proporcao_resumo=0.1,
+                     semente=0, inicio=INICIO_PROJETO):
+    rng = np.random.default_rng(semente)
+    feriados = sortear_feriados(rng, n_feriados, horizonte_dias, inicio)
+    calendario = Calendario(feriados)
+    horizonte = int(calendario.contar(inicio, inicio + pd.Timedelta(days=horizonte_dias)))
+
+    # Linhas de resumo: a primeira linha e posições sorteadas; cada resumo abre o grupo das linhas seguintes
+    n_resumos = min(int(round(n_tarefas * proporcao_resumo)), n_tarefas - 1)
+    resumo = np.zeros(n_tarefas, dtype=bool)
+    if n_resumos:
+        resumo[0] = True
+        resumo[rng.choice(np.arange(1, n_tarefas), size=n_resumos - 1, replace=False)] = True
+    grupo = np.cumsum(resumo)
+    tarefas = np.flatnonzero(~resumo)
+    m = len(tarefas)
+
+    # Durações em dias úteis (marcos com duração zero) e início avançando com a ordem das tarefas
+    duracao = np.where(rng.random(m) < 0.05, 0,
+                       np.clip(np.round(rng.lognormal(2.0, 0.8, m)), 1, max(horizonte // 4, 1))).astype(np.int64)
+    posicao = np.arange(m) / max(m - 1, 1)
+    inicio_bl = np.clip(np.round(posicao * (horizonte - duracao) + rng.normal(0, 10, m)), 0,
+                        np.maximum(horizonte - duracao, 0)).astype(np.int64)
+    termino_bl = inicio_bl + np.maximum(duracao, 1) - 1
+
+    # Vínculos: quantidade de Poisson por tarefa, predecessoras entre as da janela que terminam (em dias úteis, o
+    # fim exclusivo início + duração do CPM) até o início da sucessora. Marcos contam meio dia a mais, para que
+    # todo vínculo vá de um início menor para um maior e a rede não tenha ciclos.
+    fim = inicio_bl + duracao + 0.5 * (duracao == 0)
+    por_fim = np.argsort(fim, kind='stable')
+    anteriores = np.searchsorted(fim[por_fim], inicio_bl, side='right')
+    quantidade = np.minimum(rng.poisson(densidade_vinculos, m), anteriores)
+    sucessora = np.repeat(np.arange(m), quantidade)
+    predecessora = por_fim[anteriores[sucessora] - rng.integers(1, np.minimum(anteriores[sucessora],
+                                                                             JANELA_VINCULOS) + 1)]
+    pares = np.unique(np.column_stack([sucessora, predecessora]), axis=0)
+    sucessora, predecessora = pares[:, 0], pares[:, 1]
+    codigo_tipo = rng.choice(len(TIPOS_VINCULO[0]), size=len(pares), p=TIPOS_VINCULO[1])
+    tipos = np.asarray(TIPOS_VINCULO[0])[codigo_tipo]
+    # Com a predecessora terminando antes do início da sucessora, os quatro tipos de vínculo são atendidos; a
+    # latência sorteada fica só onde cabe na folga entre as duas (senão o vínculo vai sem latência)
+    escolha = rng.choice(len(LATENCIAS[0]), size=len(pares), p=LATENCIAS[1])
+
+    def latencia_em_dias(duracoes):
+        return np.where(LATENCIAS_PERCENTUAIS[escolha], LATENCIAS_DIAS[escolha] * duracoes[predecessora],
+                        LATENCIAS_DIAS[escolha])
+
+    cabe = latencia_em_dias(duracao) <= inicio_bl[sucessora] - (inicio_bl[predecessora] + duracao[predecessora])
+    latencias = np.where(cabe, np.asarray(LATENCIAS[0])[escolha], '')
+    ids = np.arange(1, n_tarefas + 1)
+
+    # Datas agendadas: atraso em relação à linha de base (a maior parte das tarefas no prazo) e durações maiores,
+    # adiadas pela passagem de ida do CPM até os vínculos serem atendidos (o atraso chega às sucessoras)
+    atraso = np.where(rng.random(m) < 0.7, 0, rng.integers(1, 15, m))
+    duracao_agendada = np.where(duracao > 0, duracao + np.where(rng.random(m) < 0.2, rng.integers(0, 5, m), 0), 0)
+    rede = Rede(m, predecessora, sucessora, codigo_tipo, np.where(cabe, latencia_em_dias(duracao_agendada), 0.0))
+    inicio_agendado = np.ceil(passagens(rede, duracao_agendada, inicio_bl + atraso)[0]).astype(np.int64)
+
+    def datas(deslocamentos, hora):
+        return pd.to_datetime(calendario.deslocar(inicio, deslocamentos)) + pd.Timedelta(hours=hora)
+
+    hora_termino = np.where(duracao > 0, 17, 8)
+    colunas = {
+        'Início Agendado': datas(inicio_agendado, 8),
+        'Término Agendado': datas(inicio_agendado + np.maximum(duracao_agendada, 1) - 1, 0)
+                            + pd.to_timedelta(hora_termino, unit='h'),
+        'Início da Linha de Base': datas(inicio_bl, 8),
+        'Término da linha de base': datas(termino_bl, 0) + pd.to_timedelta(hora_termino, unit='h'),
+    }
+
+    folga = np.where(rng.random(m) < 0.25, 0, rng.integers(1, 30, m))
+    custo = np.where(duracao > 0, np.round(rng.lognormal(9.5, 1.0, m) * np.sqrt(np.maximum(duracao, 1)), 2), 0.0)
+    data_status = inicio + pd.Timedelta(days=int(horizonte_dias * 0.4))
+    agendado = colunas['Término Agendado'] - colunas['Início Agendado']
+    decorrido = ((data_status - colunas['Início Agendado']) / agendado.where(agendado > pd.Timedelta(0))).to_numpy()
+    concluido = np.round(np.clip(np.nan_to_num(decorrido, nan=0.0), 0, 1) * 100).astype(np.int64)
+
+    df = pd.DataFrame({
+        'Id': ids[tarefas],
+        'Resumo': 'Não',
+        'EDT': '',
+        'Nome da tarefa': [f'Tarefa {i}' for i in ids[tarefas]],
+        'Duração': [f'{d} dias' for d in duracao_agendada],
+        **{coluna: valores for coluna, valores in colunas.items()},
+        'Duração da Linha de Base': [f'{d} dias' for d in duracao],
+        'Margem de atraso permitida': [f'{f} dias' for f in folga],
+        'Predecessoras': _coluna_vinculos(m, sucessora, ids[tarefas][predecessora], tipos, latencias),
+        'Sucessoras': _coluna_vinculos(m, predecessora, ids[tarefas][sucessora], tipos, latencias),
+        'Custo': custo,
+        'Crítica': np.where(folga == 0, 'Sim', 'Não'),
+        '% concluída': [f'{c}%' for c in concluido],
+        'Custo real': np.round(custo * concluido / 100 * rng.uniform(0.9, 1.2, m), 2),
+        'Quant. Prev.': rng.integers(1, 500, m),
+        'Produtividade': [f'{p} m²/dia' for p in rng.integers(1, 50, m)],
+        'Recursos': rng.choice(['Equipe A', 'Equipe B', 'Equipe A;Equipe B', 'Terceirizada'], m),
+        'Notas': '',
+    }, index=tarefas)
+    df['EDT'] = [f'{g}.{k}' for g, k in zip(grupo[tarefas], df.groupby(grupo[tarefas]).cumcount() + 1)]
+
+    # Resumos: datas, duração, custo e avanço do grupo de tarefas abaixo de cada um
+    if n_resumos:
+        linhas_resumo = np.flatnonzero(resumo)
+        por_grupo = df.groupby(grupo[tarefas])
+        inicio_grupo = por_grupo['Início da Linha de Base'].min().reindex(grupo[linhas_resumo])
+        termino_grupo = por_grupo['Término da linha de base'].max().reindex(grupo[linhas_resumo])
+        dias_grupo = calendario.contar(inicio_grupo.fillna(inicio).to_numpy(),
+                                       termino_grupo.fillna(inicio).to_numpy() + np.timedelta64(1, 'D'))
+        resumos = pd.DataFrame({
+            'Id': ids[linhas_resumo],
+            'Resumo': 'Sim',
+            'EDT': grupo[linhas_resumo].astype(str),
+            'Nome da tarefa': [f'Etapa {g}' for g in grupo[linhas_resumo]],
+            'Duração': [f'{d} dias' for d in dias_grupo],
+            'Início Agendado': por_grupo['Início Agendado'].min().reindex(grupo[linhas_resumo]).to_numpy(),
+            'Término Agendado': por_grupo['Término Agendado'].max().reindex(grupo[linhas_resumo]).to_numpy(),
+            'Início da Linha de Base': inicio_grupo.to_numpy(),
+            'Término da linha de base': termino_grupo.to_numpy(),
+            'Duração da Linha de Base': [f'{d} dias' for d in dias_grupo],
+            'Margem de atraso permitida': '0 dias',
+            'Predecessoras': '',
+            'Sucessoras': '',
+            'Custo': por_grupo['Custo'].sum().reindex(grupo[linhas_resumo], fill_value=0.0).to_numpy(),
+            'Crítica': 'Não',
+            '% concluída': '0%',
+            'Custo real': por_grupo['Custo real'].sum().reindex(grupo[linhas_resumo], fill_value=0.0).to_numpy(),
+            'Recursos': '',
+            'Notas': '',
+        }, index=linhas_resumo)
+        df = pd.concat([df, resumos]).sort_index()
+
+    feriados_texto = '\n'.join(feriados.strftime('%d/%m/%Y'))
+    return df.reset_index(drop=True), feriados_texto
+
+
+# Gravar o cronograma como planilha exportada (aba "Planilha1") e os feriados ao lado, em <nome>.feriados.txt
+def gravar_planilha(df, feriados_texto, caminho):
+    df.to_excel(caminho, sheet_name='Planilha1', index=False)
+    with open(os.path.splitext(caminho)[0] + '.feriados.txt', 'w', encoding='utf-8') as f:
+        f.write(feriados_texto)
+
+
+# Planilha gerada uma vez por combinação de parâmetros e reaproveitada nas execuções seguintes (gravar 100 mil
+# linhas em .xlsx leva minutos); devolve o caminho e o texto dos feriados
+def planilha_sintetica(pasta, n_tarefas, **parametros):
+    nome = '_'.join([f'cronograma_{n_tarefas}', f'gerador-{VERSAO_GERADOR}'] +
+                    [f'{chave}-{valor}' for chave, valor in sorted(parametros.items())])
+    caminho = os.path.join(pasta, nome + '.xlsx')
+    if not os.path.exists(caminho):
+        os.makedirs(pasta, exist_ok=True)
+        df, feriados_texto = gerar_cronograma(n_tarefas, **parametros)
+        temporario = os.path.join(pasta, nome + '.tmp.xlsx')
+        gravar_planilha(df, feriados_texto, temporario)
+        os.replace(os.path.splitext(temporario)[0] + '.feriados.txt', os.path.splitext(caminho)[0] + '.feriados.txt')
+        os.replace(temporario, caminho)
+    with open(os.path.splitext(caminho)[0] + '.feriados.txt', encoding='utf-8') as f:
+        return caminho, f.read()
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Gera um cronograma sintético no layout da planilha exportada.')
+    parser.add_argument('saida', help='arquivo .xlsx de saída')
+    parser.add_argument('--tarefas', type=int, default=1_000, help='linhas da planilha, resumos incluídos')
+    parser.add_argument('--horizonte', type=int, default=730, help='duração do projeto em dias corridos')
+    parser.add_argument('--vinculos', type=float, default=1.5, help='média de predecessoras por tarefa')
+    parser.add_argument('--feriados', type=int, default=12, help='quantidade de feriados no horizonte')
+    parser.add_argument('--resumos', type=float, default=0.1, help='fração das linhas que são resumos')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argumentos)
+    if args.tarefas < 1:
+        parser.error('--tarefas deve ser pelo menos 1')
+    if not 0 <= args.resumos < 1:
+        parser.error('--resumos deve estar em [0, 1)')
+
+    df, feriados_texto = gerar_cronograma(args.tarefas, args.horizonte, args.vinculos, args.feriados, args.resumos,
+                                          args.semente)
+    gravar_planilha(df, feriados_texto, args.saida)
+    print(f"{args.saida}: {len(df)} linhas ({int((df['Resumo'] == 'Sim').sum())} resumos), "
+          f"{int(df['Predecessoras'].str.count(';').add(df['Predecessoras'].ne('')).sum())} vínculos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# Suíte de benchmarks reprodutível: gera planilhas sintéticas (benchmarks/gerador.py) de 1 mil, 10 mil e 100 mil
+# linhas e mede tempo e pico de memória de cada etapa do processamento (leitura, feriados, curva de custos,
+# criar_curva_s, processar_dados, indicadores, CPM e carga de recursos). O resultado é comparado com uma
+# referência gravada localmente; etapas mais lentas ou com mais memória que a tolerância são apontadas e o código
+# de saída é 1.
+# Uso: python -m benchmarks.suite [--tamanhos 1000 10000] [--gravar-referencia] [--tolerancia 1.25]
+# As planilhas ficam em benchmarks/dados e os resultados em benchmarks/resultados (ambos fora do git).
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from analise import calcular_indicadores, processar_dados
+from benchmarks.gerador import VERSAO_GERADOR, planilha_sintetica
+from cache_disco import ler_cronograma_em_cache
+from calendario import calendario_de_texto
+from cpm import calcular_cpm
+from curva_s import criar_curva_s
+from distribuicao import curva_custos, recortar_eixo
+from instrumentacao import Medicoes, cronometrar
+from leitura import MOTOR_EXCEL, ler_cronograma
+from recursos import carga_recursos
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+PASTA_DADOS = os.path.join(PASTA, 'dados')
+PASTA_RESULTADOS = os.path.join(PASTA, 'resultados')
+TAMANHOS = [1_000, 10_000, 100_000]
+
+# Parâmetros fixos do gerador: mudar qualquer um deles invalida as referências gravadas
+PARAMETROS_GERADOR = {'horizonte_dias': 730, 'densidade_vinculos': 1.5, 'n_feriados': 12, 'proporcao_resumo': 0.1,
+                      'semente': 0}
+
+# Repetições de cada etapa (vale o menor tempo); etapas mais longas que LIMITE_REPETICAO_S rodam uma vez só
+REPETICOES = 3
+LIMITE_REPETICAO_S = 5
+
+# Diferenças abaixo destes valores são ruído, mesmo acima da tolerância
+RUIDO_MS = 10
+RUIDO_MIB = 1
+
+
+# Tempo (menor de algumas repetições, sem rastrear memória) e pico de memória (uma execução com tracemalloc,
+# que deixa o código mais lento) de uma etapa; devolve o resultado e a medição
+def medir(etapa, funcao, *args, linhas=None):
+    tempos = []
+    for _ in range(REPETICOES):
+        medicoes = Medicoes()
+        with cronometrar(medicoes, etapa):
+            resultado = funcao(*args)
+        tempos.append(medicoes[etapa])
+        if medicoes[etapa] > LIMITE_REPETICAO_S * 1000:
+            break
+    medicoes = Medicoes(memoria=True)
+    with cronometrar(medicoes, etapa) as medicao:
+        funcao(*args)
+        medicao['linhas'] = linhas
+    medicoes.encerrar()
+    return resultado, {'ms': min(tempos), 'pico_mib': medicoes.detalhes[etapa]['pico MiB'],
+                       'linhas': None if linhas is None else int(linhas)}
+
+
+def _feriados(feriados_texto):
+    calendario_de_texto.cache_clear()
+    return calendario_de_texto(feriados_texto)[0]
+
+
+def medir_tamanho(n_tarefas, pasta_dados=PASTA_DADOS):
+    caminho, feriados_texto = planilha_sintetica(pasta_dados, n_tarefas, **PARAMETROS_GERADOR)
+    etapas = {}
+    df, etapas['ler_cronograma'] = medir('ler_cronograma', ler_cronograma, caminho, linhas=n_tarefas)
+    with tempfile.TemporaryDirectory() as pasta_cache:
+        # Frio: o cache é limpo a cada repetição (leitura da planilha + gravação do Arrow); quente: só o Arrow
+        def frio():
+            for nome in os.listdir(pasta_cache):
+                os.remove(os.path.join(pasta_cache, nome))
+            return ler_cronograma_em_cache(caminho, pasta_cache)
+        _, etapas['ler_arquivo_excel (cache frio)'] = medir('ler_arquivo_excel (cache frio)', frio, linhas=len(df))
+        _, etapas['ler_arquivo_excel (cache quente)'] = medir('ler_arquivo_excel (cache quente)',
+                                                              ler_cronograma_em_cache, caminho, pasta_cache,
+                                                              linhas=len(df))
+    calendario, etapas['Feriados'] = medir('Feriados', _feriados, feriados_texto)
+    CurvaS, etapas['Curva de custos'] = medir('Curva de custos', curva_custos, df, calendario, 'Mês', linhas=len(df))
+    CurvaS = recortar_eixo(CurvaS, df['Início BL'].min(), 'Mês')
+    _, etapas['criar_curva_s'] = medir('criar_curva_s', criar_curva_s, CurvaS, 'Mês', 2.5, 2.5, 2.5,
+                                       linhas=len(CurvaS))
+    _, etapas['processar_dados'] = medir('processar_dados', processar_dados, df, calendario, 'Mês', 2.5, 2.5, 2.5,
+                                         linhas=len(df))
+    _, etapas['calcular_indicadores'] = medir('calcular_indicadores', calcular_indicadores, df, calendario,
+                                              linhas=len(df))
+    _, etapas['CPM'] = medir('CPM', calcular_cpm, df, calendario, linhas=len(df))
+    _, etapas['Carga de recursos'] = medir('Carga de recursos', carga_recursos, df, calendario, linhas=len(df))
+    return etapas
+
+
+# Versões e máquina (resultados de ambientes diferentes não são comparáveis)
+def ambiente():
+    import openpyxl
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'openpyxl': openpyxl.__version__, 'motor_excel': MOTOR_EXCEL, 'processador': platform.processor(),
+            'cpus': os.cpu_count(), 'sistema': platform.platform(),
+            'gerador': {**PARAMETROS_GERADOR, 'versao': VERSAO_GERADOR}}
+
+
+# Razões em relação à referência e se a etapa regrediu (acima da tolerância e do ruído)
+def comparar(atual, referencia, tolerancia):
+    comparacao = {}
+    for tamanho, etapas in atual.items():
+        for etapa, medicao in etapas.items():
+            anterior = referencia.get(tamanho, {}).get(etapa)
+            if not anterior:
+                continue
+            razao_ms = medicao['ms'] / anterior['ms'] if anterior['ms'] else np.nan
+            razao_mib = medicao['pico_mib'] / anterior['pico_mib'] if anterior['pico_mib'] else np.nan
+            regrediu = ((razao_ms > tolerancia and medicao['ms'] - anterior['ms'] > RUIDO_MS)
+                        or (razao_mib > tolerancia and medicao['pico_mib'] - anterior['pico_mib'] > RUIDO_MIB))
+            comparacao[tamanho, etapa] = (razao_ms, razao_mib, regrediu)
+    return comparacao
+
+
+def _gravar_json(dados, caminho):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Mede tempo e memória das etapas em cronogramas sintéticos.')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS, help='linhas das planilhas geradas')
+    parser.add_argument('--referencia', default=os.path.join(PASTA_RESULTADOS, 'referencia.json'))
+    parser.add_argument('--gravar-referencia', action='store_true', help='gravar esta execução como referência')
+    parser.add_argument('--tolerancia', type=float, default=1.25, help='razão acima da qual há regressão')
+    parser.add_argument('--dados', default=PASTA_DADOS, help='pasta das planilhas geradas')
+    args = parser.parse_args(argumentos)
+
+    referencia = {}
+    if os.path.exists(args.referencia) and not args.gravar_referencia:
+        with open(args.referencia, encoding='utf-8') as f:
+            gravada = json.load(f)
+        referencia = gravada['resultados']
+        if gravada['ambiente'] != ambiente():
+            print('Aviso: a referência foi gravada em outro ambiente; as razões podem não ser comparáveis.',
+                  file=sys.stderr)
+
+    resultados = {}
+    comparacao = {}
+    print(f"{'linhas':>8} {'etapa':<34} {'ms':>10} {'pico MiB':>9} {'x ms':>6} {'x MiB':>6}")
+    for n_tarefas in args.tamanhos:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', FutureWarning)
+            resultados[str(n_tarefas)] = medir_tamanho(n_tarefas, args.dados)
+        comparacao.update(comparar({str(n_tarefas): resultados[str(n_tarefas)]}, referencia, args.tolerancia))
+        for etapa, medicao in resultados[str(n_tarefas)].items():
+            razao_ms, razao_mib, regrediu = comparacao.get((str(n_tarefas), etapa), (np.nan, np.nan, False))
+            print(f"{n_tarefas:>8} {etapa:<34} {medicao['ms']:>10.1f} {medicao['pico_mib']:>9.1f} "
+                  f"{razao_ms:>6.2f} {razao_mib:>6.2f}{'  REGRESSÃO' if regrediu else ''}")
+
+    dados = {'ambiente': ambiente(), 'resultados': resultados}
+    _gravar_json(dados, os.path.join(PASTA_RESULTADOS, 'ultima.json'))
+    if args.gravar_referencia:
+        _gravar_json(dados, args.referencia)
+        print(f'Referência gravada em {args.referencia}')
+    elif not referencia:
+        print(f'Sem referência em {args.referencia}; grave uma com --gravar-referencia.')
+
+    regressoes = [chave for chave, (_, _, regrediu) in comparacao.items() if regrediu]
+    if regressoes:
+        print(f'{len(regressoes)} etapa(s) com regressão acima de {args.tolerancia:g}x', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import hashlib
+import io
+import os
+import tempfile
+
+import pyarrow as pa
+from pyarrow import feather
+
+from leitura import LIMITE_EM_LOTES_MB, ler_cronograma
+
+# Pasta e tamanho máximo do cache em disco (configuráveis por variável de ambiente)
+PASTA_CACHE = os.environ.get('CRONOGRAMA_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'cronograma'))
+LIMITE_CACHE_MB = int(os.environ.get('CRONOGRAMA_CACHE_MB', '1024'))
+
+# Mudar quando a normalização de leitura.py mudar, para não reaproveitar arquivos antigos
+VERSAO_CACHE = '6'
+_EXTENSAO = '.arrow'
+
+
+def _conteudo(arquivo_excel):
+    if hasattr(arquivo_excel, 'getvalue'):
+        return arquivo_excel.getvalue()
+    if hasattr(arquivo_excel, 'read'):
+        conteudo = arquivo_excel.read()
+        arquivo_excel.seek(0)
+        return conteudo
+    with open(arquivo_excel, 'rb') as f:
+        return f.read()
+
+
+# Chave do cache: hash do conteúdo do arquivo enviado (mesmo arquivo com outro nome reaproveita o cache)
+def chave_arquivo(conteudo):
+    return hashlib.blake2b(conteudo, digest_size=16, person=VERSAO_CACHE.encode()).hexdigest()
+
+
+def _caminho(chave, pasta):
+    return os.path.join(pasta, chave + _EXTENSAO)
+
+
+# DataFrame guardado para a chave, ou None; o arquivo Arrow (Feather v2 sem compressão) é lido por memory map
+def ler_do_cache(chave, pasta=PASTA_CACHE):
+    caminho = _caminho(chave, pasta)
+    try:
+        tabela = feather.read_table(caminho, memory_map=True)
+    except (OSError, pa.ArrowException):
+        return None
+    # Marcar como usado recentemente (a limpeza remove os menos usados)
+    try:
+        os.utime(caminho)
+    except OSError:
+        pass
+    return tabela.to_pandas()
+
+
+# Gravar o DataFrame normalizado (leitura.normalizar_cronograma já converte para texto as colunas de tipos
+# misturados, que o Arrow não grava)
+def gravar_no_cache(chave, df, pasta=PASTA_CACHE, limite_mb=LIMITE_CACHE_MB):
+    os.makedirs(pasta, exist_ok=True)
+    tabela = pa.Table.from_pandas(df, preserve_index=True)
+    # Gravar num arquivo temporário e renomear, para que leituras concorrentes nunca vejam um arquivo pela metade
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+    os.close(descritor)
+    try:
+        feather.write_feather(tabela, temporario, compression='uncompressed')
+        os.replace(temporario, _caminho(chave, pasta))
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    limpar_cache(pasta, limite_mb)
+
+
+# Remover os arquivos usados há mais tempo até o cache caber no limite
+def limpar_cache(pasta=PASTA_CACHE, limite_mb=LIMITE_CACHE_MB):
+    arquivos = []
+    for entrada in os.scandir(pasta):
+        if entrada.name.endswith(_EXTENSAO):
+            info = entrada.stat()
+            arquivos.append((info.st_mtime, info.st_size, entrada.path))
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    limite = limite_mb * 2 ** 20
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite:
+            break
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+
+
+# Ler o cronograma pelo cache em disco; só abre o Excel quando o conteúdo ainda não foi visto
+def ler_cronograma_em_cache(arquivo_excel, pasta=PASTA_CACHE, limite_mb=LIMITE_CACHE_MB):
+    conteudo = _conteudo(arquivo_excel)
+    chave = chave_arquivo(conteudo)
+    df = ler_do_cache(chave, pasta)
+    if df is None:
+        # Arquivos grandes são lidos em lotes, com memória limitada pelo tamanho do lote
+        df = ler_cronograma(io.BytesIO(conteudo), em_lotes=len(conteudo) > LIMITE_EM_LOTES_MB * 2 ** 20)
+        # Falha ao gravar (disco cheio, pasta sem permissão, coluna que o Arrow não converte) não impede o uso do
+        # arquivo
+        try:
+            gravar_no_cache(chave, df, pasta, limite_mb)
+        except (OSError, pa.ArrowException):
+            pass
+    return df
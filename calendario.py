@@ -0,0 +1,79 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def _dias(datas):
+    if isinstance(datas, (pd.Series, pd.Index)):
+        return datas.to_numpy(dtype='datetime64[D]')
+    return np.asarray(datas, dtype='datetime64[D]')
+
+
+# Calendário de trabalho (segunda a sexta, menos os feriados) usado pela Curva S, pelos indicadores e pelo CPM.
+# Os feriados ficam num array ordenado e as contas de dias úteis usam np.busday_* sobre um np.busdaycalendar.
+class Calendario:
+
+    def __init__(self, feriados=()):
+        self.feriados = np.unique(_dias(list(feriados)))
+        self._busdaycal = np.busdaycalendar(weekmask='1111100', holidays=self.feriados)
+
+    # O np.busdaycalendar não é serializável; reconstruir a partir dos feriados (cache do Streamlit, multiprocessing)
+    def __reduce__(self):
+        return Calendario, (self.feriados,)
+
+    def __eq__(self, outro):
+        return isinstance(outro, Calendario) and np.array_equal(self.feriados, outro.feriados)
+
+    def __hash__(self):
+        return hash(self.feriados.tobytes())
+
+    def __repr__(self):
+        return f'Calendario({len(self.feriados)} feriados)'
+
+    def eh_feriado(self, datas):
+        datas = _dias(datas)
+        if not len(self.feriados):
+            return np.zeros(datas.shape, dtype=bool)
+        pos = np.searchsorted(self.feriados, datas).clip(max=len(self.feriados) - 1)
+        return self.feriados[pos] == datas
+
+    def eh_dia_util(self, datas):
+        return np.is_busday(_dias(datas), busdaycal=self._busdaycal)
+
+    # Dias úteis em [inicio, fim)
+    def contar(self, inicio, fim):
+        return np.busday_count(_dias(inicio), _dias(fim), busdaycal=self._busdaycal)
+
+    # Deslocar datas em n dias úteis ('forward': datas que não são dias úteis avançam antes do deslocamento)
+    def deslocar(self, datas, n, ajuste='forward'):
+        return np.busday_offset(_dias(datas), n, roll=ajuste, busdaycal=self._busdaycal)
+
+    # Índice de dias úteis entre inicio e fim (inclusive), sem os feriados
+    def dias_uteis(self, inicio, fim):
+        inicio = self.deslocar(pd.Timestamp(inicio).to_datetime64(), 0, 'forward')
+        fim = _dias(pd.Timestamp(fim).to_datetime64())
+        n = max(int(self.contar(inicio, fim + np.timedelta64(1, 'D'))), 0)
+        dias = self.deslocar(inicio, np.arange(n))
+        return pd.DatetimeIndex(dias.astype('datetime64[ns]'), name='Data')
+
+
+# Ler os feriados digitados (um por linha, DD/MM/YYYY); devolve as datas válidas e os textos inválidos
+def ler_feriados(feriados_texto):
+    feriados = []
+    invalidos = []
+    for data_texto in feriados_texto.split('\n'):
+        data_texto = data_texto.strip()
+        if data_texto:
+            try:
+                feriados.append(pd.to_datetime(data_texto, format='%d/%m/%Y'))
+            except ValueError:
+                invalidos.append(data_texto)
+    return feriados, invalidos
+
+
+# Calendário construído uma única vez por texto de feriados
+@lru_cache(maxsize=32)
+def calendario_de_texto(feriados_texto):
+    feriados, invalidos = ler_feriados(feriados_texto)
+    return Calendario(feriados), tuple(invalidos)
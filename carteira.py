@@ -0,0 +1,340 @@
+# Carteira de projetos (sem Streamlit): os cronogramas de uma pasta são lidos para uma base colunar única
+# (Parquet, uma partição por projeto) e a Curva S combinada, os indicadores por projeto e os picos de custo
+# da carteira são calculados sobre a base inteira, de uma vez, agrupando pelo projeto.
+# Uso: python carteira.py PASTA_DOS_XLSX --saida resultados_carteira --formato parquet [--base PASTA_DA_BASE]
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from analise import curva_s_com_referencias
+from cache_disco import PASTA_CACHE, VERSAO_CACHE, chave_arquivo
+from calendario import calendario_de_texto
+from curva_s import agrupar_curva
+from distribuicao import PERFIS, CargaCustos, eixo_dias_uteis, recortar_eixo, tabela_perfil
+from indicadores import indicadores_logica_por_grupo
+from leitura import LIMITE_EM_LOTES_MB, ler_cronograma
+from lote import FORMATOS, _gravar
+from vinculos import id_repetido, tabela_vinculos
+
+# Esquema das tarefas na base: igual em todas as partições (colunas opcionais ausentes ficam nulas), para que
+# a base seja lida como um único conjunto de dados. Categorias são gravadas como texto e refeitas na leitura.
+ESQUEMA_TAREFAS = pa.schema([
+    ('Id', pa.int32()),
+    ('Nome da tarefa', pa.string()),
+    ('Resumo', pa.string()),
+    ('Crítica', pa.string()),
+    ('Início Agendado', pa.timestamp('ns')),
+    ('Término Agendado', pa.timestamp('ns')),
+    ('Início BL', pa.timestamp('ns')),
+    ('Término BL', pa.timestamp('ns')),
+    ('Duração', pa.int32()),
+    ('Duração BL', pa.int32()),
+    ('Folga', pa.float32()),
+    ('Predecessoras', pa.string()),
+    ('Sucessoras', pa.string()),
+    ('Custo', pa.float64()),
+    ('Custo Diário', pa.float64()),
+    ('Quant. Prev.', pa.float64()),
+    ('Produtividade', pa.string()),
+    ('% Concluída', pa.float32()),
+    ('Custo Real', pa.float64()),
+    ('Perfil de Custo', pa.string()),
+])
+_CATEGORIAS = ['Projeto', 'Resumo', 'Crítica', 'Perfil de Custo']
+_PARTICAO = ds.partitioning(pa.schema([('Projeto', pa.string())]), flavor='hive')
+_MANIFESTO = 'manifesto.json'
+_TAREFAS = 'tarefas'
+
+# Bases das carteiras, uma por pasta de arquivos (compartilhadas pelo app e pelo modo em linha de comando)
+PASTA_BASES = os.path.join(PASTA_CACHE, 'carteiras')
+
+# Picos de custo listados por padrão
+N_PICOS = 10
+
+
+# Nome do projeto: o nome do arquivo sem a extensão
+def nome_projeto(caminho):
+    return os.path.splitext(os.path.basename(caminho))[0]
+
+
+# Base padrão de uma pasta de arquivos
+def base_da_pasta(pasta):
+    return os.path.join(PASTA_BASES, hashlib.blake2b(os.path.abspath(pasta).encode(), digest_size=8).hexdigest())
+
+
+def _pasta_projeto(base, projeto):
+    return os.path.join(base, _TAREFAS, f'Projeto={quote(projeto, safe="")}')
+
+
+def _ler_manifesto(base):
+    try:
+        with open(os.path.join(base, _MANIFESTO), encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Base gravada com outra versão da leitura: tudo é lido de novo
+    return manifesto.get('projetos', {}) if manifesto.get('versao') == VERSAO_CACHE else {}
+
+
+def _gravar_atomico(base, nome, gravar):
+    descritor, temporario = tempfile.mkstemp(dir=base, suffix='.tmp')
+    os.close(descritor)
+    try:
+        gravar(temporario)
+        os.replace(temporario, os.path.join(base, nome))
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def _gravar_manifesto(base, projetos):
+    def gravar(caminho):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump({'versao': VERSAO_CACHE, 'projetos': projetos}, f, ensure_ascii=False, indent=1)
+    _gravar_atomico(base, _MANIFESTO, gravar)
+
+
+# Tarefas no esquema da base (colunas na ordem do esquema, as ausentes nulas)
+def _tabela_tarefas(df):
+    colunas = {}
+    for campo in ESQUEMA_TAREFAS:
+        if campo.name not in df.columns:
+            colunas[campo.name] = pa.nulls(len(df), campo.type)
+        elif pa.types.is_string(campo.type):
+            valores = df[campo.name].astype(object)
+            colunas[campo.name] = pa.array(valores.where(valores.notna(), None).map(str, na_action='ignore'),
+                                           pa.string())
+        elif campo.name == 'Quant. Prev.':
+            colunas[campo.name] = pa.array(pd.to_numeric(df[campo.name], errors='coerce'), pa.float64())
+        else:
+            colunas[campo.name] = pa.array(df[campo.name], campo.type, from_pandas=True)
+    return pa.table(colunas, schema=ESQUEMA_TAREFAS)
+
+
+# Ler um arquivo e gravar a partição do projeto (executado num processo do pool). O conteúdo só é lido de novo
+# se o hash mudou; devolve o hash e as tarefas gravadas (None se o conteúdo era o mesmo)
+def ingerir_arquivo(caminho, base, chave_anterior=None):
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    chave = chave_arquivo(conteudo)
+    pasta = _pasta_projeto(base, nome_projeto(caminho))
+    if chave == chave_anterior and os.path.exists(os.path.join(pasta, 'tarefas.parquet')):
+        return chave, None
+    df = ler_cronograma(caminho, em_lotes=len(conteudo) > LIMITE_EM_LOTES_MB * 2 ** 20)
+    os.makedirs(pasta, exist_ok=True)
+    tabela = _tabela_tarefas(df)
+    _gravar_atomico(pasta, 'tarefas.parquet', lambda temporario: pq.write_table(tabela, temporario))
+    return chave, len(df)
+
+
+# Atualizar a base com os arquivos .xlsx de uma pasta, de forma incremental: arquivos com o mesmo tamanho e
+# data de modificação do manifesto não são abertos, os demais só são lidos se o hash do conteúdo mudou, e os
+# projetos cujo arquivo saiu da pasta são removidos. Devolve os nomes dos projetos por situação (e os erros).
+def atualizar_carteira(pasta, base, processos=None):
+    os.makedirs(os.path.join(base, _TAREFAS), exist_ok=True)
+    projetos = _ler_manifesto(base)
+    arquivos = {}
+    for nome in sorted(os.listdir(pasta)):
+        if nome.lower().endswith('.xlsx') and not nome.startswith('~$'):
+            arquivos.setdefault(nome_projeto(nome), os.path.abspath(os.path.join(pasta, nome)))
+
+    situacao = {'novos': [], 'alterados': [], 'inalterados': [], 'removidos': [], 'erros': {}}
+    pendentes = []
+    for projeto, caminho in arquivos.items():
+        info = os.stat(caminho)
+        registro = projetos.get(projeto)
+        if (registro and registro['arquivo'] == caminho and registro['tamanho'] == info.st_size
+                and registro['modificado'] == info.st_mtime_ns
+                and os.path.exists(os.path.join(_pasta_projeto(base, projeto), 'tarefas.parquet'))):
+            situacao['inalterados'].append(projeto)
+        else:
+            pendentes.append((projeto, caminho, info))
+
+    def concluir(projeto, caminho, info, chave, tarefas):
+        registro = projetos.get(projeto)
+        if tarefas is None:
+            situacao['inalterados'].append(projeto)
+            tarefas = registro['tarefas']
+        else:
+            situacao['alterados' if registro else 'novos'].append(projeto)
+        projetos[projeto] = {'arquivo': caminho, 'tamanho': info.st_size, 'modificado': info.st_mtime_ns,
+                             'chave': chave, 'tarefas': tarefas}
+
+    processos = min(processos or os.cpu_count() or 1, len(pendentes))
+    if processos > 1:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            futuros = [(pool.submit(ingerir_arquivo, caminho, base, projetos.get(projeto, {}).get('chave')),
+                        projeto, caminho, info) for projeto, caminho, info in pendentes]
+            for futuro, projeto, caminho, info in futuros:
+                try:
+                    concluir(projeto, caminho, info, *futuro.result())
+                except Exception as erro:
+                    situacao['erros'][projeto] = str(erro)
+    else:
+        for projeto, caminho, info in pendentes:
+            try:
+                concluir(projeto, caminho, info,
+                         *ingerir_arquivo(caminho, base, projetos.get(projeto, {}).get('chave')))
+            except Exception as erro:
+                situacao['erros'][projeto] = str(erro)
+
+    for projeto in sorted(set(projetos) - set(arquivos)):
+        shutil.rmtree(_pasta_projeto(base, projeto), ignore_errors=True)
+        del projetos[projeto]
+        situacao['removidos'].append(projeto)
+    _gravar_manifesto(base, projetos)
+    return situacao
+
+
+# Projetos da base, com o arquivo de origem e as tarefas de cada um
+def projetos_carteira(base):
+    return pd.DataFrame.from_dict(_ler_manifesto(base), orient='index').rename_axis('Projeto')
+
+
+# Identificação do conteúdo da base (muda quando algum projeto entra, sai ou é alterado), para caches
+def versao_carteira(base):
+    projetos = sorted((projeto, registro['chave']) for projeto, registro in _ler_manifesto(base).items())
+    return chave_arquivo(json.dumps(projetos, ensure_ascii=False).encode())
+
+
+# Ler as tarefas da base (todas ou só alguns projetos e colunas), com a coluna categórica "Projeto"
+def ler_carteira(base, colunas=None, projetos=None):
+    conjunto = ds.dataset(os.path.join(base, _TAREFAS), format='parquet', partitioning=_PARTICAO,
+                          schema=ESQUEMA_TAREFAS.append(pa.field('Projeto', pa.string())))
+    filtro = ds.field('Projeto').isin(list(projetos)) if projetos is not None else None
+    colunas = None if colunas is None else ['Projeto'] + [coluna for coluna in colunas if coluna != 'Projeto']
+    df = conjunto.to_table(columns=colunas, filter=filtro).to_pandas()
+    return df.assign(**{coluna: df[coluna].astype('category') for coluna in _CATEGORIAS if coluna in df.columns})
+
+
+# Curva S combinada da carteira (mesmo cálculo do processar_dados, com as tarefas de todos os projetos num eixo
+# único) e o custo de cada projeto por período, todos distribuídos de uma vez agrupando pelo projeto
+def curva_carteira(df, calendario, agrupamento_opcao, S30=2.5, S50=2.5, S70=2.5, perfil='Uniforme'):
+    datas_uteis = eixo_dias_uteis(df['Início BL'].min(), df['Término BL'].max(), 'Mês', calendario)
+    carga = CargaCustos.de_tarefas(df, datas_uteis, calendario, perfil)
+    por_projeto = carga.total_diario_por_grupo(df['Projeto'].astype(str).to_numpy())
+    esperado = carga.custo_distribuido().sum()
+    if not np.isclose(por_projeto.to_numpy().sum(), esperado, rtol=1e-6, atol=1e-3):
+        raise ValueError(f'Custo distribuído ({por_projeto.to_numpy().sum():,.2f}) difere da soma dos custos '
+                         f'das tarefas ({esperado:,.2f})')
+
+    CurvaS = por_projeto.sum(axis=1).rename('Custo Total').to_frame()
+    CurvaS['%'] = round((CurvaS['Custo Total'] / CurvaS['Custo Total'].sum()) * 100, 2)
+    inicio = df['Início BL'].min()
+    curva_s_agrupado = agrupar_curva(recortar_eixo(CurvaS, inicio, agrupamento_opcao), agrupamento_opcao)
+    CurvaS_agrupado = curva_s_com_referencias(curva_s_agrupado, S30, S50, S70)
+    custos_por_projeto = agrupar_curva(recortar_eixo(por_projeto, inicio, agrupamento_opcao), agrupamento_opcao)
+    return CurvaS_agrupado, custos_por_projeto.rename_axis(columns='Projeto')
+
+
+# Indicadores de cada projeto (os do calcular_indicadores e os de lógica), por operações agrupadas sobre a base:
+# a tabela de vínculos é montada de uma vez, com as Predecessoras procuradas dentro do projeto de cada tarefa
+def indicadores_carteira(df, calendario):
+    codigos, projetos = pd.factorize(df['Projeto'].astype(str).to_numpy(), sort=True)
+    vinculos = tabela_vinculos(df, codigos)
+    logica = indicadores_logica_por_grupo(df, codigos, vinculos)
+    por_projeto = df.groupby(codigos).agg(**{'Tarefas': ('Id', 'size'), 'Custo': ('Custo', 'sum'),
+                                             'Início BL': ('Início BL', 'min'), 'Término BL': ('Término BL', 'max')})
+    por_projeto['Duração (dias)'] = (por_projeto['Término BL'] - por_projeto['Início BL']).dt.days
+    # Tarefas com um Id já usado no projeto (os vínculos para esse Id vão para a primeira)
+    por_projeto['Ids repetidos'] = np.bincount(codigos[id_repetido(df, codigos)], minlength=len(projetos))[
+        por_projeto.index]
+    com_datas = por_projeto['Início BL'].notna() & por_projeto['Término BL'].notna()
+    dias_uteis = np.zeros(len(por_projeto), dtype=np.int64)
+    dias_uteis[com_datas.to_numpy()] = calendario.contar(
+        por_projeto.loc[com_datas, 'Início BL'], por_projeto.loc[com_datas, 'Término BL'] + pd.Timedelta(days=1))
+    por_projeto['Duração (dias úteis)'] = dias_uteis
+    logica.columns = [f'{nome} (%)' for nome in logica.columns]
+    return pd.concat([por_projeto.set_axis(projetos[por_projeto.index]), logica.set_axis(projetos)],
+                     axis=1).rename_axis('Projeto')
+
+
+# Períodos de maior custo somado da carteira, com quantos projetos têm custo no período e o projeto que mais
+# contribui para o pico
+def picos_carteira(custos_por_projeto, n_picos=N_PICOS):
+    total = custos_por_projeto.sum(axis=1)
+    picos = total.nlargest(n_picos).index
+    custos = custos_por_projeto.loc[picos]
+    maior = custos.idxmax(axis=1)
+    return pd.DataFrame({
+        'Custo Total': total.loc[picos],
+        'Projetos ativos': (custos > 0).sum(axis=1),
+        'Maior projeto': maior,
+        'Custo do maior projeto': custos.max(axis=1),
+        '% do maior projeto': np.divide(custos.max(axis=1) * 100, total.loc[picos],
+                                        out=np.zeros(len(picos)), where=total.loc[picos].to_numpy() > 0),
+    }).rename_axis('Período')
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Consolida os cronogramas (.xlsx) de uma pasta numa carteira.')
+    parser.add_argument('pasta', help='pasta com os arquivos .xlsx (um por projeto)')
+    parser.add_argument('--base', help=f'pasta da base colunar (padrão: uma por pasta de arquivos, em {PASTA_BASES})')
+    parser.add_argument('--saida', default='resultados_carteira', help='pasta de saída (padrão: resultados_carteira)')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    parser.add_argument('--processos', type=int, default=os.cpu_count(), help='processos em paralelo na leitura')
+    parser.add_argument('--feriados', help='arquivo texto com um feriado por linha (DD/MM/YYYY)')
+    parser.add_argument('--agrupamento', choices=['Mês', 'Semana'], default='Mês')
+    parser.add_argument('--S', type=float, nargs=3, default=[2.5, 2.5, 2.5], metavar=('S30', 'S50', 'S70'))
+    parser.add_argument('--perfil', default='Uniforme',
+                        help=f"perfil de carga do custo: {', '.join(PERFIS)} ou tabela de percentuais (10;20;40;20;10)")
+    parser.add_argument('--picos', type=int, default=N_PICOS, help=f'períodos de pico listados (padrão: {N_PICOS})')
+    args = parser.parse_args(argumentos)
+    if args.perfil not in PERFIS:
+        try:
+            tabela_perfil(args.perfil)
+        except ValueError as erro:
+            parser.error(str(erro))
+
+    feriados_texto = ''
+    if args.feriados:
+        with open(args.feriados, encoding='utf-8') as f:
+            feriados_texto = f.read()
+    calendario, invalidos = calendario_de_texto(feriados_texto)
+    for data_texto in invalidos:
+        print(f"Feriado ignorado: '{data_texto}' não está no formato DD/MM/YYYY", file=sys.stderr)
+
+    base = args.base or base_da_pasta(args.pasta)
+    inicio = time.perf_counter()
+    situacao = atualizar_carteira(args.pasta, base, args.processos)
+    print(f"Base atualizada em {time.perf_counter() - inicio:.1f} s: {len(situacao['novos'])} novo(s), "
+          f"{len(situacao['alterados'])} alterado(s), {len(situacao['inalterados'])} inalterado(s), "
+          f"{len(situacao['removidos'])} removido(s)")
+    for projeto, erro in situacao['erros'].items():
+        print(f'{projeto}: ERRO {erro}', file=sys.stderr)
+
+    inicio = time.perf_counter()
+    df = ler_carteira(base)
+    if df.empty:
+        parser.error(f'nenhuma tarefa na carteira {base}')
+    CurvaS_agrupado, custos_por_projeto = curva_carteira(df, calendario, args.agrupamento, *args.S, args.perfil)
+    tabelas = {
+        'curva_s': CurvaS_agrupado[['Custo Total', '%', '% Acum.', 'Curva30', 'Curva50', 'Curva70']]
+        .rename_axis('Período').reset_index(),
+        'custos_por_projeto': custos_por_projeto.rename_axis('Período').reset_index(),
+        'indicadores': indicadores_carteira(df, calendario).reset_index(),
+        'picos': picos_carteira(custos_por_projeto, args.picos).reset_index(),
+    }
+    os.makedirs(args.saida, exist_ok=True)
+    for nome_tabela, tabela in tabelas.items():
+        _gravar(tabela, os.path.join(args.saida, nome_tabela), args.formato)
+    print(f"{df['Projeto'].nunique()} projeto(s), {len(df)} tarefa(s) calculados em "
+          f"{time.perf_counter() - inicio:.1f} s; resultados em {args.saida}")
+    return 1 if situacao['erros'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+from curva_s import agrupar_curva
+from distribuicao import CargaCustos, eixo_dias_uteis
+from vinculos import ids_tarefas, posicoes_por_id
+
+# Datas usadas pela curva de cada versão: a linha de base (como a Curva S do app) ou as datas agendadas
+BASES_CURVA = {'Linha de base': ('Início BL', 'Término BL'), 'Agendado': ('Início Agendado', 'Término Agendado')}
+
+
+# Nomes das versões sem repetição: o mesmo nome de arquivo (reexportações semanais, por exemplo) ganha um
+# sufixo com a ocorrência ("cronograma.xlsx (2)")
+def nomes_unicos(nomes):
+    unicos = []
+    for nome in nomes:
+        candidato, ocorrencia = nome, 1
+        while candidato in unicos:
+            ocorrencia += 1
+            candidato = f'{nome} ({ocorrencia})'
+        unicos.append(candidato)
+    return unicos
+
+
+# Alinhar N versões pelo Id da tarefa (hash join): união ordenada dos Ids e matriz versão x Id com a posição
+# da tarefa em cada versão
+def alinhar_versoes(versoes):
+    ids = [ids_tarefas(df) for df in versoes]
+    todos = np.unique(np.concatenate(ids)) if ids else np.array([], dtype=np.int64)
+    posicoes = np.vstack([posicoes_por_id(ids_versao, todos) for ids_versao in ids]) if ids else np.empty((0, 0), int)
+    return todos, posicoes
+
+
+# Coluna de cada versão numa matriz versão x Id (vazio onde a tarefa não existe)
+def _coluna_alinhada(versoes, posicoes, coluna, vazio, dtype):
+    saida = np.full(posicoes.shape, vazio, dtype=dtype)
+    for k, df in enumerate(versoes):
+        presentes = posicoes[k] >= 0
+        saida[k, presentes] = df[coluna].to_numpy(dtype=dtype)[posicoes[k, presentes]]
+    return saida
+
+
+# Dias úteis de a até b (positivo = b depois de a), NaN onde alguma das datas falta
+def _dias_uteis_entre(calendario, a, b):
+    dias = np.full(a.shape, np.nan)
+    validas = ~(np.isnat(a) | np.isnat(b))
+    dias[validas] = calendario.contar(a[validas], b[validas])
+    return dias
+
+
+# Primeira / última versão em que cada tarefa aparece e o valor da coluna nela
+def _valor_nas_pontas(matriz, presente):
+    n_versoes = presente.shape[0]
+    primeira = presente.argmax(axis=0)
+    ultima = n_versoes - 1 - presente[::-1].argmax(axis=0)
+    colunas = np.arange(matriz.shape[1])
+    return matriz[primeira, colunas], matriz[ultima, colunas], primeira, ultima
+
+
+# Comparar N versões do mesmo cronograma (na ordem recebida, da mais antiga para a mais recente).
+# Devolve o resumo por versão (tarefas, término, custo, deslocamentos e mudanças no caminho crítico em
+# relação à versão anterior) e a tabela por tarefa (deslocamento e variação de custo da primeira à última versão).
+def comparar_versoes(versoes, nomes, calendario):
+    todos, posicoes = alinhar_versoes(versoes)
+    presente = posicoes >= 0
+    inicio = _coluna_alinhada(versoes, posicoes, 'Início Agendado', np.datetime64('NaT'), 'datetime64[D]')
+    termino = _coluna_alinhada(versoes, posicoes, 'Término Agendado', np.datetime64('NaT'), 'datetime64[D]')
+    custo = _coluna_alinhada(versoes, posicoes, 'Custo', np.nan, float)
+    critica = np.zeros(posicoes.shape, dtype=bool)
+    for k, df in enumerate(versoes):
+        critica[k, presente[k]] = (df['Crítica'] == 'Sim').to_numpy()[posicoes[k, presente[k]]]
+
+    # Versão a versão (a partir da segunda): tarefas presentes nas duas versões consecutivas
+    nas_duas = presente[1:] & presente[:-1]
+    deslocamento = _dias_uteis_entre(calendario, termino[:-1], termino[1:])
+    deslocamento[~nas_duas] = np.nan
+    with np.errstate(invalid='ignore'):
+        atrasadas = np.r_[0, (deslocamento > 0).sum(axis=1)]
+        adiantadas = np.r_[0, (deslocamento < 0).sum(axis=1)]
+    entraram = np.r_[0, (nas_duas & critica[1:] & ~critica[:-1]).sum(axis=1)]
+    sairam = np.r_[0, (nas_duas & ~critica[1:] & critica[:-1]).sum(axis=1)]
+    novas = np.r_[0, (presente[1:] & ~presente[:-1]).sum(axis=1)]
+    removidas = np.r_[0, (~presente[1:] & presente[:-1]).sum(axis=1)]
+
+    termino_projeto = pd.to_datetime([df['Término Agendado'].max() for df in versoes])
+    custo_total = np.nansum(custo, axis=1)
+    fim_projeto = termino_projeto.to_numpy(dtype='datetime64[D]')
+    resumo = pd.DataFrame({
+        'Versão': nomes_unicos(nomes),
+        'Tarefas': presente.sum(axis=1),
+        'Término do projeto': termino_projeto,
+        'Deslocamento do término (dias úteis)': np.r_[np.nan, _dias_uteis_entre(calendario, fim_projeto[:-1],
+                                                                                 fim_projeto[1:])],
+        'Custo total': custo_total,
+        'Variação de custo': np.r_[np.nan, np.diff(custo_total)],
+        'Tarefas atrasadas': atrasadas,
+        'Tarefas adiantadas': adiantadas,
+        'Entraram no caminho crítico': entraram,
+        'Saíram do caminho crítico': sairam,
+        'Novas': novas,
+        'Removidas': removidas,
+    })
+
+    # Por tarefa: da primeira à última versão em que aparece
+    inicio_primeira, inicio_ultima, primeira, _ = _valor_nas_pontas(inicio, presente)
+    termino_primeira, termino_ultima, _, _ = _valor_nas_pontas(termino, presente)
+    custo_primeira, custo_ultima, _, _ = _valor_nas_pontas(custo, presente)
+    nomes_tarefas = _coluna_alinhada(versoes, posicoes, 'Nome da tarefa', None, object)
+    _, nome_ultima, _, _ = _valor_nas_pontas(nomes_tarefas, presente)
+    situacao = np.where(~presente[-1], 'Removida', np.where(primeira > 0, 'Nova', 'Mantida'))
+    tarefas = pd.DataFrame({
+        'Id': todos,
+        'Nome da tarefa': nome_ultima,
+        'Situação': situacao,
+        'Versões': presente.sum(axis=0),
+        'Início (primeira)': pd.to_datetime(inicio_primeira),
+        'Início (última)': pd.to_datetime(inicio_ultima),
+        'Término (primeira)': pd.to_datetime(termino_primeira),
+        'Término (última)': pd.to_datetime(termino_ultima),
+        'Deslocamento do término (dias úteis)': _dias_uteis_entre(calendario, termino_primeira, termino_ultima),
+        'Custo (primeira)': custo_primeira,
+        'Custo (última)': custo_ultima,
+        'Variação de custo': custo_ultima - custo_primeira,
+        'Versões no caminho crítico': critica.sum(axis=0),
+        'Mudanças de criticidade': ((critica[1:] != critica[:-1]) & nas_duas).sum(axis=0),
+    })
+    return resumo, tarefas
+
+
+# Curvas S (% acumulado) de todas as versões num eixo comum, uma coluna por versão, com o custo de cada tarefa
+# distribuído como na Curva S do app (distribuicao.CargaCustos, pelo perfil de carga)
+def curvas_versoes(versoes, nomes, calendario, agrupamento_opcao, base='Linha de base', perfil='Uniforme'):
+    coluna_inicio, coluna_termino = BASES_CURVA[base]
+    inicio = min(df[coluna_inicio].min() for df in versoes)
+    termino = max(df[coluna_termino].max() for df in versoes)
+    datas_uteis = eixo_dias_uteis(inicio, termino, agrupamento_opcao, calendario)
+
+    custos = {}
+    for nome, df in zip(nomes_unicos(nomes), versoes):
+        tarefas = df
+        if base == 'Agendado':
+            # O custo de cada tarefa nos dias úteis das datas agendadas
+            tarefas = df.assign(**{'Início BL': df[coluna_inicio], 'Término BL': df[coluna_termino]})
+        custos[nome] = CargaCustos.de_tarefas(tarefas, datas_uteis, calendario, perfil).total_diario().to_numpy()
+    agrupado = agrupar_curva(pd.DataFrame(custos, index=datas_uteis), agrupamento_opcao)
+    return (agrupado.cumsum() / agrupado.sum() * 100).round(2)
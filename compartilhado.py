@@ -0,0 +1,110 @@
+# Cálculos pesados compartilhados entre as sessões do servidor (sem Streamlit). Cada resultado é identificado por
+# uma chave (hash do arquivo, feriados, agrupamento e parâmetros) e calculado uma única vez numa reserva de threads,
+# fora da thread do script: a página envia o cálculo, exibe o que já está pronto e volta a rodar quando ele termina.
+# Sessões que pedem uma chave com o cálculo em andamento recebem o mesmo Future; os MAX_RESULTADOS resultados
+# mais recentes ficam guardados e os cálculos que falham são esquecidos, para serem tentados de novo.
+# Threads e não processos: os resultados são DataFrames grandes e o trabalho pesado fica no numpy/pandas.
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from analise import curva_s_com_referencias
+from calendario import calendario_de_texto
+from curva_s import agrupar_curva, gerar_curvas
+from distribuicao import curva_custos, recortar_eixo
+from instrumentacao import Medicoes, cronometrar, marcar_execucao
+
+# Threads de cálculo do processo (todas as sessões dividem as mesmas)
+TRABALHADORES = int(os.environ.get('CRONOGRAMA_TRABALHADORES', min(4, os.cpu_count() or 1)))
+MAX_RESULTADOS = 64
+
+
+class CalculosCompartilhados:
+
+    def __init__(self, trabalhadores=TRABALHADORES, max_resultados=MAX_RESULTADOS):
+        self.max_resultados = max_resultados
+        self._executor = ThreadPoolExecutor(trabalhadores, thread_name_prefix='calculo')
+        self._trava = threading.Lock()
+        self._futuros = OrderedDict()
+        # Cálculos iniciados e pedidos atendidos por um Future que já existia (pronto ou em andamento)
+        self.calculos = 0
+        self.compartilhados = 0
+
+    # Future da chave, criado (novo=True) se ainda não existe; os prontos mais antigos além de max_resultados
+    # são descartados (os em andamento nunca)
+    def _futuro(self, chave):
+        with self._trava:
+            futuro = self._futuros.get(chave)
+            if futuro is not None:
+                self._futuros.move_to_end(chave)
+                self.compartilhados += 1
+                return futuro, False
+            futuro = self._futuros[chave] = Future()
+            self.calculos += 1
+            excesso = len(self._futuros) - self.max_resultados
+            for antiga in [antiga for antiga, anterior in self._futuros.items() if anterior.done()][:max(excesso, 0)]:
+                del self._futuros[antiga]
+            return futuro, True
+
+    def _calcular(self, chave, futuro, funcao, args):
+        marcar_execucao()
+        try:
+            resultado = funcao(*args)
+        except BaseException as erro:
+            with self._trava:
+                if self._futuros.get(chave) is futuro:
+                    del self._futuros[chave]
+            futuro.set_exception(erro)
+        else:
+            futuro.set_result(resultado)
+
+    # Enviar funcao(*args) para as threads de cálculo sem esperar; devolve o Future do resultado
+    def enviar(self, chave, funcao, *args):
+        futuro, novo = self._futuro(chave)
+        if novo:
+            self._executor.submit(self._calcular, chave, futuro, funcao, args)
+        return futuro
+
+    # Resultado de funcao(*args), calculado na thread atual ou esperado de quem já o está calculando. Para as
+    # etapas internas dos cálculos enviados: um Future de memorizar está sempre em andamento, nunca na fila, e
+    # esperar por ele numa thread de cálculo não trava a reserva. As chaves não podem coincidir com as de enviar.
+    def memorizar(self, chave, funcao, *args):
+        futuro, novo = self._futuro(chave)
+        if novo:
+            self._calcular(chave, futuro, funcao, args)
+        return futuro.result()
+
+    def situacao(self):
+        with self._trava:
+            em_andamento = sum(not futuro.done() for futuro in self._futuros.values())
+            return {'calculos': self.calculos, 'compartilhados': self.compartilhados, 'em_andamento': em_andamento,
+                    'guardados': len(self._futuros) - em_andamento}
+
+    def encerrar(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Curva S da página (as etapas de analise.processar_dados), para rodar numa thread de cálculo. A série diária e a
+# curva agrupada são memorizadas à parte: mudar só os S reaproveita as duas, mudar o agrupamento, a série diária.
+# As etapas vão para o log e as métricas do processo (contexto "segundo plano").
+def curva_s_compartilhada(calculos, df, chave, feriados_texto, agrupamento_opcao, S30, S50, S70, ajustar=False,
+                          perfil='Uniforme'):
+    tempos = Medicoes(contexto={'arquivo': chave, 'execucao': 'segundo plano'})
+    calendario, _ = calendario_de_texto(feriados_texto)
+
+    # Calculada uma vez com a extensão de um mês, que serve aos dois agrupamentos
+    with cronometrar(tempos, 'Série diária de custos', cache=True):
+        CurvaS = calculos.memorizar(('Série diária', chave, feriados_texto, perfil), curva_custos, df, calendario,
+                                    'Mês', perfil)
+
+    with cronometrar(tempos, 'Curva agrupada', cache=True):
+        curva_s_agrupado = calculos.memorizar(
+            ('Curva agrupada', chave, feriados_texto, perfil, agrupamento_opcao),
+            lambda: agrupar_curva(recortar_eixo(CurvaS, df['Início BL'].min(), agrupamento_opcao), agrupamento_opcao))
+
+    # Curvas de referência memorizadas pelo número de períodos e pelas famílias (S informados ou ajustados)
+    with cronometrar(tempos, 'Curvas de referência', cache=True):
+        return curva_s_com_referencias(
+            curva_s_agrupado, S30, S50, S70, ajustar,
+            lambda n, familias: calculos.memorizar(('Curvas de referência', n, familias), gerar_curvas, n, familias))
@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+
+from vinculos import TIPOS, tabela_vinculos
+
+_TI, _II, _TT, _IT = range(len(TIPOS))
+
+
+class CicloNaRede(ValueError):
+
+    def __init__(self, tarefas):
+        self.tarefas = list(tarefas)
+        exemplo = ', '.join(str(t) for t in self.tarefas[:10])
+        super().__init__(f"A rede de predecessoras tem ciclo; {len(self.tarefas)} tarefa(s) afetada(s): {exemplo}")
+
+
+# Rede compacta indexada por inteiros (posição da tarefa no DataFrame), com a ordem topológica já calculada
+class Rede:
+
+    def __init__(self, n_tarefas, origem, destino, tipo, latencia):
+        self.n_tarefas = n_tarefas
+        self.origem = np.asarray(origem, dtype=np.int32)
+        self.destino = np.asarray(destino, dtype=np.int32)
+        self.tipo = np.asarray(tipo, dtype=np.int8)
+        self.latencia = np.asarray(latencia, dtype=float)
+        self.ordem = self._ordem_topologica()
+
+    @classmethod
+    def de_tarefas(cls, df, duracao, vinculos=None):
+        if vinculos is None:
+            vinculos = tabela_vinculos(df)
+        # Latência em % é relativa à duração da predecessora
+        latencia = vinculos['latencia'].to_numpy(dtype=float).copy()
+        percentual = vinculos['percentual'].to_numpy()
+        latencia[percentual] *= duracao[vinculos['origem'].to_numpy()[percentual]]
+        return cls(len(df), vinculos['origem'], vinculos['destino'], vinculos['tipo'], latencia)
+
+    # Ordem topológica (Kahn); tarefas que sobram com predecessoras pendentes estão em ciclo
+    def _ordem_topologica(self):
+        n = self.n_tarefas
+        grau = np.bincount(self.destino, minlength=n)
+        por_origem = np.argsort(self.origem, kind='stable')
+        inicio_origem = np.searchsorted(self.origem[por_origem], np.arange(n + 1))
+        sucessoras = self.destino[por_origem].tolist()
+        inicio_origem = inicio_origem.tolist()
+        grau = grau.tolist()
+
+        ordem = [tarefa for tarefa in range(n) if grau[tarefa] == 0]
+        for tarefa in ordem:
+            for sucessora in sucessoras[inicio_origem[tarefa]:inicio_origem[tarefa + 1]]:
+                grau[sucessora] -= 1
+                if grau[sucessora] == 0:
+                    ordem.append(sucessora)
+        if len(ordem) < n:
+            raise CicloNaRede(np.flatnonzero(np.asarray(grau) > 0))
+        return np.asarray(ordem, dtype=np.int64)
+
+
+# Passagens de ida e volta em dias úteis; cada tarefa ocupa [início, início + duração)
+def passagens(rede, duracao, inicio_minimo=None):
+    n = rede.n_tarefas
+    duracao = np.asarray(duracao, dtype=float)
+    posicao = np.empty(n, dtype=np.int64)
+    posicao[rede.ordem] = np.arange(n)
+
+    # Vínculos processados na ordem topológica da origem (ida) e da destino (volta)
+    ida = np.argsort(posicao[rede.origem], kind='stable')
+    volta = np.argsort(-posicao[rede.destino], kind='stable')
+    usa_fim_origem = np.isin(rede.tipo, [_TI, _TT])
+    chega_no_fim_destino = np.isin(rede.tipo, [_TT, _IT])
+
+    # Ida: início cedo da sucessora = maior restrição vinda das predecessoras
+    inicio_cedo = np.zeros(n) if inicio_minimo is None else np.asarray(inicio_minimo, dtype=float).copy()
+    origem, destino, latencia = rede.origem[ida].tolist(), rede.destino[ida].tolist(), rede.latencia[ida].tolist()
+    usa_fim, no_fim = usa_fim_origem[ida].tolist(), chega_no_fim_destino[ida].tolist()
+    ic, dur = inicio_cedo.tolist(), duracao.tolist()
+    for o, d, lat, fim_o, fim_d in zip(origem, destino, latencia, usa_fim, no_fim):
+        candidato = ic[o] + (dur[o] if fim_o else 0.0) + lat - (dur[d] if fim_d else 0.0)
+        if candidato > ic[d]:
+            ic[d] = candidato
+    inicio_cedo = np.asarray(ic)
+    termino_cedo = inicio_cedo + duracao
+    fim_projeto = termino_cedo.max() if n else 0.0
+
+    # Volta: término tarde da predecessora = menor restrição vinda das sucessoras
+    tt = np.full(n, fim_projeto).tolist()
+    origem, destino, latencia = rede.origem[volta].tolist(), rede.destino[volta].tolist(), rede.latencia[volta].tolist()
+    usa_fim, no_fim = usa_fim_origem[volta].tolist(), chega_no_fim_destino[volta].tolist()
+    for o, d, lat, fim_o, fim_d in zip(origem, destino, latencia, usa_fim, no_fim):
+        candidato = tt[d] - (0.0 if fim_d else dur[d]) - lat + (0.0 if fim_o else dur[o])
+        if candidato < tt[o]:
+            tt[o] = candidato
+    termino_tarde = np.asarray(tt)
+    inicio_tarde = termino_tarde - duracao
+
+    return inicio_cedo, termino_cedo, inicio_tarde, termino_tarde
+
+
+# Nível de cada tarefa percorrendo os vínculos na ordem dada: 0 para quem não tem vínculo de chegada,
+# senão 1 + o maior nível de quem chega nela
+def _niveis(n, antes, depois):
+    nivel = [0] * n
+    for a, b in zip(antes.tolist(), depois.tolist()):
+        if nivel[a] + 1 > nivel[b]:
+            nivel[b] = nivel[a] + 1
+    return np.asarray(nivel, dtype=np.int64)
+
+
+# Vínculos agrupados por nível da tarefa que recebe a restrição e, dentro do nível, por essa tarefa:
+# cada grupo é (origem, destino, latência, usa fim da origem, chega no fim da destino, tarefas, inícios dos
+# trechos de cada tarefa), com as máscaras já em float e em coluna para operar sobre as iterações
+def _grupos_por_nivel(rede, nivel, recebe):
+    ordem = np.lexsort((recebe, nivel[recebe]))
+    niveis = nivel[recebe][ordem]
+    limites = np.searchsorted(niveis, np.arange(1, niveis.max() + 2 if len(niveis) else 1))
+    usa_fim_origem = np.isin(rede.tipo, [_TI, _TT]).astype(float)[:, np.newaxis]
+    chega_no_fim_destino = np.isin(rede.tipo, [_TT, _IT]).astype(float)[:, np.newaxis]
+    grupos = []
+    for a, b in zip(limites[:-1], limites[1:]):
+        vinculos = ordem[a:b]
+        tarefas_grupo = recebe[vinculos]
+        inicios = np.flatnonzero(np.r_[True, tarefas_grupo[1:] != tarefas_grupo[:-1]])
+        grupos.append((rede.origem[vinculos], rede.destino[vinculos], rede.latencia[vinculos][:, np.newaxis],
+                       usa_fim_origem[vinculos], chega_no_fim_destino[vinculos], tarefas_grupo[inicios], inicios))
+    return grupos
+
+
+# Rede organizada em níveis topológicos para as passagens em lote: todas as tarefas de um nível dependem só
+# de níveis anteriores, então cada nível é uma única operação vetorizada sobre todas as iterações
+class RedeEmNiveis:
+
+    def __init__(self, rede):
+        self.rede = rede
+        posicao = np.empty(rede.n_tarefas, dtype=np.int64)
+        posicao[rede.ordem] = np.arange(rede.n_tarefas)
+        ida = np.argsort(posicao[rede.origem], kind='stable')
+        volta = np.argsort(-posicao[rede.destino], kind='stable')
+        nivel_ida = _niveis(rede.n_tarefas, rede.origem[ida], rede.destino[ida])
+        nivel_volta = _niveis(rede.n_tarefas, rede.destino[volta], rede.origem[volta])
+        self.ida = _grupos_por_nivel(rede, nivel_ida, rede.destino)
+        self.volta = _grupos_por_nivel(rede, nivel_volta, rede.origem)
+
+    @property
+    def n_niveis(self):
+        return len(self.ida) + 1
+
+
+# Passagens de ida e volta para várias iterações de uma vez: duracoes tem uma linha por tarefa e uma coluna
+# por iteração. Mesmo resultado de passagens() coluna a coluna; devolve início cedo, término cedo e folga total.
+def passagens_em_lote(niveis, duracoes, inicio_minimo=None):
+    n, m = duracoes.shape
+    inicio_cedo = np.zeros((n, m)) if inicio_minimo is None else \
+        np.repeat(np.asarray(inicio_minimo, dtype=float)[:, np.newaxis], m, axis=1)
+    for origem, destino, latencia, fim_o, fim_d, tarefas_nivel, inicios in niveis.ida:
+        candidato = inicio_cedo[origem] + duracoes[origem] * fim_o + latencia - duracoes[destino] * fim_d
+        inicio_cedo[tarefas_nivel] = np.maximum(inicio_cedo[tarefas_nivel],
+                                                np.maximum.reduceat(candidato, inicios, axis=0))
+    termino_cedo = inicio_cedo + duracoes
+
+    termino_tarde = np.repeat(termino_cedo.max(axis=0, initial=0.0)[np.newaxis, :], n, axis=0)
+    for origem, destino, latencia, fim_o, fim_d, tarefas_nivel, inicios in niveis.volta:
+        candidato = (termino_tarde[destino] - duracoes[destino] * (1.0 - fim_d) - latencia
+                     + duracoes[origem] * (1.0 - fim_o))
+        termino_tarde[tarefas_nivel] = np.minimum(termino_tarde[tarefas_nivel],
+                                                  np.minimum.reduceat(candidato, inicios, axis=0))
+    return inicio_cedo, termino_cedo, termino_tarde - termino_cedo
+
+
+# Data zero do projeto (primeiro dia útil a partir do início mais cedo) e início mínimo de cada tarefa em
+# dias úteis: tarefas sem predecessoras começam na data de coluna_inicio (restrição "não iniciar antes de")
+def inicio_minimo_tarefas(df, calendario, rede, coluna_inicio='Início Agendado'):
+    data_base = calendario.deslocar(df[coluna_inicio].min().to_datetime64(), 0)
+    inicio_tarefas = calendario.deslocar(df[coluna_inicio].fillna(df[coluna_inicio].min()), 0)
+    inicio_agendado = calendario.contar(data_base, inicio_tarefas)
+    sem_predecessoras = np.bincount(rede.destino, minlength=rede.n_tarefas) == 0
+    return data_base, np.where(sem_predecessoras, inicio_agendado, 0)
+
+
+# Rede da tabela de tarefas, com os nomes das tarefas no erro de ciclo
+def rede_de_tarefas(df, duracao, vinculos=None):
+    try:
+        return Rede.de_tarefas(df, duracao, vinculos)
+    except CicloNaRede as erro:
+        raise CicloNaRede(df['Nome da tarefa'].iloc[erro.tarefas]) from None
+
+
+# Calcular o caminho crítico a partir das Predecessoras e das durações (em dias úteis do calendário)
+def calcular_cpm(df, calendario, coluna_duracao='Duração', coluna_inicio='Início Agendado', vinculos=None,
+                 limite_folga=0.0):
+    duracao = df[coluna_duracao].to_numpy(dtype=float)
+    rede = rede_de_tarefas(df, duracao, vinculos)
+    data_base, inicio_minimo = inicio_minimo_tarefas(df, calendario, rede, coluna_inicio)
+
+    inicio_cedo, termino_cedo, inicio_tarde, termino_tarde = passagens(rede, duracao, inicio_minimo)
+    folga_total = inicio_tarde - inicio_cedo
+
+    def datas(inicio, termino):
+        # O término é o último dia útil trabalhado (marcos terminam no próprio dia de início)
+        ultimo_dia = np.where(termino > inicio, np.ceil(termino) - 1, np.floor(inicio))
+        return (pd.to_datetime(calendario.deslocar(data_base, np.floor(inicio).astype(np.int64))),
+                pd.to_datetime(calendario.deslocar(data_base, ultimo_dia.astype(np.int64))))
+
+    inicio_cedo_data, termino_cedo_data = datas(inicio_cedo, termino_cedo)
+    inicio_tarde_data, termino_tarde_data = datas(inicio_tarde, termino_tarde)
+    return pd.DataFrame({
+        'Início Cedo': inicio_cedo_data,
+        'Término Cedo': termino_cedo_data,
+        'Início Tarde': inicio_tarde_data,
+        'Término Tarde': termino_tarde_data,
+        'Folga Total': folga_total,
+        'Crítica CPM': folga_total <= limite_folga + 1e-9,
+    }, index=df.index)
+
+
+# Substituir a coluna Crítica e a Folga do arquivo pelos valores calculados
+def aplicar_cpm(df, calendario, **opcoes):
+    resultado = calcular_cpm(df, calendario, **opcoes)
+    df = df.copy()
+    df['Crítica'] = pd.Categorical(np.where(resultado['Crítica CPM'], 'Sim', 'Não'))
+    df['Folga'] = resultado['Folga Total'].astype(np.float32)
+    return df
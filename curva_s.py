@@ -0,0 +1,86 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+_PONTO_VIRGULA = str.maketrans(',.', '.,')
+
+
+# Agrupar a CurvaS diária por mês ou semana
+def agrupar_curva(dataframe, agrupamento):
+    if agrupamento == 'Mês':
+        curva_s_agrupado = dataframe.groupby(pd.Grouper(freq='M')).sum()
+        curva_s_agrupado.index = curva_s_agrupado.index.strftime('%m/%y')
+    elif agrupamento == 'Semana':
+        curva_s_agrupado = dataframe.groupby(pd.Grouper(freq='W-MON')).sum()
+        curva_s_agrupado.index = curva_s_agrupado.index.strftime('%d/%m/%y')
+    else:
+        curva_s_agrupado = pd.DataFrame()  # Retornar um DataFrame vazio se o agrupamento não for reconhecido
+    return curva_s_agrupado
+
+
+# Curva de referência pela fórmula 1 - [1 - (n/N)^{log(I)}]^S, em % (memorizada por N, S e I)
+@lru_cache(maxsize=1024)
+def curva_referencia(N, S, I):
+    # Com um único período a fração n/(N-1) é tomada como 1 (curva em 100%)
+    fracao = np.arange(N) / (N - 1) if N > 1 else np.ones(N)
+    curva = (1 - (1 - fracao ** math.log10(I)) ** S) * 100
+    curva.setflags(write=False)
+    return curva
+
+
+# Curvas de referência para várias famílias (I, S); colunas "Curva{I}" (ou "Curva{I} S{S}" se I se repetir)
+def gerar_curvas(N, familias):
+    familias = [(float(I), float(S)) for I, S in familias]
+    repetidos = {I for I, _ in familias if sum(1 for outro, _ in familias if outro == I) > 1}
+    curvas = {'n': np.arange(N)}
+    for I, S in familias:
+        nome = f'Curva{I:g} S{S:g}' if I in repetidos else f'Curva{I:g}'
+        curvas[nome] = curva_referencia(N, S, I)
+    return pd.DataFrame(curvas)
+
+
+# Curvas de referência 30/50/70 para N períodos
+def curvas_referencia(N, S30, S50, S70):
+    return gerar_curvas(N, [(30, S30), (50, S50), (70, S70)])
+
+
+# Valor de S cuja curva de referência I mais se aproxima do % acumulado real (mínimos quadrados numa grade de S)
+def ajustar_s(acumulado, I, valores_s=np.round(np.arange(0.5, 5.0001, 0.01), 2)):
+    acumulado = np.asarray(acumulado, dtype=float)
+    N = len(acumulado)
+    fracao = np.arange(N) / (N - 1) if N > 1 else np.ones(N)
+    base = 1 - fracao ** math.log10(I)
+    curvas = (1 - base[np.newaxis, :] ** np.asarray(valores_s)[:, np.newaxis]) * 100
+    erros = ((curvas - acumulado[np.newaxis, :]) ** 2).sum(axis=1)
+    melhor = int(np.argmin(erros))
+    return float(valores_s[melhor]), float(np.sqrt(erros[melhor] / max(N, 1)))
+
+
+# Juntar a curva agrupada às curvas de referência e formatar as colunas de exibição
+def formatar_curva_s(curva_s_agrupado, curvas):
+    curva_s_agrupado = curva_s_agrupado.copy()
+    colunas_curvas = [coluna for coluna in curvas.columns if coluna.startswith('Curva')]
+    for coluna in ['n'] + colunas_curvas:
+        curva_s_agrupado[coluna] = curvas[coluna].to_numpy()
+
+    # Calcular o percentual acumulado
+    curva_s_agrupado['% Acum.'] = curva_s_agrupado['%'].cumsum()
+
+    # Formatar os valores monetários (1.234,56)
+    curva_s_agrupado['Custo Total '] = curva_s_agrupado['Custo Total'].map('{:,.2f}'.format).str.translate(_PONTO_VIRGULA)
+    # Formatar as colunas de % e % Acum.
+    curva_s_agrupado['% '] = curva_s_agrupado['%'].map('{:.1f}%'.format)
+    curva_s_agrupado['% Acum. '] = curva_s_agrupado['% Acum.'].map('{:.1f}%'.format)
+    for coluna in colunas_curvas:
+        curva_s_agrupado['%C' + coluna[len('Curva'):]] = curva_s_agrupado[coluna].map('{:.1f}%'.format)
+
+    return curva_s_agrupado
+
+
+#Criar Curva S
+def criar_curva_s(dataframe, agrupamento, S30, S50, S70):
+    curva_s_agrupado = agrupar_curva(dataframe, agrupamento)
+    curvas = curvas_referencia(len(curva_s_agrupado), S30, S50, S70)
+    return formatar_curva_s(curva_s_agrupado, curvas)
@@ -0,0 +1,342 @@
+from math import comb
+
+import numpy as np
+import pandas as pd
+
+# Perfis de carga de custo: fração acumulada F(x) do custo da tarefa em x = fração da duração decorrida, dada pelos
+# coeficientes de x, x², x³... (F(0) = 0 e F(1) = 1). Uma tabela de percentuais (trechos iguais da duração)
+# também serve de perfil.
+PERFIS = {
+    'Uniforme': (1.0,),
+    'Antecipado': (2.0, -1.0),       # densidade 2(1 - x): mais custo no início
+    'Postergado': (0.0, 1.0),        # densidade 2x: mais custo no fim
+    'Sino': (0.0, 3.0, -2.0),        # densidade 6x(1 - x): concentrado no meio
+}
+
+
+# Criar o eixo de dias úteis da Curva S (sem feriados), estendido em uma semana ou um mês conforme o agrupamento
+def eixo_dias_uteis(inicio, termino, agrupamento_opcao, calendario):
+    if agrupamento_opcao == 'Mês':
+        inicio = inicio - pd.DateOffset(months=1)
+    elif agrupamento_opcao == 'Semana':
+        inicio = inicio - pd.DateOffset(weeks=1)
+    return calendario.dias_uteis(inicio, termino)
+
+
+# Posição de cada tarefa no eixo: [primeiro dia útil >= início, último dia útil <= término + 1)
+# Tarefas sem data ficam com intervalo vazio
+def _intervalos(df, dias, calendario):
+    inicio = df['Início BL'].to_numpy(dtype='datetime64[D]')
+    termino = df['Término BL'].to_numpy(dtype='datetime64[D]')
+    validas = ~(np.isnat(inicio) | np.isnat(termino))
+
+    pos_inicio = np.zeros(len(df), dtype=np.int32)
+    pos_fim = np.zeros(len(df), dtype=np.int32)
+    if len(dias):
+        pos_inicio[validas] = calendario.contar(dias[0], inicio[validas])
+        pos_fim[validas] = calendario.contar(dias[0], termino[validas] + np.timedelta64(1, 'D'))
+    np.clip(pos_inicio, 0, len(dias), out=pos_inicio)
+    np.clip(pos_fim, pos_inicio, len(dias), out=pos_fim)
+    return pos_inicio, pos_fim
+
+
+# Soma, por dia, de pesos constantes em intervalos [inicio, fim) (array de diferenças + soma acumulada).
+# Com grupos (código de 0 a n_grupos - 1 por intervalo), uma linha por grupo: cada grupo ocupa um trecho
+# de n + 1 posições do mesmo array de diferenças, e a soma acumulada é feita por linha.
+def _acumular(pos_inicio, pos_fim, pesos, n, grupos=None, n_grupos=1):
+    if grupos is None:
+        delta = (np.bincount(pos_inicio, weights=pesos, minlength=n + 1)
+                 - np.bincount(pos_fim, weights=pesos, minlength=n + 1))
+        return np.cumsum(delta[:n])
+    deslocamento = grupos.astype(np.int64) * (n + 1)
+    delta = (np.bincount(pos_inicio + deslocamento, weights=pesos, minlength=n_grupos * (n + 1))
+             - np.bincount(pos_fim + deslocamento, weights=pesos, minlength=n_grupos * (n + 1)))
+    return np.cumsum(delta.reshape(n_grupos, n + 1)[:, :n], axis=1)
+
+
+# Matriz tarefa x dia guardada de forma compacta: um intervalo (início, fim, custo diário) por tarefa.
+# Ocupa O(tarefas + dias) em vez de O(tarefas x dias) como o DataFrame denso DataS.
+# O eixo de dias úteis vem do Calendario e já não contém os feriados.
+class MatrizCustos:
+
+    def __init__(self, datas_uteis, tarefas, pos_inicio, pos_fim, custo_diario):
+        self.datas_uteis = pd.DatetimeIndex(datas_uteis, name='Data')
+        self.tarefas = np.asarray(tarefas, dtype=object)
+        self.pos_inicio = pos_inicio
+        self.pos_fim = pos_fim
+        self.custo_diario = custo_diario
+
+    @classmethod
+    def de_tarefas(cls, df, datas_uteis, calendario):
+        dias = np.asarray(pd.DatetimeIndex(datas_uteis).values, dtype='datetime64[D]')
+        pos_inicio, pos_fim = _intervalos(df, dias, calendario)
+        tarefas = df['Nome da tarefa'].astype(str).str.strip().to_numpy()
+        return cls(datas_uteis, tarefas, pos_inicio, pos_fim, df['Custo Diário'].to_numpy(dtype=float))
+
+    @property
+    def shape(self):
+        return len(self.datas_uteis), len(self.tarefas)
+
+    @property
+    def nbytes(self):
+        return (self.pos_inicio.nbytes + self.pos_fim.nbytes + self.custo_diario.nbytes
+                + self.datas_uteis.nbytes + self.tarefas.nbytes)
+
+    # Custo total por dia (a única informação usada pela Curva S)
+    def total_diario(self):
+        n = len(self.datas_uteis)
+        custo = self.custo_diario
+
+        # Custos NaN são ignorados na soma; custos infinitos zeram o dia inteiro (como no cálculo original)
+        finitas = np.isfinite(custo)
+        infinitas = np.isinf(custo)
+        inicio, fim = self.pos_inicio[finitas], self.pos_fim[finitas]
+        custo_total = _acumular(inicio, fim, custo[finitas], n)
+
+        # Zerar exatamente os dias sem tarefas ativas (sem resíduo de arredondamento da soma acumulada)
+        ativas = np.cumsum(np.bincount(inicio, minlength=n + 1) - np.bincount(fim, minlength=n + 1))[:n]
+        custo_total[ativas == 0] = 0.0
+
+        if infinitas.any():
+            dias_infinitos = np.cumsum(np.bincount(self.pos_inicio[infinitas], minlength=n + 1)
+                                       - np.bincount(self.pos_fim[infinitas], minlength=n + 1))[:n]
+            custo_total[dias_infinitos > 0] = 0.0
+        return pd.Series(custo_total, index=self.datas_uteis, name='Custo Total')
+
+    # Detalhar os custos diários de uma tarefa (tarefas com o mesmo nome são somadas, como as colunas de DataS)
+    def custos_tarefa(self, tarefa):
+        linhas = np.flatnonzero(self.tarefas == str(tarefa).strip())
+        if not len(linhas):
+            raise KeyError(tarefa)
+        custos = np.zeros(len(self.datas_uteis))
+        for linha in linhas:
+            custos[self.pos_inicio[linha]:self.pos_fim[linha]] += self.custo_diario[linha]
+        return pd.Series(custos, index=self.datas_uteis, name=str(tarefa).strip())
+
+    # Materializar o DataFrame denso (uma coluna por tarefa), só para conferência ou poucos dados
+    def densa(self, tarefas=None):
+        if tarefas is None:
+            tarefas = pd.unique(self.tarefas)
+        return pd.concat([self.custos_tarefa(tarefa) for tarefa in tarefas], axis=1)
+
+    # Converter para matriz esparsa do scipy (dias x linhas de tarefa), se o scipy estiver instalado
+    def esparsa(self):
+        from scipy import sparse
+
+        comprimentos = (self.pos_fim - self.pos_inicio).astype(np.int64)
+        colunas = np.repeat(np.arange(len(self.tarefas)), comprimentos)
+        inicio_repetido = np.repeat(self.pos_inicio.astype(np.int64), comprimentos)
+        deslocamento = np.arange(comprimentos.sum()) - np.repeat(np.cumsum(comprimentos) - comprimentos, comprimentos)
+        linhas = inicio_repetido + deslocamento
+        valores = np.repeat(self.custo_diario, comprimentos)
+        return sparse.csc_matrix((valores, (linhas, colunas)), shape=self.shape)
+
+
+# Distribuir o custo diário de todas as tarefas de uma vez
+def distribuir_custos(df, datas_uteis, calendario):
+    return MatrizCustos.de_tarefas(df, datas_uteis, calendario).total_diario()
+
+
+# Tabela de percentuais ("10;20;40;20;10" ou sequência de números) normalizada para somar 1
+def tabela_perfil(tabela):
+    if isinstance(tabela, str):
+        tabela = [parte for parte in tabela.replace(',', '.').replace(';', ' ').split() if parte]
+    try:
+        pesos = np.asarray(tabela, dtype=float)
+    except ValueError:
+        raise ValueError(f'Perfil de custo inválido: {tabela!r}') from None
+    if not len(pesos) or (pesos < 0).any() or not pesos.sum() > 0:
+        raise ValueError(f'Perfil de custo inválido: {tabela!r} (use percentuais não negativos, como 10;20;40;20;10)')
+    return pesos / pesos.sum()
+
+
+# Perfil reconhecido: um nome de PERFIS ou uma tabela de percentuais válida
+def perfil_valido(perfil):
+    if perfil in PERFIS:
+        return True
+    try:
+        tabela_perfil(perfil)
+    except ValueError:
+        return False
+    return True
+
+
+# Tarefas com "Perfil de Custo" preenchido e não reconhecido; elas são distribuídas pelo perfil escolhido para
+# todas as tarefas
+def perfis_invalidos(df):
+    if 'Perfil de Custo' not in df.columns:
+        return pd.DataFrame(columns=['Nome da tarefa', 'Perfil de Custo'])
+    perfis = df['Perfil de Custo'].astype('string').str.strip()
+    invalidos = [perfil for perfil in perfis.dropna().unique() if perfil and not perfil_valido(perfil)]
+    return df.loc[perfis.isin(invalidos).to_numpy(dtype=bool), ['Nome da tarefa', 'Perfil de Custo']]
+
+
+# Soma, por dia, de pesos polinomiais em intervalos: a tarefa com início s, L dias e fração acumulada
+# F(x) = sum(f_k x^k) recebe no dia j = t - s o peso custo * (F((j + 1)/L) - F(j/L)), um polinômio em j.
+# Reescrito em potências do dia t, cada coeficiente é constante no intervalo da tarefa e vai para o array de
+# diferenças de _acumular; o custo é O(tarefas + dias) por grau, sem passar dia a dia.
+def _acumular_polinomio(pos_inicio, pos_fim, custos, coeficientes, n, grupos=None, n_grupos=1):
+    grau = len(coeficientes)
+    inicio = pos_inicio.astype(float)
+    inverso_L = 1.0 / np.maximum(pos_fim - inicio, 1.0)
+    if grau == 1:
+        return _acumular(pos_inicio, pos_fim, custos * coeficientes[0] * inverso_L, n, grupos, n_grupos)
+
+    # Coeficientes de j^i: a_i = custo * sum_{k > i} f_k C(k, i) / L^k
+    a = [np.zeros(len(inicio)) for _ in range(grau)]
+    potencia_L = custos
+    for k, f in enumerate(coeficientes, 1):
+        potencia_L = potencia_L * inverso_L
+        if f:
+            for i in range(k):
+                a[i] += (f * comb(k, i)) * potencia_L
+
+    # Coeficiente de t^p: b_p = sum_{i >= p} a_i C(i, p) (-s)^(i - p), por Horner em -s. Os dias ficam
+    # centrados no meio do eixo, para reduzir o cancelamento numérico das potências.
+    centro = n / 2
+    menos_s = centro - inicio
+    t = np.arange(n) - centro
+    total = 0.0
+    for p in range(grau):
+        b = a[grau - 1] * comb(grau - 1, p)
+        for i in range(grau - 2, p - 1, -1):
+            b *= menos_s
+            b += a[i] * comb(i, p)
+        total = total + _acumular(pos_inicio, pos_fim, b, n, grupos, n_grupos) * t ** p
+    return total
+
+
+# Mesma soma para um perfil em tabela: a fração acumulada F é linear em cada trecho [s + i L/k, s + (i + 1) L/k),
+# e a densidade de custo muda nas k + 1 quebras. Uma mudança D na posição p (fracionária) vale D a partir do dia
+# floor(p) + 1 e D (floor(p) + 1 - p) no dia floor(p): no array de diferenças, D dividido linearmente entre
+# floor(p) e floor(p) + 1. Todas as quebras vão para um único array de diferenças, somado uma vez no fim; as
+# pontas (s e s + L) são inteiras e dispensam a divisão.
+def _acumular_tabela(pos_inicio, pos_fim, custos, pesos, n, grupos=None, n_grupos=1):
+    k = len(pesos)
+    L = (pos_fim - pos_inicio).astype(float)
+    densidade = custos * k / L
+    deslocamento = 0 if grupos is None else grupos.astype(np.int64) * (n + 1)
+    # Uma posição a mais no fim para a parte depois da última quebra (sempre zero: ela é inteira)
+    tamanho = n_grupos * (n + 1) + 1
+    delta = np.zeros(tamanho)
+    for i, mudanca in enumerate(np.diff(pesos, prepend=0.0, append=0.0)):
+        if not mudanca:
+            continue
+        valor = densidade * mudanca
+        if i == 0 or i == k:
+            delta += np.bincount((pos_inicio if i == 0 else pos_fim) + deslocamento, weights=valor, minlength=tamanho)
+            continue
+        quebra = pos_inicio + L * (i / k)
+        dia = quebra.astype(np.int64)
+        depois = valor * (quebra - dia)
+        dia += deslocamento
+        delta += np.bincount(dia, weights=valor - depois, minlength=tamanho)
+        delta[1:] += np.bincount(dia, weights=depois, minlength=tamanho)[:-1]
+    total = np.cumsum(delta[:-1].reshape(n_grupos, n + 1)[:, :n], axis=1)
+    return total[0] if grupos is None else total
+
+
+# Custo das tarefas distribuído pelos dias úteis que elas ocupam segundo perfis de carga, com o custo total de
+# cada tarefa ("Custo") conservado: o custo é dividido pelos dias úteis do intervalo no eixo (e não pela
+# "Duração BL", que pode não bater com eles) e tarefas com início e término fora de dias úteis ficam com um dia.
+# O perfil é um nome de PERFIS ou uma tabela de percentuais, para todas as tarefas; a coluna "Perfil de Custo",
+# se existir e estiver preenchida com um perfil válido, define o perfil de cada tarefa (ver perfis_invalidos).
+# Tarefas do mesmo perfil são distribuídas juntas, de uma vez.
+class CargaCustos:
+
+    def __init__(self, datas_uteis, tarefas, pos_inicio, pos_fim, custo, perfis):
+        self.datas_uteis = pd.DatetimeIndex(datas_uteis, name='Data')
+        self.tarefas = np.asarray(tarefas, dtype=object)
+        self.pos_inicio = pos_inicio
+        self.pos_fim = pos_fim
+        self.custo = custo
+        self.perfis = perfis
+
+    @classmethod
+    def de_tarefas(cls, df, datas_uteis, calendario, perfil='Uniforme'):
+        dias = np.asarray(pd.DatetimeIndex(datas_uteis).values, dtype='datetime64[D]')
+        pos_inicio, pos_fim = _intervalos(df, dias, calendario)
+        com_data = ~(df['Início BL'].isna() | df['Término BL'].isna()).to_numpy() & (pos_inicio < len(dias))
+        pos_fim = np.where(com_data, np.maximum(pos_fim, pos_inicio + 1), pos_fim).astype(np.int32)
+        # Um único perfil fica como texto; por tarefa, um array com o perfil de cada uma
+        perfis = perfil if isinstance(perfil, str) else ';'.join(map(str, perfil))
+        if 'Perfil de Custo' in df.columns and df['Perfil de Custo'].notna().any():
+            por_tarefa = df['Perfil de Custo'].astype(object).where(df['Perfil de Custo'].notna(), '')
+            por_tarefa = por_tarefa.astype(str).str.strip().to_numpy(dtype=object)
+            invalidos = [valor for valor in pd.unique(por_tarefa) if valor and not perfil_valido(valor)]
+            perfis = np.where((por_tarefa != '') & ~np.isin(por_tarefa, invalidos), por_tarefa, perfis)
+        tarefas = df['Nome da tarefa'].astype(str).str.strip().to_numpy()
+        custo = pd.to_numeric(df['Custo'], errors='coerce').to_numpy(dtype=float)
+        return cls(datas_uteis, tarefas, pos_inicio, pos_fim, custo, perfis)
+
+    # Custo que cada tarefa recebe no eixo (o custo, se ela tem dias no eixo e custo finito; senão zero).
+    # Pelos perfis, a soma dos pesos diários de uma tarefa é custo * (F(1) - F(0)) = custo.
+    def custo_distribuido(self):
+        distribuivel = (self.pos_fim > self.pos_inicio) & np.isfinite(self.custo)
+        return np.where(distribuivel, self.custo, 0.0)
+
+    # Custo por dia (sem grupos) ou por grupo e dia (array n_grupos x dias)
+    def _total(self, grupos=None, n_grupos=1):
+        n = len(self.datas_uteis)
+        custo = np.where(np.isfinite(self.custo), self.custo, 0.0)
+        validas = self.pos_fim > self.pos_inicio
+        if isinstance(self.perfis, str):
+            por_perfil = [(validas, self.perfis)]
+        else:
+            codigos, perfis = pd.factorize(self.perfis)
+            por_perfil = [(validas & (codigos == codigo), perfil) for codigo, perfil in enumerate(perfis)]
+        total = np.zeros(n) if grupos is None else np.zeros((n_grupos, n))
+        for linhas, perfil in por_perfil:
+            inicio, fim, custos = self.pos_inicio[linhas], self.pos_fim[linhas], custo[linhas]
+            grupos_perfil = None if grupos is None else grupos[linhas]
+            if perfil in PERFIS:
+                total += _acumular_polinomio(inicio, fim, custos, PERFIS[perfil], n, grupos_perfil, n_grupos)
+            else:
+                total += _acumular_tabela(inicio, fim, custos, tabela_perfil(perfil), n, grupos_perfil, n_grupos)
+        # Zerar exatamente os dias sem tarefas ativas (sem resíduo de arredondamento da soma acumulada)
+        ativas = _acumular(self.pos_inicio, self.pos_fim, np.ones(len(self.pos_inicio)), n, grupos, n_grupos)
+        total[ativas == 0] = 0.0
+        return total
+
+    # Custo total por dia
+    def total_diario(self):
+        return pd.Series(self._total(), index=self.datas_uteis, name='Custo Total')
+
+    # Custo por dia de cada grupo de tarefas (um projeto da carteira, por exemplo), todos de uma vez no mesmo
+    # eixo: uma coluna por grupo, na ordem das categorias
+    def total_diario_por_grupo(self, grupos):
+        codigos, categorias = pd.factorize(grupos, sort=True)
+        total = self._total(codigos, len(categorias))
+        return pd.DataFrame(total.T, index=self.datas_uteis, columns=pd.Index(categorias))
+
+    # Tarefas cujo custo não foi distribuído por inteiro (sem datas, fora do eixo ou com custo inválido)
+    def conferir(self):
+        distribuido = self.custo_distribuido()
+        diferentes = ~np.isfinite(self.custo) | ~np.isclose(distribuido, self.custo, rtol=1e-9, atol=1e-6)
+        return pd.DataFrame({'Nome da tarefa': self.tarefas[diferentes], 'Custo': self.custo[diferentes],
+                             'Custo distribuído': distribuido[diferentes]})
+
+
+# Montar a CurvaS diária (Custo Total e %) a partir das tarefas, com o custo de cada tarefa distribuído pelo
+# perfil de carga. Confere que o total distribuído é a soma dos custos distribuíveis de cada tarefa.
+def curva_custos(df, calendario, agrupamento_opcao, perfil='Uniforme'):
+    datas_uteis = eixo_dias_uteis(df['Início BL'].min(), df['Término BL'].max(), agrupamento_opcao, calendario)
+    carga = CargaCustos.de_tarefas(df, datas_uteis, calendario, perfil)
+    CurvaS = carga.total_diario().to_frame()
+    esperado = carga.custo_distribuido().sum()
+    if not np.isclose(CurvaS['Custo Total'].sum(), esperado, rtol=1e-6, atol=1e-3):
+        raise ValueError(f"Custo distribuído ({CurvaS['Custo Total'].sum():,.2f}) difere da soma dos custos "
+                         f"das tarefas ({esperado:,.2f})")
+
+    custo_total = CurvaS['Custo Total'].sum()
+    CurvaS['%'] = round((CurvaS['Custo Total'] / custo_total) * 100, 2)
+    return CurvaS
+
+
+# Recortar a CurvaS calculada com a extensão de um mês para a extensão do agrupamento escolhido
+def recortar_eixo(CurvaS, inicio, agrupamento_opcao):
+    if agrupamento_opcao == 'Mês':
+        return CurvaS
+    if agrupamento_opcao == 'Semana':
+        inicio = inicio - pd.DateOffset(weeks=1)
+    return CurvaS[CurvaS.index >= pd.Timestamp(inicio).normalize()]
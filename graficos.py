@@ -0,0 +1,273 @@
+import math
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Limites de exibição da Curva S: pontos por série, pontos com rótulo e rótulos no eixo X
+MAX_PONTOS_CURVA = 400
+MAX_ROTULOS_CURVA = 24
+MAX_TICKS_CURVA = 24
+
+# Projetos com série própria no gráfico da carteira (os demais são somados em "Outros")
+MAX_PROJETOS_CARTEIRA = 12
+
+# Linhas do Gantt por figura: acima disso as tarefas são exibidas em janelas ou agrupadas em faixas de período
+MAX_LINHAS_GANTT = 60
+
+COR_CURVA_REAL = '#0068C9'
+_CORES_REFERENCIA = ['lightpink', 'lightgreen', 'lightgray']
+
+
+# Posições amostradas de forma uniforme (sempre com o primeiro e o último ponto)
+def amostrar_indices(n, maximo):
+    if n <= maximo:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, maximo).round().astype(np.int64))
+
+
+# Gráfico da Curva S: % acumulado real e curvas de referência. Em horizontes longos só uma amostra dos períodos
+# é desenhada (o tamanho da figura não cresce com o número de semanas); o hover mostra os valores do período.
+def figura_curva_s(curva, agrupamento_opcao, max_pontos=MAX_PONTOS_CURVA):
+    amostra = curva.iloc[amostrar_indices(len(curva), max_pontos)]
+    periodos = amostra.index.to_numpy()
+    acumulado = amostra['% Acum.'].to_numpy(dtype=float)
+
+    # Rótulos de dados só em alguns pontos (e sempre no último)
+    rotulos = np.full(len(amostra), '', dtype=object)
+    com_rotulo = amostrar_indices(len(amostra), MAX_ROTULOS_CURVA)
+    rotulos[com_rotulo] = [f'{valor:.1f}%' for valor in acumulado[com_rotulo]]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=periodos, y=acumulado, name='% Acum.', mode='lines+markers+text', text=rotulos,
+        textposition='top center', textfont=dict(color=COR_CURVA_REAL, size=11),
+        line=dict(color=COR_CURVA_REAL), marker=dict(color=COR_CURVA_REAL, size=6),
+        # Custo já formatado pela formatar_curva_s (1.234,56)
+        customdata=amostra[['Custo Total ', '%']].to_numpy(dtype=object),
+        hovertemplate='%{x}<br>% Acum.: %{y:.1f}%<br>% no período: %{customdata[1]:.1f}%'
+                      '<br>Custo: R$ %{customdata[0]}<extra></extra>',
+    ))
+    colunas_curvas = [coluna for coluna in curva.columns if coluna.startswith('Curva')]
+    for i, coluna in enumerate(colunas_curvas):
+        fig.add_trace(go.Scatter(
+            x=periodos, y=amostra[coluna].to_numpy(dtype=float), name='S' + coluna[len('Curva'):], mode='lines',
+            line=dict(color=_CORES_REFERENCIA[i % len(_CORES_REFERENCIA)], dash='dot'),
+            hovertemplate='%{x}<br>' + coluna + ': %{y:.1f}%<extra></extra>',
+        ))
+
+    # Densidade dos ticks conforme o agrupamento (um por mês ou a cada 4 semanas), limitada a MAX_TICKS_CURVA
+    passo = 4 if agrupamento_opcao == 'Semana' else 1
+    passo = max(passo, math.ceil(len(periodos) / MAX_TICKS_CURVA))
+    fig.update_xaxes(title='Data', type='category', tickmode='array', tickvals=periodos[::passo], tickangle=0,
+                     showgrid=False)
+    fig.update_yaxes(title='% Acum.', showgrid=False, rangemode='tozero')
+    fig.update_layout(height=500, margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor='white',
+                      legend=dict(x=0, y=1, xanchor='left', yanchor='top'), hovermode='closest')
+    return fig
+
+
+# Faixas de período do Gantt, da mais fina à mais grossa: (frequência, rótulo do período)
+_FAIXAS_GANTT = [
+    ('W-MON', lambda periodo: 'Sem. ' + periodo.start_time.strftime('%d/%m/%y')),
+    ('M', lambda periodo: periodo.start_time.strftime('%m/%y')),
+    ('Q', lambda periodo: f'{periodo.quarter}º tri/{periodo.start_time:%y}'),
+    ('Y', lambda periodo: periodo.start_time.strftime('%Y')),
+]
+
+
+def _datas_texto(datas):
+    return pd.DatetimeIndex(pd.to_datetime(datas)).strftime('%d/%m/%y').to_numpy()
+
+
+# Barras horizontais de um Gantt (uma por linha do eixo Y, a primeira no topo); eixo X em datas
+def _figura_barras(rotulos, inicio, termino, customdata, hovertemplate, altura_linha=22):
+    inicio = pd.to_datetime(inicio)
+    duracao_ms = (pd.to_datetime(termino) - inicio) / pd.Timedelta(milliseconds=1)
+    fig = go.Figure(go.Bar(
+        y=rotulos, base=inicio, x=np.asarray(duracao_ms, dtype=float), orientation='h',
+        marker=dict(color=COR_CURVA_REAL), customdata=customdata, hovertemplate=hovertemplate,
+    ))
+    fig.update_yaxes(title='Tarefa', type='category', categoryorder='array', categoryarray=list(rotulos)[::-1],
+                     automargin=True)
+    fig.update_xaxes(title='Data', type='date', tickformat='%d-%m-%y')
+    fig.update_layout(height=max(300, 80 + altura_linha * len(rotulos)), margin=dict(l=10, r=10, t=30, b=10),
+                      bargap=0.3, showlegend=False)
+    return fig
+
+
+# Gantt com uma linha por tarefa (tarefas já ordenadas por início); usado numa janela de até MAX_LINHAS_GANTT
+def figura_gantt_tarefas(tarefas):
+    nomes = tarefas['Nome da tarefa'].astype(str).to_numpy()
+    # Nomes repetidos ficariam na mesma linha do eixo categórico
+    if len(set(nomes)) < len(nomes):
+        nomes = np.array([f'{nome} ({posicao})' for posicao, nome in enumerate(nomes, 1)], dtype=object)
+    customdata = np.column_stack([_datas_texto(tarefas['Início BL']), _datas_texto(tarefas['Término BL']),
+                                  tarefas['Duração'].to_numpy()])
+    return _figura_barras(nomes, tarefas['Início BL'], tarefas['Término BL'], customdata,
+                          '%{y}<br>Início: %{customdata[0]}<br>Término: %{customdata[1]}'
+                          '<br>Duração: %{customdata[2]} dias<extra></extra>')
+
+
+# Tarefas agrupadas pelo período de início, no período mais fino que resulte em até max_faixas faixas
+def faixas_por_periodo(tarefas, max_faixas=MAX_LINHAS_GANTT):
+    inicio = pd.to_datetime(tarefas['Início BL'])
+    for frequencia, rotulo in _FAIXAS_GANTT:
+        periodos = inicio.dt.to_period(frequencia)
+        if periodos.nunique() <= max_faixas:
+            break
+    faixas = pd.DataFrame({'Período': periodos, 'Início': inicio, 'Término': pd.to_datetime(tarefas['Término BL'])})
+    faixas = faixas.groupby('Período', sort=True).agg(Início=('Início', 'min'), Término=('Término', 'max'),
+                                                       Tarefas=('Início', 'size'))
+    faixas.index = [rotulo(periodo) for periodo in faixas.index]
+    return faixas
+
+
+# Gantt por faixas de período: cada barra vai do primeiro início ao último término das tarefas da faixa
+def figura_gantt_faixas(faixas):
+    rotulos = [f'{periodo} · {quantidade} tarefa(s)' for periodo, quantidade in zip(faixas.index, faixas['Tarefas'])]
+    customdata = np.column_stack([_datas_texto(faixas['Início']), _datas_texto(faixas['Término']),
+                                  faixas['Tarefas'].to_numpy()])
+    return _figura_barras(rotulos, faixas['Início'], faixas['Término'], customdata,
+                          '%{y}<br>Primeiro início: %{customdata[0]}<br>Último término: %{customdata[1]}'
+                          '<extra></extra>')
+
+
+# Curvas S de várias versões sobrepostas: a mais recente em destaque, as anteriores em cinza cada vez mais claro
+def figura_curvas_versoes(curvas, max_pontos=MAX_PONTOS_CURVA):
+    amostra = curvas.iloc[amostrar_indices(len(curvas), max_pontos)]
+    periodos = amostra.index.to_numpy()
+    n_versoes = len(amostra.columns)
+    fig = go.Figure()
+    for k, versao in enumerate(amostra.columns):
+        ultima = k == n_versoes - 1
+        fig.add_trace(go.Scatter(
+            x=periodos, y=amostra[versao].to_numpy(dtype=float), name=str(versao), mode='lines',
+            line=dict(color=COR_CURVA_REAL if ultima else 'gray', width=3 if ultima else 1),
+            opacity=1.0 if ultima else 0.25 + 0.5 * k / max(n_versoes - 1, 1),
+            hovertemplate=f'{versao}<br>%{{x}}: %{{y:.1f}}%<extra></extra>',
+        ))
+    passo = max(1, math.ceil(len(periodos) / MAX_TICKS_CURVA))
+    fig.update_xaxes(title='Data', type='category', tickmode='array', tickvals=periodos[::passo], tickangle=0,
+                     showgrid=False)
+    fig.update_yaxes(title='% Acum.', showgrid=False, rangemode='tozero')
+    fig.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor='white', hovermode='closest',
+                      showlegend=n_versoes <= 12)
+    return fig
+
+
+# Valor agregado: VP, VA e CR acumulados (R$) e IDP / IDC no eixo secundário
+def figura_valor_agregado(serie, max_pontos=MAX_PONTOS_CURVA):
+    amostra = serie.iloc[amostrar_indices(len(serie), max_pontos)]
+    periodos = amostra.index.to_numpy()
+    fig = go.Figure()
+    for coluna, nome, cor in [('VP', 'VP (planejado)', 'gray'), ('VA', 'VA (agregado)', COR_CURVA_REAL),
+                              ('CR', 'CR (custo real)', 'indianred')]:
+        fig.add_trace(go.Scatter(
+            x=periodos, y=amostra[coluna].to_numpy(dtype=float), name=nome, mode='lines', line=dict(color=cor),
+            hovertemplate='%{x}<br>' + coluna + ': R$ %{y:,.0f}<extra></extra>',
+        ))
+    for coluna, cor in [('IDP', 'seagreen'), ('IDC', 'darkorange')]:
+        fig.add_trace(go.Scatter(
+            x=periodos, y=amostra[coluna].to_numpy(dtype=float), name=coluna, mode='lines', yaxis='y2',
+            line=dict(color=cor, dash='dot'), hovertemplate='%{x}<br>' + coluna + ': %{y:.2f}<extra></extra>',
+        ))
+    passo = max(1, math.ceil(len(periodos) / MAX_TICKS_CURVA))
+    fig.update_xaxes(title='Data', type='category', tickmode='array', tickvals=periodos[::passo], tickangle=0,
+                     showgrid=False)
+    fig.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor='white', hovermode='closest',
+                      yaxis=dict(title='R$ acumulado', showgrid=False, rangemode='tozero'),
+                      yaxis2=dict(title='Índice', overlaying='y', side='right', showgrid=False, rangemode='tozero'),
+                      legend=dict(x=0, y=1, xanchor='left', yanchor='top'))
+    return fig
+
+
+# Distribuição das datas de término simuladas (histograma) com as linhas dos percentis e do Término BL
+def figura_datas_termino(datas_termino, resumo, termino_bl=None):
+    fig = go.Figure(go.Histogram(x=datas_termino, marker=dict(color=COR_CURVA_REAL), opacity=0.75,
+                                 hovertemplate='%{x}<br>%{y} iteração(ões)<extra></extra>'))
+    linhas = [(nome, data, 'gray') for nome, data in resumo.items() if nome[1:].isdigit()]
+    if termino_bl is not None:
+        linhas.append(('Término BL', pd.Timestamp(termino_bl), 'indianred'))
+    for nome, data, cor in linhas:
+        fig.add_vline(x=data.timestamp() * 1000, line=dict(color=cor, dash='dot'),
+                      annotation_text=f'{nome}: {data:%d/%m/%y}', annotation_position='top')
+    fig.update_xaxes(title='Término do projeto', type='date', tickformat='%d-%m-%y')
+    fig.update_yaxes(title='Iterações', showgrid=False)
+    fig.update_layout(height=400, margin=dict(l=10, r=10, t=40, b=10), plot_bgcolor='white', bargap=0.05,
+                      showlegend=False)
+    return fig
+
+
+# Faixas de percentis da Curva S simulada (% acumulado): a faixa entre o menor e o maior percentil sombreada e
+# a mediana em destaque
+def figura_faixas_curva_s(faixas, max_pontos=MAX_PONTOS_CURVA):
+    amostra = faixas.iloc[amostrar_indices(len(faixas), max_pontos)]
+    periodos = amostra.index.to_numpy()
+    colunas = [coluna for coluna in amostra.columns if coluna.startswith('P') and coluna.endswith(' %')]
+    fig = go.Figure()
+    for k, coluna in enumerate([colunas[0], colunas[-1]]):
+        fig.add_trace(go.Scatter(
+            x=periodos, y=amostra[coluna].to_numpy(dtype=float), name=coluna[:-2], mode='lines',
+            line=dict(color='lightgray', width=1), fill='tonexty' if k else None,
+            fillcolor='rgba(0, 104, 201, 0.15)', hovertemplate='%{x}<br>' + coluna + ': %{y:.1f}%<extra></extra>',
+        ))
+    for coluna in colunas[1:-1]:
+        fig.add_trace(go.Scatter(
+            x=periodos, y=amostra[coluna].to_numpy(dtype=float), name=coluna[:-2], mode='lines',
+            line=dict(color=COR_CURVA_REAL, width=3 if coluna == 'P50 %' else 1,
+                      dash=None if coluna == 'P50 %' else 'dot'),
+            hovertemplate='%{x}<br>' + coluna + ': %{y:.1f}%<extra></extra>',
+        ))
+    passo = max(1, math.ceil(len(periodos) / MAX_TICKS_CURVA))
+    fig.update_xaxes(title='Data', type='category', tickmode='array', tickvals=periodos[::passo], tickangle=0,
+                     showgrid=False)
+    fig.update_yaxes(title='% Acum.', showgrid=False, rangemode='tozero')
+    fig.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor='white', hovermode='closest',
+                      legend=dict(x=0, y=1, xanchor='left', yanchor='top'))
+    return fig
+
+
+# Custo da carteira por período em barras empilhadas por projeto (os de maior custo; os demais em "Outros")
+def figura_custos_carteira(custos_por_projeto, max_projetos=MAX_PROJETOS_CARTEIRA, max_pontos=MAX_PONTOS_CURVA):
+    maiores = custos_por_projeto.sum().nlargest(max_projetos).index
+    series = custos_por_projeto[maiores]
+    if len(maiores) < len(custos_por_projeto.columns):
+        series = series.assign(Outros=custos_por_projeto.drop(columns=maiores).sum(axis=1))
+    amostra = series.iloc[amostrar_indices(len(series), max_pontos)]
+    periodos = amostra.index.to_numpy()
+    fig = go.Figure()
+    for projeto in amostra.columns:
+        fig.add_trace(go.Bar(x=periodos, y=amostra[projeto].to_numpy(dtype=float), name=str(projeto),
+                             hovertemplate=f'{projeto}<br>%{{x}}: R$ %{{y:,.0f}}<extra></extra>'))
+    passo = max(1, math.ceil(len(periodos) / MAX_TICKS_CURVA))
+    fig.update_xaxes(title='Data', type='category', tickmode='array', tickvals=periodos[::passo], tickangle=0,
+                     showgrid=False)
+    fig.update_yaxes(title='R$ no período', showgrid=False, rangemode='tozero')
+    fig.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor='white', barmode='stack',
+                      hovermode='closest')
+    return fig
+
+
+# Histograma de um recurso: demanda diária média por período em barras, o pico diário do período e a
+# capacidade diária (se informada)
+def figura_histograma_recurso(histograma, recurso, capacidade=None, max_pontos=MAX_PONTOS_CURVA):
+    amostra = histograma.iloc[amostrar_indices(len(histograma), max_pontos)]
+    periodos = amostra.index.to_numpy()
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=periodos, y=amostra['Média diária'].to_numpy(dtype=float), name='Média diária',
+                         marker=dict(color=COR_CURVA_REAL), opacity=0.75,
+                         hovertemplate='%{x}<br>Média diária: %{y:,.2f}<extra></extra>'))
+    fig.add_trace(go.Scatter(x=periodos, y=amostra['Pico diário'].to_numpy(dtype=float), name='Pico diário',
+                             mode='lines+markers', line=dict(color='darkorange'), marker=dict(size=4),
+                             hovertemplate='%{x}<br>Pico diário: %{y:,.2f}<extra></extra>'))
+    if capacidade is not None:
+        fig.add_hline(y=capacidade, line=dict(color='indianred', dash='dash'),
+                      annotation_text=f'Capacidade: {capacidade:,.2f}', annotation_position='top left')
+    passo = max(1, math.ceil(len(periodos) / MAX_TICKS_CURVA))
+    fig.update_xaxes(title='Data', type='category', tickmode='array', tickvals=periodos[::passo], tickangle=0,
+                     showgrid=False)
+    fig.update_yaxes(title=f'{recurso} por dia útil', showgrid=False, rangemode='tozero')
+    fig.update_layout(height=450, margin=dict(l=10, r=10, t=30, b=10), plot_bgcolor='white', hovermode='closest',
+                      legend=dict(x=0, y=1, xanchor='left', yanchor='top'))
+    return fig
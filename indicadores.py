@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from vinculos import TIPOS, tabela_vinculos
+
+_TI, _II, _TT, _IT = range(len(TIPOS))
+
+# Limites das verificações de qualidade da lógica (no estilo dos 14 pontos do DCMA), em dias úteis
+LIMITE_FOLGA_ALTA = 44
+
+# Nome, descrição e meta de cada indicador, na ordem de exibição
+DESCRICOES = {
+    'Latências -': ('Vínculos com latência negativa (antecipação)', '= 0%'),
+    'Latências +': ('Vínculos com latência positiva (espera)', '< 5%'),
+    'Relacionamento TI': ('Vínculos do tipo término-início', '> 95%'),
+    'Sem Relacionamento': ('Tarefas sem predecessora e sem sucessora', '< 5%'),
+    'Sem Predecessora': ('Tarefas sem predecessora', '< 5%'),
+    'Sem Sucessora': ('Tarefas sem sucessora', '< 5%'),
+    'Início Solto': ('Tarefas cujas predecessoras não comandam o início (só TT/IT)', '< 5%'),
+    'Término Solto': ('Tarefas cujas sucessoras não dependem do término (só II/IT)', '< 5%'),
+    'Folga Alta': (f'Tarefas com folga acima de {LIMITE_FOLGA_ALTA} dias', '< 5%'),
+    'Folga Negativa': ('Tarefas com folga negativa', '= 0%'),
+}
+
+
+def _pct(quantidade, total):
+    return float(quantidade) / total * 100 if total else 0.0
+
+
+# Marcadores de cada indicador: por vínculo (os de latência e tipo) e por tarefa (os demais), calculados de uma
+# vez sobre a tabela de vínculos (uma linha por vínculo: origem, destino, tipo, latência)
+def _marcadores(df, vinculos):
+    n_tarefas = len(df)
+    origem = vinculos['origem'].to_numpy()
+    destino = vinculos['destino'].to_numpy()
+    tipo = vinculos['tipo'].to_numpy()
+    latencia = vinculos['latencia'].to_numpy()
+
+    # Predecessoras e sucessoras por tarefa; "comandam o início" = TI/II, "dependem do término" = TI/TT
+    predecessoras = np.bincount(destino, minlength=n_tarefas)
+    sucessoras = np.bincount(origem, minlength=n_tarefas)
+    comandam_inicio = np.bincount(destino[(tipo == _TI) | (tipo == _II)], minlength=n_tarefas)
+    dependem_termino = np.bincount(origem[(tipo == _TI) | (tipo == _TT)], minlength=n_tarefas)
+
+    folga = pd.to_numeric(df['Folga'], errors='coerce').to_numpy(dtype=float) if 'Folga' in df.columns \
+        else np.full(n_tarefas, np.nan)
+
+    por_vinculo = {
+        'Latências -': latencia < 0,
+        'Latências +': latencia > 0,
+        'Relacionamento TI': tipo == _TI,
+    }
+    por_tarefa = {
+        'Sem Relacionamento': (predecessoras == 0) & (sucessoras == 0),
+        'Sem Predecessora': predecessoras == 0,
+        'Sem Sucessora': sucessoras == 0,
+        'Início Solto': (predecessoras > 0) & (comandam_inicio == 0),
+        'Término Solto': (sucessoras > 0) & (dependem_termino == 0),
+        'Folga Alta': folga > LIMITE_FOLGA_ALTA,
+        'Folga Negativa': folga < 0,
+    }
+    return por_vinculo, por_tarefa
+
+
+# Indicadores de qualidade da lógica, em %. Os de vínculo usam o total de vínculos como base; os de tarefa,
+# o total de tarefas.
+def indicadores_logica(df, vinculos=None):
+    if vinculos is None:
+        vinculos = tabela_vinculos(df)
+    por_vinculo, por_tarefa = _marcadores(df, vinculos)
+    return {**{nome: _pct(marcador.sum(), len(vinculos)) for nome, marcador in por_vinculo.items()},
+            **{nome: _pct(marcador.sum(), len(df)) for nome, marcador in por_tarefa.items()}}
+
+
+# Os mesmos indicadores por grupo de tarefas (projetos de uma carteira), todos de uma vez: cada vínculo conta
+# no grupo da tarefa de destino. Uma linha por grupo, na ordem das categorias.
+def indicadores_logica_por_grupo(df, grupos, vinculos=None):
+    codigos, categorias = pd.factorize(np.asarray(grupos), sort=True)
+    if vinculos is None:
+        vinculos = tabela_vinculos(df, codigos)
+    por_vinculo, por_tarefa = _marcadores(df, vinculos)
+    n_grupos = len(categorias)
+    grupo_vinculo = codigos[vinculos['destino'].to_numpy()]
+
+    def pct(marcador, grupo, total):
+        contagem = np.bincount(grupo[marcador], minlength=n_grupos)
+        return np.divide(contagem * 100.0, total, out=np.zeros(n_grupos), where=total > 0)
+
+    total_vinculos = np.bincount(grupo_vinculo, minlength=n_grupos)
+    total_tarefas = np.bincount(codigos, minlength=n_grupos)
+    colunas = {nome: pct(marcador, grupo_vinculo, total_vinculos) for nome, marcador in por_vinculo.items()}
+    colunas.update({nome: pct(marcador, codigos, total_tarefas) for nome, marcador in por_tarefa.items()})
+    return pd.DataFrame(colunas, index=pd.Index(categorias))
+
+
+# Tabela dos indicadores com descrição e meta, para exibição
+def tabela_indicadores(indicadores):
+    return pd.DataFrame([(nome, DESCRICOES[nome][0], valor, DESCRICOES[nome][1])
+                         for nome, valor in indicadores.items()],
+                        columns=['Indicador', 'Descrição', '%', 'Meta'])
@@ -0,0 +1,176 @@
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Métricas por etapa em JSON (uma linha por etapa) neste logger; o destino é configurado por quem roda o app
+logger = logging.getLogger('cronograma.metricas')
+
+# Arquivo com as métricas no formato texto do Prometheus (coletor "textfile" do node_exporter), se definido
+ARQUIVO_METRICAS = os.environ.get('CRONOGRAMA_METRICAS')
+
+_execucoes = threading.local()
+_trava = threading.Lock()
+# Acumulado do processo por etapa: execuções, segundos, acertos e falhas de cache, último pico e últimas linhas
+_acumulado = {}
+
+
+# Marcar que o corpo de uma função em cache foi executado (falha de cache), na thread atual. Chamada no início
+# das funções com @st.cache_data; as etapas com cache=True comparam a contagem antes e depois.
+def marcar_execucao():
+    _execucoes.total = getattr(_execucoes, 'total', 0) + 1
+
+
+def _total_execucoes():
+    return getattr(_execucoes, 'total', 0)
+
+
+# Medições de uma execução (do app ou de um arquivo), por etapa. Como dict, guarda o tempo (ms) de cada etapa;
+# em detalhes, também o pico de memória (só com memoria=True, pelo tracemalloc), as linhas processadas e o
+# resultado do cache. Cada etapa concluída vai para o log JSON e para o acumulado do processo.
+class Medicoes(dict):
+
+    def __init__(self, memoria=False, contexto=None):
+        super().__init__()
+        self.memoria = memoria
+        self.contexto = dict(contexto or {})
+        self.detalhes = {}
+        self._abertas = []
+        self._iniciou_tracemalloc = False
+
+    # O pico do tracemalloc é global: ao abrir ou fechar uma etapa, o pico até aqui é repassado a todas as
+    # etapas abertas antes de ser zerado, para que etapas aninhadas não apaguem o pico das de fora
+    def _repassar_pico(self):
+        atual, pico = tracemalloc.get_traced_memory()
+        for medicao in self._abertas:
+            medicao['_pico'] = max(medicao['_pico'], pico - medicao['_base'])
+        tracemalloc.reset_peak()
+        return atual
+
+    def abrir(self, etapa):
+        medicao = {'ms': math.nan, 'pico MiB': math.nan, 'linhas': None, 'cache': ''}
+        if self.memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._iniciou_tracemalloc = True
+            medicao['_base'] = self._repassar_pico()
+            medicao['_pico'] = 0
+            self._abertas.append(medicao)
+        return medicao
+
+    def fechar(self, etapa, medicao):
+        if self.memoria and any(aberta is medicao for aberta in self._abertas):
+            self._repassar_pico()
+            self._abertas = [aberta for aberta in self._abertas if aberta is not medicao]
+            medicao['pico MiB'] = medicao.pop('_pico') / 2 ** 20
+            medicao.pop('_base')
+        self[etapa] = medicao['ms']
+        self.detalhes[etapa] = medicao
+        registrar(etapa, medicao, self.contexto)
+
+    # Parar o tracemalloc, se foi esta execução que o iniciou (ele deixa todo o processo mais lento)
+    def encerrar(self):
+        if self._iniciou_tracemalloc and not self._abertas:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+    def tabela(self):
+        return pd.DataFrame.from_dict(self.detalhes, orient='index', columns=['ms', 'pico MiB', 'linhas', 'cache']
+                                      ).astype({'linhas': 'Int64'})
+
+
+# Medir o tempo (ms) de uma etapa do processamento e guardar em tempos[etapa]. Com tempos do tipo Medicoes, a
+# etapa também registra memória, cache (cache=True: "falha" se alguma função em cache foi executada, senão
+# "acerto") e as linhas informadas em medicao['linhas'] dentro do bloco.
+@contextmanager
+def cronometrar(tempos, etapa, cache=False):
+    medicao = tempos.abrir(etapa) if isinstance(tempos, Medicoes) else {}
+    execucoes = _total_execucoes()
+    inicio = time.perf_counter()
+    try:
+        yield medicao
+    finally:
+        medicao['ms'] = (time.perf_counter() - inicio) * 1000
+        if cache:
+            medicao['cache'] = 'falha' if _total_execucoes() > execucoes else 'acerto'
+        if isinstance(tempos, Medicoes):
+            tempos.fechar(etapa, medicao)
+        else:
+            tempos[etapa] = medicao['ms']
+
+
+# Registrar uma etapa no log JSON e no acumulado do processo
+def registrar(etapa, medicao, contexto=None):
+    registro = {'etapa': etapa, **(contexto or {}), 'ms': round(medicao['ms'], 3)}
+    if not math.isnan(medicao['pico MiB']):
+        registro['pico_mib'] = round(medicao['pico MiB'], 3)
+    if medicao['linhas'] is not None:
+        registro['linhas'] = int(medicao['linhas'])
+    if medicao['cache']:
+        registro['cache'] = medicao['cache']
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(registro, ensure_ascii=False))
+
+    with _trava:
+        acumulado = _acumulado.setdefault(etapa, {'execucoes': 0, 'segundos': 0.0, 'acerto': 0, 'falha': 0,
+                                                  'pico_bytes': None, 'linhas': None})
+        acumulado['execucoes'] += 1
+        acumulado['segundos'] += medicao['ms'] / 1000
+        if medicao['cache']:
+            acumulado[medicao['cache']] += 1
+        if 'pico_mib' in registro:
+            acumulado['pico_bytes'] = medicao['pico MiB'] * 2 ** 20
+        if 'linhas' in registro:
+            acumulado['linhas'] = registro['linhas']
+
+
+def _rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Acumulado do processo no formato texto de exposição do Prometheus
+def metricas_prometheus():
+    with _trava:
+        acumulado = {etapa: dict(valores) for etapa, valores in _acumulado.items()}
+    metricas = [
+        ('cronograma_etapa_execucoes_total', 'counter', 'Execuções da etapa', 'execucoes'),
+        ('cronograma_etapa_segundos_total', 'counter', 'Tempo total gasto na etapa (s)', 'segundos'),
+        ('cronograma_etapa_pico_memoria_bytes', 'gauge', 'Pico de memória da última execução medida', 'pico_bytes'),
+        ('cronograma_etapa_linhas', 'gauge', 'Linhas processadas na última execução', 'linhas'),
+    ]
+    linhas = []
+    for nome, tipo, descricao, campo in metricas:
+        linhas += [f'# HELP {nome} {descricao}', f'# TYPE {nome} {tipo}']
+        linhas += [f'{nome}{{etapa="{_rotulo(etapa)}"}} {valores[campo]:g}'
+                   for etapa, valores in acumulado.items() if valores[campo] is not None]
+    linhas += ['# HELP cronograma_etapa_cache_total Consultas ao cache da etapa por resultado',
+               '# TYPE cronograma_etapa_cache_total counter']
+    for etapa, valores in acumulado.items():
+        for resultado in ('acerto', 'falha'):
+            if valores['acerto'] or valores['falha']:
+                linhas.append(f'cronograma_etapa_cache_total{{etapa="{_rotulo(etapa)}",resultado="{resultado}"}} '
+                              f'{valores[resultado]}')
+    return '\n'.join(linhas) + '\n'
+
+
+# Gravar as métricas no arquivo (temporário + rename, para o coletor nunca ler um arquivo pela metade)
+def gravar_metricas(caminho=None):
+    caminho = caminho or ARQUIVO_METRICAS
+    if not caminho:
+        return
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            f.write(metricas_prometheus())
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
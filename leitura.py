@@ -0,0 +1,167 @@
+import importlib.util
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+from distribuicao import PERFIS
+
+# Colunas do arquivo exportado usadas pelo app e seus nomes internos
+COLUNAS_RENOMEADAS = {"Início da Linha de Base": "Início BL", "Término da linha de base": "Término BL",
+                      "Duração da Linha de Base": "Duração BL", "Margem de atraso permitida": "Folga"}
+COLUNAS_DATAS = ["Início Agendado", "Término Agendado", "Início da Linha de Base", "Término da linha de base"]
+COLUNAS_USADAS = COLUNAS_DATAS + ["Id", "Duração da Linha de Base", "Margem de atraso permitida", "Predecessoras",
+                                  "Sucessoras", "Resumo", "Custo", "Nome da tarefa", "Crítica", "Duração",
+                                  "Quant. Prev.", "Produtividade"]
+# Colunas opcionais de avanço (valor agregado); ficam de fora do DataFrame se não foram exportadas
+COLUNAS_AVANCO = {"% concluída": "% Concluída", "Custo real": "Custo Real"}
+# Coluna opcional com o perfil de carga do custo de cada tarefa (ver distribuicao.PERFIS)
+COLUNAS_PERFIL = {"Perfil de custo": "Perfil de Custo"}
+COLUNAS_USADAS = COLUNAS_USADAS + list(COLUNAS_AVANCO) + list(COLUNAS_PERFIL)
+
+# Leitor do Excel: python-calamine (bem mais rápido), se instalado; senão o openpyxl
+MOTOR_EXCEL = 'calamine' if importlib.util.find_spec('python_calamine') else 'openpyxl'
+
+# Leitura em lotes: linhas por lote e tamanho do arquivo a partir do qual ela é usada no lugar do read_excel
+TAMANHO_LOTE = 20_000
+LIMITE_EM_LOTES_MB = 20
+
+# Sufixos de unidade ("5 dias", "1 dia", "3 diasd") e o número que os precede
+_UNIDADE = re.compile(r'diasd|dias|dia')
+_NUMERO = re.compile(r'([-+]?\d+(?:[.,]\d+)?)')
+# Tipos (pd.api.types.infer_dtype) de colunas com números e textos misturados
+_TIPOS_MISTURADOS = ('mixed', 'mixed-integer')
+
+
+# Número de uma coluna com unidade ("12,5 dias" -> 12.5); células já numéricas passam direto
+def _numero_com_unidade(coluna):
+    if pd.api.types.is_numeric_dtype(coluna):
+        return coluna.astype(float)
+    texto = coluna.astype(str).str.extract(_NUMERO, expand=False)
+    return pd.to_numeric(texto.str.replace(',', '.', regex=False), errors='coerce')
+
+
+# Percentual como fração (0 a 1): textos "50%" e números acima de 1 são divididos por 100
+def _fracao(coluna):
+    if pd.api.types.is_numeric_dtype(coluna):
+        valores = coluna.astype(float)
+    else:
+        valores = _numero_com_unidade(coluna.where(coluna.notna(), np.nan).astype(object))
+        texto = coluna.astype(str).str.contains('%', regex=False)
+        valores = valores.where(~texto, valores / 100)
+    return valores.where(valores <= 1, valores / 100).astype(np.float32)
+
+
+def _datas(coluna):
+    if pd.api.types.is_datetime64_any_dtype(coluna):
+        return coluna
+    return pd.to_datetime(coluna, format='mixed', errors='coerce')
+
+
+# Perfis de custo sem espaços nas pontas e com os nomes de PERFIS escritos como lá ("sino" -> "Sino"); valores
+# não reconhecidos ficam como estão, para serem apontados (distribuicao.perfis_invalidos)
+def _perfis(coluna):
+    perfis = coluna.astype('string').str.strip()
+    nomes = {nome.lower(): nome for nome in PERFIS}
+    return perfis.str.lower().map(nomes).fillna(perfis).astype('category')
+
+
+# Colunas de texto com valores de tipos misturados (números e textos na mesma coluna do arquivo exportado, como
+# "Quant. Prev.") convertidas para texto: o Arrow (cache em disco) não grava essas colunas, e assim o DataFrame
+# lido do cache é igual ao lido do arquivo
+def _textos_misturados(df):
+    return {coluna: df[coluna].map(str, na_action='ignore') for coluna in df.select_dtypes(include='object').columns
+            if pd.api.types.infer_dtype(df[coluna], skipna=True) in _TIPOS_MISTURADOS}
+
+
+# Normalizar o DataFrame lido do arquivo: filtra os resumos, converte unidades e datas e aplica tipos compactos
+def normalizar_cronograma(df):
+    # Id usado nas Predecessoras: a coluna Id ou, se não foi exportada, a posição da linha (antes do filtro)
+    ids = df['Id'] if 'Id' in df.columns else pd.Series(np.arange(1, len(df) + 1), index=df.index)
+    filtro = (df['Resumo'] == 'Não').to_numpy()
+    df = df[filtro].rename(columns={**COLUNAS_RENOMEADAS, **COLUNAS_AVANCO, **COLUNAS_PERFIL})
+
+    colunas = {'Id': ids[filtro].astype(np.int32)}
+    for coluna in ["Início Agendado", "Término Agendado", "Início BL", "Término BL"]:
+        colunas[coluna] = _datas(df[coluna])
+    colunas['Duração BL'] = _numero_com_unidade(df['Duração BL']).fillna(0).astype(np.int32)
+    colunas['Duração'] = _numero_com_unidade(df['Duração']).fillna(0).astype(np.int32)
+    colunas['Folga'] = _numero_com_unidade(df['Folga']).astype(np.float32)
+    for coluna in ['Predecessoras', 'Sucessoras']:
+        colunas[coluna] = df[coluna].fillna('').astype(str).str.replace(_UNIDADE, '', regex=True)
+    colunas['Resumo'] = df['Resumo'].astype('category')
+    colunas['Crítica'] = df['Crítica'].astype('category')
+    colunas['Custo'] = pd.to_numeric(df['Custo'], errors='coerce')
+    if '% Concluída' in df.columns:
+        colunas['% Concluída'] = _fracao(df['% Concluída'])
+    if 'Custo Real' in df.columns:
+        colunas['Custo Real'] = pd.to_numeric(df['Custo Real'], errors='coerce')
+    if 'Perfil de Custo' in df.columns:
+        colunas['Perfil de Custo'] = _perfis(df['Perfil de Custo'])
+
+    df = df.assign(**colunas)
+    df = df.assign(**_textos_misturados(df))
+    df['Custo Diário'] = df['Custo'] / df['Duração BL']
+    return df
+
+
+# Ler a planilha em lotes pelo iterador de linhas do openpyxl (modo read_only), sem carregar a planilha inteira.
+# Os resumos e as colunas não usadas são descartados durante a leitura, e cada lote sai já normalizado
+# (tipos compactos), de modo que a memória de pico depende do tamanho do lote e não do arquivo.
+def ler_cronograma_em_lotes(arquivo_excel, tamanho_lote=TAMANHO_LOTE):
+    from openpyxl import load_workbook
+
+    livro = load_workbook(arquivo_excel, read_only=True, data_only=True)
+    try:
+        linhas = livro["Planilha1"].iter_rows(values_only=True)
+        cabecalho = next(linhas, ())
+        posicoes = [i for i, nome in enumerate(cabecalho) if nome in COLUNAS_USADAS]
+        nomes = [cabecalho[i] for i in posicoes]
+        projetar = operator.itemgetter(*posicoes)
+        largura = max(posicoes) + 1
+        posicao_resumo = cabecalho.index('Resumo')
+        sem_id = 'Id' not in nomes
+
+        lote, indices, lotes_emitidos = [], [], 0
+        for indice, linha in enumerate(linhas):
+            # O modo read_only pode omitir as células vazias do fim da linha
+            if len(linha) < largura:
+                linha = linha + (None,) * (largura - len(linha))
+            if linha[posicao_resumo] != 'Não':
+                continue
+            lote.append(projetar(linha))
+            indices.append(indice)
+            if len(lote) == tamanho_lote:
+                yield _normalizar_lote(lote, indices, nomes, sem_id)
+                lote, indices, lotes_emitidos = [], [], lotes_emitidos + 1
+        # O último lote (ou um lote vazio, se nenhuma tarefa passou no filtro)
+        if lote or not lotes_emitidos:
+            yield _normalizar_lote(lote, indices, nomes, sem_id)
+    finally:
+        livro.close()
+
+
+def _normalizar_lote(lote, indices, nomes, sem_id):
+    df = pd.DataFrame(lote, columns=nomes, index=pd.Index(indices, dtype=np.int64))
+    if sem_id:
+        df['Id'] = df.index + 1
+    return normalizar_cronograma(df)
+
+
+# Juntar os lotes num único DataFrame (as categorias de cada lote são unidas, e uma coluna só com números num lote
+# e com textos em outro passa a texto, como na leitura inteira)
+def juntar_lotes(lotes):
+    df = pd.concat(lotes)
+    df = df.assign(**_textos_misturados(df))
+    return df.assign(**{coluna: df[coluna].astype('category') for coluna in ['Resumo', 'Crítica', 'Perfil de Custo']
+                        if coluna in df.columns})
+
+
+# Ler a planilha exportada lendo apenas as colunas usadas pelo app (em lotes, para arquivos grandes)
+def ler_cronograma(arquivo_excel, motor=MOTOR_EXCEL, em_lotes=False):
+    if em_lotes:
+        return juntar_lotes(ler_cronograma_em_lotes(arquivo_excel))
+    df = pd.read_excel(arquivo_excel, sheet_name="Planilha1", usecols=lambda coluna: coluna in COLUNAS_USADAS,
+                       engine=motor)
+    return normalizar_cronograma(df)
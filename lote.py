@@ -0,0 +1,157 @@
+# Modo em lote (sem Streamlit): calcula indicadores, Curva S e tabelas de vários cronogramas em paralelo
+# Uso: python lote.py PASTA_DOS_XLSX --saida resultados --formato parquet --processos 8
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from analise import (COLUNAS_CRITICAS, alta_duracao, baixa_duracao, calcular_indicadores, folga_curta,
+                     ler_arquivo_excel, processar_dados, tarefas_criticas)
+from calendario import calendario_de_texto
+from cpm import aplicar_cpm
+from distribuicao import PERFIS, tabela_perfil
+from indicadores import indicadores_logica
+from instrumentacao import cronometrar
+from relatorio import NOMES_INDICADORES, curva_s_numerica, gravar_xlsx, tabela_indicadores_relatorio
+from vinculos import id_repetido, tabela_vinculos
+
+# Com xlsx, as tabelas de cada cronograma vão numa única planilha (relatorio.xlsx, uma aba por tabela)
+FORMATOS = ['csv', 'parquet', 'json', 'xlsx']
+
+
+def _gravar(tabela, caminho_base, formato):
+    caminho = f'{caminho_base}.{formato}'
+    if formato == 'csv':
+        tabela.to_csv(caminho, index=False)
+    elif formato == 'parquet':
+        tabela.to_parquet(caminho, index=False)
+    elif formato == 'xlsx':
+        gravar_xlsx({os.path.basename(caminho_base): tabela}, caminho)
+    else:
+        tabela.to_json(caminho, orient='records', date_format='iso', force_ascii=False, indent=1)
+
+
+# Nome do cronograma (arquivo sem pasta e extensão): a pasta de saída e a linha do resumo, com ou sem erro
+def nome_cronograma(caminho):
+    return os.path.splitext(os.path.basename(caminho))[0]
+
+
+# Processar um arquivo (executado num processo do pool); devolve indicadores e tempos por etapa
+def processar_arquivo(caminho, opcoes):
+    tempos = {}
+    nome = nome_cronograma(caminho)
+    pasta_saida = os.path.join(opcoes['saida'], nome)
+    os.makedirs(pasta_saida, exist_ok=True)
+    calendario, _ = calendario_de_texto(opcoes['feriados_texto'])
+    formato = opcoes['formato']
+
+    inicio = time.perf_counter()
+    with cronometrar(tempos, 'leitura'):
+        df = ler_arquivo_excel(caminho)
+    if opcoes['cpm']:
+        with cronometrar(tempos, 'cpm'):
+            df = aplicar_cpm(df, calendario)
+    with cronometrar(tempos, 'indicadores'):
+        vinculos = tabela_vinculos(df)
+        indicadores = dict(zip(NOMES_INDICADORES, calcular_indicadores(df, calendario, vinculos)))
+        indicadores.update({f'{nome} (%)': valor for nome, valor in indicadores_logica(df, vinculos).items()})
+    with cronometrar(tempos, 'curva_s'):
+        S30, S50, S70 = opcoes['S']
+        CurvaS_agrupado = processar_dados(df, calendario, opcoes['agrupamento'], S30, S50, S70,
+                                          perfil=opcoes['perfil'])
+    with cronometrar(tempos, 'tabelas'):
+        indice_alta, tarefas_alta = alta_duracao(df, opcoes['alta'])
+        indice_baixa, tarefas_baixa = baixa_duracao(df, opcoes['baixa'])
+        indicadores['Alta Duração (%)'] = indice_alta
+        indicadores['Baixa Duração (%)'] = indice_baixa
+        tabelas = {
+            'curva_s': curva_s_numerica(CurvaS_agrupado),
+            'tarefas_criticas': tarefas_criticas(df)[COLUNAS_CRITICAS],
+            'folga_curta': folga_curta(df, opcoes['folga']),
+            'alta_duracao': tarefas_alta,
+            'baixa_duracao': tarefas_baixa,
+        }
+    with cronometrar(tempos, 'gravacao'):
+        if formato == 'xlsx':
+            gravar_xlsx({'indicadores': tabela_indicadores_relatorio(indicadores), **tabelas},
+                        os.path.join(pasta_saida, 'relatorio.xlsx'))
+        else:
+            for nome_tabela, tabela in tabelas.items():
+                _gravar(tabela, os.path.join(pasta_saida, nome_tabela), formato)
+        with open(os.path.join(pasta_saida, 'indicadores.json'), 'w', encoding='utf-8') as f:
+            json.dump(indicadores, f, ensure_ascii=False, indent=1, default=float)
+
+    tempos['total'] = (time.perf_counter() - inicio) * 1000
+    # Tarefas com um Id já usado no arquivo (os vínculos para esse Id vão para a primeira)
+    return {'arquivo': nome, 'tarefas': len(df), 'Ids repetidos': int(id_repetido(df).sum()), **indicadores,
+            **{f'ms {etapa}': ms for etapa, ms in tempos.items()}}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Calcula indicadores e Curva S de vários cronogramas (.xlsx).')
+    parser.add_argument('pasta', help='pasta com os arquivos .xlsx')
+    parser.add_argument('--saida', default='resultados', help='pasta de saída (padrão: resultados)')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    parser.add_argument('--processos', type=int, default=os.cpu_count(), help='processos em paralelo')
+    parser.add_argument('--feriados', help='arquivo texto com um feriado por linha (DD/MM/YYYY)')
+    parser.add_argument('--agrupamento', choices=['Mês', 'Semana'], default='Mês')
+    parser.add_argument('--S', type=float, nargs=3, default=[2.5, 2.5, 2.5], metavar=('S30', 'S50', 'S70'))
+    parser.add_argument('--alta', type=int, default=20, help='limite de alta duração (padrão: 20)')
+    parser.add_argument('--baixa', type=int, default=5, help='limite de baixa duração (padrão: 5)')
+    parser.add_argument('--folga', type=float, default=6, help='limite de folga curta (padrão: 6)')
+    parser.add_argument('--cpm', action='store_true', help='calcular caminho crítico e folga pelas Predecessoras')
+    parser.add_argument('--perfil', default='Uniforme',
+                        help=f"perfil de carga do custo: {', '.join(PERFIS)} ou tabela de percentuais (10;20;40;20;10)")
+    args = parser.parse_args(argumentos)
+    if args.perfil not in PERFIS:
+        try:
+            tabela_perfil(args.perfil)
+        except ValueError as erro:
+            parser.error(str(erro))
+
+    feriados_texto = ''
+    if args.feriados:
+        with open(args.feriados, encoding='utf-8') as f:
+            feriados_texto = f.read()
+        _, invalidos = calendario_de_texto(feriados_texto)
+        for data_texto in invalidos:
+            print(f"Feriado ignorado: '{data_texto}' não está no formato DD/MM/YYYY", file=sys.stderr)
+
+    arquivos = sorted(os.path.join(args.pasta, nome) for nome in os.listdir(args.pasta)
+                      if nome.lower().endswith('.xlsx') and not nome.startswith('~$'))
+    if not arquivos:
+        parser.error(f'nenhum arquivo .xlsx em {args.pasta}')
+    os.makedirs(args.saida, exist_ok=True)
+    opcoes = {'saida': args.saida, 'formato': args.formato, 'feriados_texto': feriados_texto, 'cpm': args.cpm,
+              'agrupamento': args.agrupamento, 'S': tuple(args.S), 'alta': args.alta, 'baixa': args.baixa,
+              'folga': args.folga, 'perfil': args.perfil}
+
+    inicio = time.perf_counter()
+    resultados = []
+    with ProcessPoolExecutor(max_workers=args.processos) as pool:
+        futuros = {pool.submit(processar_arquivo, caminho, opcoes): caminho for caminho in arquivos}
+        for futuro in as_completed(futuros):
+            nome = nome_cronograma(futuros[futuro])
+            try:
+                resultado = futuro.result()
+            except Exception as erro:
+                print(f'{nome}: ERRO {erro}', file=sys.stderr)
+                resultados.append({'arquivo': nome, 'erro': str(erro)})
+                continue
+            print(f"{nome}: {resultado['tarefas']} tarefas em {resultado['ms total']:.0f} ms "
+                  f"(leitura {resultado['ms leitura']:.0f}, curva S {resultado['ms curva_s']:.0f})")
+            resultados.append(resultado)
+    total = time.perf_counter() - inicio
+
+    _gravar(pd.DataFrame(resultados).sort_values('arquivo'), os.path.join(args.saida, 'resumo'), args.formato)
+    falhas = sum('erro' in resultado for resultado in resultados)
+    print(f'{len(arquivos)} arquivo(s) em {total:.1f} s com {args.processos} processo(s); {falhas} falha(s)')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from distribuicao import CargaCustos
+from leitura import _numero_com_unidade
+
+# Medidas da demanda das tarefas: equipes (quantidade / produtividade por dia, isto é, equipes x dias) ou a
+# própria quantidade prevista
+MEDIDAS = ['Equipes', 'Quantidade']
+AGRUPAMENTOS = ['Semana', 'Mês']
+# Produtividades por hora são convertidas para dia com esta jornada
+HORAS_POR_DIA = 8
+# Recurso das tarefas cuja produtividade não tem unidade
+SEM_UNIDADE = '(sem unidade)'
+
+# Períodos como na Curva S: semanas terminadas na segunda-feira (rótulo do último dia) e meses
+_FREQUENCIAS = {'Semana': 'W-MON', 'Mês': 'M'}
+_ROTULOS = {'Semana': '%d/%m/%y', 'Mês': '%m/%y'}
+
+# Produtividade como "12,5 m²/dia" ou "3 m³/h": a unidade da quantidade (o recurso) e o período
+_PRODUTIVIDADE = re.compile(r'^\s*[-+]?\d+(?:[.,]\d+)?\s*(?P<unidade>[^/]*?)\s*(?:/\s*(?P<periodo>\w+))?\s*$')
+_POR_HORA = ['h', 'hr', 'hora', 'horas']
+
+
+# Quantidade prevista, produtividade por dia e recurso (a unidade da produtividade) de cada tarefa
+def _quantidade_produtividade(df):
+    quantidade = _numero_com_unidade(df['Quant. Prev.']).to_numpy(dtype=float)
+    coluna = df['Produtividade']
+    produtividade = _numero_com_unidade(coluna).to_numpy(dtype=float)
+    if pd.api.types.is_numeric_dtype(coluna):
+        return quantidade, produtividade, np.full(len(df), SEM_UNIDADE, dtype=object)
+    partes = coluna.astype('string').str.extract(_PRODUTIVIDADE)
+    por_hora = partes['periodo'].str.lower().isin(_POR_HORA).to_numpy(dtype=bool)
+    produtividade = np.where(por_hora, produtividade * HORAS_POR_DIA, produtividade)
+    recursos = partes['unidade'].fillna('').str.strip().to_numpy(dtype=object)
+    recursos[recursos == ''] = SEM_UNIDADE
+    return quantidade, produtividade, recursos
+
+
+# Demanda total de cada tarefa na medida escolhida e o recurso de cada uma. Tarefas sem quantidade, com
+# produtividade zero ou inválida ou com demanda negativa ficam sem demanda.
+def demanda_tarefas(df, medida='Equipes'):
+    quantidade, produtividade, recursos = _quantidade_produtividade(df)
+    if medida == 'Equipes':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total = np.where(produtividade > 0, quantidade / produtividade, np.nan)
+    elif medida == 'Quantidade':
+        total = quantidade
+    else:
+        raise ValueError(f'Medida de demanda inválida: {medida!r} (use {", ".join(MEDIDAS)})')
+    return np.where(np.isfinite(total) & (total > 0), total, 0.0), recursos
+
+
+# Demanda diária de cada recurso nos dias úteis do cronograma (uma coluna por recurso, só os que têm demanda).
+# A demanda de cada tarefa é distribuída nos dias úteis que ela ocupa, com o perfil de carga escolhido, pelo
+# mesmo array de diferenças da Curva S (distribuicao.CargaCustos): todas as tarefas e recursos de uma vez,
+# O(tarefas + dias x recursos), sem uma coluna por tarefa.
+def carga_recursos(df, calendario, medida='Equipes', perfil='Uniforme'):
+    datas_uteis = calendario.dias_uteis(df['Início BL'].min(), df['Término BL'].max())
+    total, recursos = demanda_tarefas(df, medida)
+    posicoes = CargaCustos.de_tarefas(df, datas_uteis, calendario, perfil)
+    carga = CargaCustos(posicoes.datas_uteis, posicoes.tarefas, posicoes.pos_inicio, posicoes.pos_fim, total,
+                        perfil if isinstance(perfil, str) else ';'.join(map(str, perfil)))
+    diaria = carga.total_diario_por_grupo(recursos)
+    return diaria.loc[:, (diaria > 0).any().to_numpy()].rename_axis(columns='Recurso')
+
+
+# Resumo de cada recurso: demanda total, pico diário e o primeiro dia em que ele ocorre, e a média nos dias
+# com demanda
+def resumo_recursos(diaria):
+    com_demanda = diaria.where(diaria > 0)
+    return pd.DataFrame({'Total': diaria.sum(), 'Pico diário': diaria.max(), 'Data do pico': diaria.idxmax(),
+                         'Média diária': com_demanda.mean(), 'Dias com demanda': com_demanda.count()}
+                        ).rename_axis('Recurso')
+
+
+def _periodos(datas, agrupamento_opcao):
+    if agrupamento_opcao not in _FREQUENCIAS:
+        raise ValueError(f'Agrupamento inválido: {agrupamento_opcao!r} (use {", ".join(AGRUPAMENTOS)})')
+    return pd.DatetimeIndex(datas).to_period(_FREQUENCIAS[agrupamento_opcao])
+
+
+def _rotulos(periodos, agrupamento_opcao):
+    return pd.PeriodIndex(periodos).end_time.strftime(_ROTULOS[agrupamento_opcao])
+
+
+# Histograma de um recurso por semana ou mês: demanda total no período, média e pico diários e, com uma
+# capacidade diária, os dias úteis acima dela
+def histograma_recurso(demanda, agrupamento_opcao, capacidade=None):
+    periodos = _periodos(demanda.index, agrupamento_opcao)
+    histograma = demanda.groupby(periodos).agg(['sum', 'mean', 'max'])
+    histograma.columns = ['Total', 'Média diária', 'Pico diário']
+    if capacidade is not None:
+        histograma['Dias acima da capacidade'] = (demanda > capacidade).groupby(periodos).sum()
+    histograma.index = _rotulos(histograma.index, agrupamento_opcao)
+    return histograma.rename_axis('Período')
+
+
+# Janelas de superalocação: semanas ou meses seguidos com algum dia útil acima da capacidade diária. Para cada
+# janela, o primeiro e o último período, o primeiro e o último dia acima, os dias acima, o pico e o excesso
+# (a demanda acima da capacidade somada nesses dias)
+def janelas_superalocacao(demanda, capacidade, agrupamento_opcao):
+    colunas = ['Primeiro período', 'Último período', 'Períodos', 'Início', 'Término', 'Dias acima', 'Pico',
+               'Excesso']
+    valores = demanda.to_numpy(dtype=float)
+    acima = valores > capacidade
+    if not acima.any():
+        return pd.DataFrame(columns=colunas).rename_axis('Janela')
+
+    # Períodos com algum dia acima; uma janela começa em cada um que não segue outro período acima
+    codigos, periodos = pd.factorize(_periodos(demanda.index, agrupamento_opcao), sort=True)
+    periodo_acima = np.bincount(codigos, weights=acima, minlength=len(periodos)) > 0
+    seguido = np.concatenate(([False], periodo_acima[:-1] & (np.diff(periodos.asi8) == 1)))
+    janela_do_periodo = np.cumsum(periodo_acima & ~seguido) - 1
+
+    dias = np.flatnonzero(acima)
+    janela = janela_do_periodo[codigos[dias]]
+    primeiro_dia = np.flatnonzero(np.diff(janela, prepend=-1))
+    ultimo_dia = np.append(primeiro_dia[1:], len(dias)) - 1
+    em_janela = np.flatnonzero(periodo_acima)
+    primeiro_periodo = em_janela[np.flatnonzero(np.diff(janela_do_periodo[em_janela], prepend=-1))]
+    n_periodos = np.bincount(janela_do_periodo[em_janela])
+    rotulos = _rotulos(periodos, agrupamento_opcao)
+    return pd.DataFrame({
+        'Primeiro período': rotulos[primeiro_periodo],
+        'Último período': rotulos[primeiro_periodo + n_periodos - 1],
+        'Períodos': n_periodos,
+        'Início': demanda.index[dias[primeiro_dia]],
+        'Término': demanda.index[dias[ultimo_dia]],
+        'Dias acima': np.diff(np.append(primeiro_dia, len(dias))),
+        'Pico': np.maximum.reduceat(valores[dias], primeiro_dia),
+        'Excesso': np.add.reduceat(valores[dias] - capacidade, primeiro_dia),
+    }, index=pd.RangeIndex(1, len(primeiro_dia) + 1, name='Janela'))
@@ -0,0 +1,187 @@
+import io
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Relatório com as tabelas calculadas numa única planilha .xlsx ou num pacote .zip de arquivos Parquet ou CSV.
+# Os valores ficam numéricos (sem os textos "R$" e "%" da exibição) e as datas, como datas.
+FORMATOS_RELATORIO = ['xlsx', 'parquet', 'csv']
+
+# Nomes dos valores devolvidos por analise.calcular_indicadores, na ordem
+NOMES_INDICADORES = ['Latências - (%)', 'Latências + (%)', 'Relacionamento TI (%)', 'Sem Relacionamento (%)',
+                     'Início BL', 'Término BL', 'Duração (dias)', 'Duração (dias úteis)']
+
+# Linhas convertidas em XML de cada vez (a memória de pico depende disso, não do tamanho da tabela)
+LINHAS_POR_LOTE = 10_000
+# Linhas por aba do Excel (com o cabeçalho); tabelas maiores continuam em abas "nome (2)", "nome (3)"...
+MAX_LINHAS_XLSX = 1_048_576
+FORMATO_DATA_XLSX = 'dd/mm/yyyy'
+
+# Data zero dos números de série de datas do Excel
+_EPOCA_EXCEL = pd.Timestamp('1899-12-30')
+# Caracteres de controle que não podem aparecer no XML
+_CONTROLE = r'[\x00-\x08\x0b\x0c\x0e-\x1f]'
+_ESPACO_SS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_ESPACO_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_TIPO_OFFICE = 'application/vnd.openxmlformats-officedocument.spreadsheetml'
+_CABECALHO_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+# Estilos das células: 0 padrão, 1 data, 2 cabeçalho em negrito
+_ESTILOS = (
+    f'<styleSheet xmlns="{_ESPACO_SS}"><numFmts count="1"><numFmt numFmtId="164" formatCode="{FORMATO_DATA_XLSX}"/>'
+    '</numFmts><fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/>'
+    '<name val="Calibri"/></font></fonts><fills count="2"><fill><patternFill patternType="none"/></fill><fill>'
+    '<patternFill patternType="gray125"/></fill></fills><borders count="1"><border><left/><right/><top/><bottom/>'
+    '<diagonal/></border></borders><cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>'
+    '</cellStyleXfs><cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs><cellStyles count="1">'
+    '<cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles></styleSheet>'
+)
+
+
+# Colunas numéricas da Curva S agrupada (sem as colunas formatadas para exibição), com o período como coluna
+def curva_s_numerica(CurvaS_agrupado):
+    colunas = ['Custo Total', '%', '% Acum.'] + [coluna for coluna in CurvaS_agrupado.columns
+                                                 if coluna.startswith('Curva')]
+    return CurvaS_agrupado[colunas].rename_axis('Período').reset_index()
+
+
+# Indicadores do cronograma ({nome: valor}, como os de calcular_indicadores com NOMES_INDICADORES) numa tabela
+# de uma linha, uma coluna por indicador; as datas, que calcular_indicadores devolve como texto, voltam a ser datas
+def tabela_indicadores_relatorio(indicadores):
+    tabela = pd.DataFrame([indicadores])
+    for coluna in ['Início BL', 'Término BL']:
+        if coluna in tabela.columns:
+            tabela[coluna] = pd.to_datetime(tabela[coluna], format='%d/%m/%y', errors='coerce')
+    return tabela
+
+
+def _escapar(texto):
+    return (texto.str.replace(_CONTROLE, '', regex=True).str.replace('&', '&amp;', regex=False)
+            .str.replace('<', '&lt;', regex=False).str.replace('>', '&gt;', regex=False)
+            .str.replace('"', '&quot;', regex=False))
+
+
+# Células XML de uma coluna: números e datas (número de série, com o estilo de data) como valores numéricos,
+# o resto como texto; vazios (NaN, NaT, <NA>, infinitos) como células vazias
+def _celulas(coluna):
+    vazios = coluna.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(coluna):
+        dias = (pd.DatetimeIndex(coluna).tz_localize(None) - _EPOCA_EXCEL) / pd.Timedelta(days=1)
+        celulas = '<c s="1"><v>' + pd.Series(np.asarray(dias, dtype=float)).astype(str) + '</v></c>'
+    elif pd.api.types.is_bool_dtype(coluna):
+        celulas = '<c t="b"><v>' + coluna.fillna(False).astype(int).astype(str).reset_index(drop=True) + '</v></c>'
+    elif pd.api.types.is_numeric_dtype(coluna):
+        valores = coluna.to_numpy(dtype=float, na_value=np.nan)
+        vazios = ~np.isfinite(valores)
+        celulas = '<c><v>' + pd.Series(valores).astype(str) + '</v></c>'
+    else:
+        texto = _escapar(coluna.astype(str).reset_index(drop=True))
+        celulas = '<c t="inlineStr"><is><t xml:space="preserve">' + texto + '</t></is></c>'
+        # Números numa coluna de texto (tipos misturados no arquivo exportado) continuam números
+        numeros = coluna.map(lambda valor: isinstance(valor, (int, float, np.number)) and not isinstance(valor, bool)
+                             ).to_numpy(dtype=bool)
+        if numeros.any():
+            celulas[numeros] = '<c><v>' + texto[numeros] + '</v></c>'
+    return np.where(vazios, '<c/>', celulas.to_numpy(dtype=object))
+
+
+# Aba em XML, gravada em trechos de LINHAS_POR_LOTE linhas (com o cabeçalho em negrito e congelado)
+def _gravar_aba(tabela, arquivo):
+    cabecalho = ''.join(f'<c s="2" t="inlineStr"><is><t>{texto}</t></is></c>'
+                        for texto in _escapar(pd.Series(tabela.columns.map(str), dtype=object)))
+    arquivo.write((f'{_CABECALHO_XML}<worksheet xmlns="{_ESPACO_SS}"><sheetViews><sheetView workbookViewId="0">'
+                   '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView>'
+                   f'</sheetViews><sheetData><row r="1">{cabecalho}</row>').encode())
+    for inicio in range(0, len(tabela), LINHAS_POR_LOTE):
+        colunas = [_celulas(coluna) for _, coluna in tabela.iloc[inicio:inicio + LINHAS_POR_LOTE].items()]
+        arquivo.write(''.join(f'<row r="{linha}">{"".join(celulas)}</row>'
+                              for linha, celulas in enumerate(zip(*colunas), inicio + 2)).encode())
+    arquivo.write(b'</sheetData></worksheet>')
+
+
+# Abas de cada tabela: (nome, trecho), com o nome válido no Excel (até 31 caracteres, sem []:*?/\) e as
+# tabelas longas divididas
+def _abas(tabelas):
+    for nome, tabela in tabelas.items():
+        nome = re.sub(r'[\[\]:*?/\\]', '_', str(nome))
+        for k, inicio in enumerate(range(0, max(len(tabela), 1), MAX_LINHAS_XLSX - 1)):
+            sufixo = f' ({k + 1})' if k else ''
+            yield nome[:31 - len(sufixo)] + sufixo, tabela.iloc[inicio:inicio + MAX_LINHAS_XLSX - 1]
+
+
+# Gravar as tabelas ({nome da aba: DataFrame}) numa planilha .xlsx, em destino (caminho ou arquivo binário).
+# O XML de cada aba é gerado por colunas, um trecho de cada vez, e vai direto para o .zip: a memória não cresce
+# com o número de linhas. Os textos ficam na própria célula (sem tabela de textos compartilhados).
+def gravar_xlsx(tabelas, destino):
+    nomes = []
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as pacote:
+        for k, (nome, tabela) in enumerate(_abas(tabelas), 1):
+            nomes.append(nome)
+            with pacote.open(f'xl/worksheets/sheet{k}.xml', 'w', force_zip64=True) as arquivo:
+                _gravar_aba(tabela, arquivo)
+        abas = ''.join(f'<sheet name="{nome}" sheetId="{k}" r:id="rId{k}"/>'
+                       for k, nome in enumerate(_escapar(pd.Series(nomes, dtype=object)), 1))
+        pacote.writestr('xl/workbook.xml', f'{_CABECALHO_XML}<workbook xmlns="{_ESPACO_SS}" xmlns:r="{_ESPACO_REL}">'
+                                           f'<sheets>{abas}</sheets></workbook>')
+        relacoes = ''.join(f'<Relationship Id="rId{k}" Type="{_ESPACO_REL}/worksheet" '
+                           f'Target="worksheets/sheet{k}.xml"/>' for k in range(1, len(nomes) + 1))
+        relacoes += f'<Relationship Id="rId{len(nomes) + 1}" Type="{_ESPACO_REL}/styles" Target="styles.xml"/>'
+        pacote.writestr('xl/_rels/workbook.xml.rels', f'{_CABECALHO_XML}<Relationships xmlns="http://schemas.'
+                                                      f'openxmlformats.org/package/2006/relationships">{relacoes}'
+                                                      '</Relationships>')
+        pacote.writestr('xl/styles.xml', _CABECALHO_XML + _ESTILOS)
+        pacote.writestr('_rels/.rels', f'{_CABECALHO_XML}<Relationships xmlns="http://schemas.openxmlformats.org/'
+                                       f'package/2006/relationships"><Relationship Id="rId1" Type="{_ESPACO_REL}/'
+                                       'officeDocument" Target="xl/workbook.xml"/></Relationships>')
+        planilhas = ''.join(f'<Override PartName="/xl/worksheets/sheet{k}.xml" '
+                            f'ContentType="{_TIPO_OFFICE}.worksheet+xml"/>' for k in range(1, len(nomes) + 1))
+        pacote.writestr('[Content_Types].xml', (
+            f'{_CABECALHO_XML}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/xl/workbook.xml" ContentType="{_TIPO_OFFICE}.sheet.main+xml"/>{planilhas}'
+            f'<Override PartName="/xl/styles.xml" ContentType="{_TIPO_OFFICE}.styles+xml"/></Types>'))
+
+
+# Parquet da tabela; colunas de texto com valores de tipos misturados (números e textos na mesma coluna do
+# arquivo exportado, como "Quant. Prev.") são gravadas como texto
+def _para_parquet(tabela, destino):
+    try:
+        tabela.to_parquet(destino, index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        objetos = tabela.select_dtypes(include='object').columns
+        destino.seek(0)
+        destino.truncate()
+        tabela.assign(**{coluna: tabela[coluna].map(str, na_action='ignore') for coluna in objetos}).to_parquet(
+            destino, index=False)
+
+
+# Gravar as tabelas num .zip com um arquivo Parquet ou CSV por tabela, em destino (caminho ou arquivo binário).
+# O CSV é escrito direto no .zip, em trechos; o Parquet (já comprimido) é guardado sem nova compressão.
+def gravar_pacote(tabelas, destino, formato='parquet'):
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as pacote:
+        for nome, tabela in tabelas.items():
+            if formato == 'parquet':
+                conteudo = io.BytesIO()
+                _para_parquet(tabela, conteudo)
+                pacote.writestr(f'{nome}.parquet', conteudo.getvalue(), compress_type=zipfile.ZIP_STORED)
+            elif formato == 'csv':
+                with pacote.open(f'{nome}.csv', 'w', force_zip64=True) as binario, \
+                        io.TextIOWrapper(binario, encoding='utf-8', newline='') as texto:
+                    tabela.to_csv(texto, index=False, chunksize=LINHAS_POR_LOTE)
+            else:
+                raise ValueError(f'Formato de pacote inválido: {formato!r} (use parquet ou csv)')
+
+
+# Relatório no formato escolhido (xlsx, parquet ou csv; os dois últimos num .zip), como bytes para download
+def relatorio_bytes(tabelas, formato='xlsx'):
+    conteudo = io.BytesIO()
+    if formato == 'xlsx':
+        gravar_xlsx(tabelas, conteudo)
+    else:
+        gravar_pacote(tabelas, conteudo, formato)
+    return conteudo.getvalue()
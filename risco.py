@@ -0,0 +1,167 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cpm import RedeEmNiveis, inicio_minimo_tarefas, passagens_em_lote, rede_de_tarefas
+
+# Distribuições da incerteza de duração: três pontos (otimista, mais provável = Duração BL, pessimista)
+# ou percentual simétrico (uniforme em ±%)
+DISTRIBUICOES = ['Triangular', 'Uniforme']
+PERCENTIS = (10, 50, 80, 90)
+
+# Iterações por lote (cada lote é uma matriz tarefas x iterações em cada passagem)
+TAMANHO_LOTE_SIMULACAO = 250
+
+# Folga (dias úteis) até a qual a tarefa conta como crítica numa iteração
+TOLERANCIA_CRITICA = 1e-6
+
+
+# Fatores multiplicativos em [1 - otimista, 1 + pessimista] (inversa da distribuição acumulada, para aceitar
+# intervalos degenerados, como incerteza zero)
+def _fatores(rng, forma, distribuicao, otimista, pessimista):
+    u = rng.random(forma)
+    if distribuicao == 'Uniforme':
+        return 1 - otimista + u * (otimista + pessimista)
+    largura = otimista + pessimista
+    if largura <= 0:
+        return np.ones(forma)
+    moda = otimista / largura
+    return np.where(u < moda, 1 - otimista + np.sqrt(u * largura * otimista),
+                    1 + pessimista - np.sqrt((1 - u) * largura * pessimista))
+
+
+# Custo acumulado por período de cada iteração: o custo da tarefa é distribuído por igual nos dias úteis que
+# ela ocupa na iteração ([início cedo, término cedo), no mínimo um dia) com o array de diferenças de
+# distribuicao.py, agora com uma linha por iteração. periodos_ate dá o período de cada dia útil a partir da
+# data zero; devolve uma coluna por período até o último da iteração mais longa.
+def _custo_acumulado_por_periodo(inicio_cedo, termino_cedo, custos, periodos_ate):
+    n, m = inicio_cedo.shape
+    pos_inicio = np.floor(inicio_cedo).astype(np.int64)
+    pos_fim = np.maximum(np.ceil(termino_cedo).astype(np.int64), pos_inicio + 1)
+    horizonte = int(pos_fim.max()) + 1
+    periodo_dia = periodos_ate(horizonte)
+    deslocamento = np.arange(m, dtype=np.int64) * (horizonte + 1)
+    pesos = (custos / (pos_fim - pos_inicio)).ravel()
+    delta = (np.bincount((pos_inicio + deslocamento).ravel(), weights=pesos, minlength=m * (horizonte + 1))
+             - np.bincount((pos_fim + deslocamento).ravel(), weights=pesos, minlength=m * (horizonte + 1)))
+    acumulado = np.cumsum(np.cumsum(delta.reshape(m, horizonte + 1)[:, :horizonte], axis=1), axis=1)
+    ultimo_dia = np.searchsorted(periodo_dia, np.arange(periodo_dia[-1] + 1), side='right') - 1
+    return acumulado[:, ultimo_dia]
+
+
+# Períodos (número do mês ou da semana a partir do período da data zero) dos primeiros dias úteis do projeto
+class _PeriodosDias:
+
+    def __init__(self, calendario, data_base, frequencia):
+        self.calendario = calendario
+        self.data_base = data_base
+        self.frequencia = frequencia
+
+    def __call__(self, n_dias):
+        dias = pd.DatetimeIndex(self.calendario.deslocar(self.data_base, np.arange(n_dias)).astype('datetime64[ns]'))
+        periodos = dias.to_period(self.frequencia).asi8
+        return periodos - periodos[0]
+
+
+# Um lote de iterações (executado num processo do pool): sorteia durações e custos, faz as passagens e
+# devolve o término do projeto de cada iteração, quantas vezes cada tarefa foi crítica e o custo acumulado
+# por período
+def simular_lote(niveis, duracao, custo, inicio_minimo, periodos_ate, opcoes, semente, n_iteracoes):
+    rng = np.random.default_rng(semente)
+    forma = (len(duracao), n_iteracoes)
+    duracoes = duracao[:, np.newaxis] * _fatores(rng, forma, opcoes['distribuicao'], opcoes['otimista'],
+                                                 opcoes['pessimista'])
+    custos = custo[:, np.newaxis] * _fatores(rng, forma, 'Triangular', opcoes['incerteza_custo'],
+                                             opcoes['incerteza_custo'])
+    inicio_cedo, termino_cedo, folga = passagens_em_lote(niveis, duracoes, inicio_minimo)
+    termino = termino_cedo.max(axis=0, initial=0.0)
+    criticas = (folga <= TOLERANCIA_CRITICA).sum(axis=1)
+    return termino, criticas, _custo_acumulado_por_periodo(inicio_cedo, termino_cedo, custos, periodos_ate)
+
+
+# Último dia útil trabalhado para cada término em dias úteis a partir da data zero (como no cpm.py)
+def _datas_termino(calendario, data_base, termino):
+    ultimo_dia = np.maximum(np.ceil(termino) - 1, 0).astype(np.int64)
+    return pd.to_datetime(calendario.deslocar(data_base, ultimo_dia))
+
+
+# Simulação de Monte Carlo do prazo e do custo: as durações da linha de base ("Duração BL") recebem a
+# incerteza (três pontos com -otimista/+pessimista ou uniforme em ±%), os custos uma incerteza triangular
+# simétrica, e cada iteração é uma passagem de ida e volta do CPM pela rede de Predecessoras. As iterações
+# são feitas em lotes vetorizados sobre a rede em níveis topológicos e os lotes são divididos entre
+# processos; com a mesma semente o resultado não depende do número de processos.
+# Devolve as datas de término de cada iteração, o índice de criticidade de cada tarefa (% das iterações em que
+# ela foi crítica) e as faixas de percentis do custo acumulado por período (Curva S).
+def simular_riscos(df, calendario, n_iteracoes=1000, distribuicao='Triangular', otimista=0.1, pessimista=0.3,
+                   incerteza_custo=0.0, agrupamento_opcao='Mês', percentis=PERCENTIS, semente=0, processos=None,
+                   vinculos=None, tamanho_lote=TAMANHO_LOTE_SIMULACAO):
+    duracao = df['Duração BL'].to_numpy(dtype=float)
+    custo = np.nan_to_num(pd.to_numeric(df['Custo'], errors='coerce').to_numpy(dtype=float), nan=0.0,
+                          posinf=0.0, neginf=0.0)
+    rede = rede_de_tarefas(df, duracao, vinculos)
+    niveis = RedeEmNiveis(rede)
+    data_base, inicio_minimo = inicio_minimo_tarefas(df, calendario, rede, 'Início BL')
+    periodos_ate = _PeriodosDias(calendario, data_base, 'M' if agrupamento_opcao == 'Mês' else 'W-MON')
+    opcoes = {'distribuicao': distribuicao, 'otimista': otimista, 'pessimista': pessimista,
+              'incerteza_custo': incerteza_custo}
+
+    # Uma semente por lote, derivada da semente principal
+    tamanhos = [min(tamanho_lote, n_iteracoes - inicio) for inicio in range(0, n_iteracoes, tamanho_lote)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    argumentos = [(niveis, duracao, custo, inicio_minimo, periodos_ate, opcoes, semente_lote, tamanho)
+                  for semente_lote, tamanho in zip(sementes, tamanhos)]
+    processos = min(processos or os.cpu_count() or 1, len(tamanhos))
+    if processos > 1:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            lotes = list(pool.map(simular_lote, *zip(*argumentos)))
+    else:
+        lotes = [simular_lote(*argumento) for argumento in argumentos]
+
+    termino = np.concatenate([lote[0] for lote in lotes])
+    criticas = np.sum([lote[1] for lote in lotes], axis=0)
+    # Lotes mais curtos já chegaram ao custo total: completar as colunas com o último valor
+    n_periodos = max(lote[2].shape[1] for lote in lotes)
+    acumulado = np.concatenate([np.pad(lote[2], ((0, 0), (0, n_periodos - lote[2].shape[1])), mode='edge')
+                                for lote in lotes])
+
+    datas_termino = pd.Series(_datas_termino(calendario, data_base, termino), name='Término')
+    criticidade = pd.DataFrame({
+        'Nome da tarefa': df['Nome da tarefa'].to_numpy(),
+        'Início BL': df['Início BL'].to_numpy(),
+        'Término BL': df['Término BL'].to_numpy(),
+        'Duração BL': df['Duração BL'].to_numpy(),
+        'Criticidade (%)': criticas / n_iteracoes * 100,
+    }).sort_values('Criticidade (%)', ascending=False, kind='stable').reset_index(drop=True)
+    return datas_termino, criticidade, _faixas_curva_s(acumulado, percentis, periodos_ate, agrupamento_opcao)
+
+
+# Percentis do custo acumulado por período, em R$ e em % do custo total da própria iteração, com os rótulos
+# da Curva S
+def _faixas_curva_s(acumulado, percentis, periodos_ate, agrupamento_opcao):
+    primeiro = pd.Timestamp(periodos_ate.data_base).to_period(periodos_ate.frequencia)
+    periodos = pd.period_range(primeiro, periods=acumulado.shape[1], freq=periodos_ate.frequencia)
+    formato = '%m/%y' if agrupamento_opcao == 'Mês' else '%d/%m/%y'
+    indice = pd.Index(periodos.end_time.strftime(formato), name='Período')
+    total = acumulado[:, -1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentual = np.where(total > 0, acumulado / total * 100, 0.0)
+    faixas = pd.DataFrame(np.percentile(acumulado, percentis, axis=0).T, index=indice,
+                          columns=[f'P{p}' for p in percentis])
+    faixas['Média'] = acumulado.mean(axis=0)
+    for p, valores in zip(percentis, np.percentile(percentual, percentis, axis=0)):
+        faixas[f'P{p} %'] = valores
+    return faixas
+
+
+# Datas de término nos percentis pedidos (datas efetivamente simuladas) e a probabilidade de terminar até a data
+# de referência (em geral o Término BL)
+def resumo_termino(datas_termino, data_referencia=None, percentis=PERCENTIS):
+    dias = datas_termino.to_numpy(dtype='datetime64[D]')
+    resumo = {f'P{p}': pd.Timestamp(np.percentile(dias.astype(np.int64), p, method='higher').astype('datetime64[D]'))
+              for p in percentis}
+    if data_referencia is not None:
+        resumo['Probabilidade no prazo (%)'] = float((dias <= np.datetime64(pd.Timestamp(data_referencia), 'D')).mean()
+                                                     * 100)
+    return resumo
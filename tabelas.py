@@ -0,0 +1,82 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Linhas por página nas tabelas do app
+TAMANHO_PAGINA = 50
+
+_PONTO_VIRGULA = str.maketrans(',.', '.,')
+
+
+# Formatos de exibição (aplicados só às linhas da página)
+def formato_data(coluna):
+    return pd.to_datetime(coluna).dt.strftime('%d/%m/%y')
+
+
+def formato_percentual(coluna):
+    return coluna.map('{:.1f}%'.format)
+
+
+def formato_reais(coluna):
+    return ('R$ ' + coluna.map('{:,.0f}'.format).str.translate(_PONTO_VIRGULA)).where(coluna.notna(), '')
+
+
+def formato_indice(coluna):
+    return coluna.map('{:.2f}'.format).str.replace('.', ',', regex=False).where(coluna.notna(), '')
+
+
+# Hash do conteúdo da tabela (chave do cache das páginas)
+def hash_tabela(tabela):
+    linhas = pd.util.hash_pandas_object(tabela, index=False).to_numpy()
+    colunas = '|'.join(map(str, tabela.columns)).encode()
+    return hashlib.blake2b(linhas.tobytes() + colunas, digest_size=16).hexdigest()
+
+
+# Posições das linhas que passam no filtro (texto em qualquer coluna de texto), na ordem pedida
+def ordenar_filtrar(tabela, filtro='', ordenar_por=None, crescente=True):
+    selecionadas = np.ones(len(tabela), dtype=bool)
+    if filtro:
+        selecionadas[:] = False
+        for coluna in tabela.columns:
+            if pd.api.types.is_object_dtype(tabela[coluna]) or isinstance(tabela[coluna].dtype, pd.CategoricalDtype):
+                selecionadas |= tabela[coluna].astype(str).str.contains(filtro, case=False, regex=False).to_numpy()
+    posicoes = np.flatnonzero(selecionadas)
+    if ordenar_por is not None:
+        valores = tabela[ordenar_por].iloc[posicoes].reset_index(drop=True)
+        posicoes = posicoes[_chaves_ordenacao(valores).sort_values(list(_CHAVES), ascending=crescente, kind='stable',
+                                                                   na_position='last').index]
+    return posicoes
+
+
+_CHAVES = ('número', 'texto')
+
+
+# Chaves de ordenação de uma coluna: a própria coluna ou, nas colunas de texto e categóricas (que podem misturar
+# números e textos, como "Quant. Prev."), os números primeiro, em ordem numérica, e depois os textos
+def _chaves_ordenacao(valores):
+    if not (pd.api.types.is_object_dtype(valores) or isinstance(valores.dtype, pd.CategoricalDtype)):
+        return pd.DataFrame({'número': valores, 'texto': None})
+    numeros = pd.to_numeric(valores.astype(object), errors='coerce')
+    textos = valores.astype(str).where(valores.notna() & numeros.isna())
+    return pd.DataFrame({'número': numeros, 'texto': textos})
+
+
+# Uma página da tabela filtrada e ordenada, já formatada para exibição; devolve (página, total de linhas,
+# número da página efetivamente exibida, total de páginas)
+def pagina_tabela(tabela, pagina=1, tamanho_pagina=TAMANHO_PAGINA, filtro='', ordenar_por=None, crescente=True,
+                  formatos=None):
+    posicoes = ordenar_filtrar(tabela, filtro, ordenar_por, crescente)
+    total = len(posicoes)
+    n_paginas = max(1, -(-total // tamanho_pagina))
+    pagina = min(max(1, pagina), n_paginas)
+    inicio = (pagina - 1) * tamanho_pagina
+    recorte = tabela.iloc[posicoes[inicio:inicio + tamanho_pagina]].reset_index(drop=True)
+
+    formatos = dict(formatos or {})
+    for coluna in recorte.columns:
+        if coluna not in formatos and pd.api.types.is_datetime64_any_dtype(recorte[coluna]):
+            formatos[coluna] = formato_data
+    recorte = recorte.assign(**{coluna: formatar(recorte[coluna]) for coluna, formatar in formatos.items()
+                                if coluna in recorte.columns})
+    return recorte, total, pagina, n_paginas
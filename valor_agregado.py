@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from curva_s import agrupar_curva
+from distribuicao import CargaCustos, MatrizCustos
+
+# Agrupamentos da série de valor agregado
+AGRUPAMENTOS = ['Dia', 'Semana', 'Mês']
+
+
+# Intervalo de cada tarefa no eixo pelas datas agendadas, cortado na data de status. Tarefas com valor
+# (avanço ou custo real) que pelo agendado ainda não começaram entram no dia de status; as sem datas agendadas,
+# no primeiro dia do eixo.
+def _intervalos_ate_status(df, datas_uteis, calendario, pos_status):
+    agendado = pd.DataFrame({'Nome da tarefa': df['Nome da tarefa'], 'Início BL': df['Início Agendado'],
+                             'Término BL': df['Término Agendado'], 'Custo Diário': 0.0})
+    matriz = MatrizCustos.de_tarefas(agendado, datas_uteis, calendario)
+    pos_inicio = np.minimum(matriz.pos_inicio, pos_status)
+    pos_fim = np.clip(matriz.pos_fim, pos_inicio + 1, pos_status + 1)
+    return matriz.tarefas, pos_inicio, pos_fim
+
+
+# Valor de cada tarefa distribuído por igual no intervalo até a data de status; devolve o total por dia
+def _distribuir_ate_status(datas_uteis, tarefas, pos_inicio, pos_fim, valores):
+    valores = np.nan_to_num(np.asarray(valores, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+    diario = valores / (pos_fim - pos_inicio)
+    return MatrizCustos(datas_uteis, tarefas, pos_inicio, pos_fim, diario).total_diario()
+
+
+# Somar a série diária por semana ou mês como a Curva S; por dia, só o rótulo do período muda
+def _agrupar(diario, agrupamento_opcao):
+    if agrupamento_opcao != 'Dia':
+        return agrupar_curva(diario, agrupamento_opcao).rename_axis('Período')
+    agrupado = diario.copy()
+    agrupado.index = agrupado.index.strftime('%d/%m/%y')
+    return agrupado.rename_axis('Período')
+
+
+# Série de valor agregado acumulado por período: VP (valor planejado, a Curva S da linha de base com o mesmo
+# perfil de carga), VA (valor agregado pelo "% Concluída") e CR (custo real pelo "Custo Real"), com IDP = VA/VP,
+# IDC = VA/CR e a estimativa no término ENT = ONT/IDC. Tudo é calculado de uma vez para todas as tarefas e todos
+# os períodos; VA e CR são distribuídos pelas datas agendadas até a data de status e ficam vazios depois dela.
+# Devolve a série e o resumo na data de status (com o orçamento no término, ONT), que não depende do agrupamento.
+def serie_valor_agregado(df, calendario, data_status, agrupamento_opcao='Mês', perfil='Uniforme'):
+    data_status = pd.Timestamp(data_status).normalize()
+    inicio = min(df['Início BL'].min(), df['Início Agendado'].min())
+    termino = max(df['Término BL'].max(), df['Término Agendado'].max(), data_status)
+    datas_uteis = calendario.dias_uteis(inicio, termino)
+
+    # VP: mesma distribuição diária da Curva S; o orçamento de cada tarefa é o custo que ela distribui no eixo
+    planejado = CargaCustos.de_tarefas(df, datas_uteis, calendario, perfil)
+    vp_diario = planejado.total_diario()
+    orcamento = planejado.custo_distribuido()
+    ont = float(orcamento.sum())
+
+    # Último dia útil até a data de status
+    pos_status = int(np.searchsorted(datas_uteis.values, data_status.to_datetime64(), side='right')) - 1
+    pos_status = min(max(pos_status, 0), len(datas_uteis) - 1)
+    tarefas, pos_inicio, pos_fim = _intervalos_ate_status(df, datas_uteis, calendario, pos_status)
+
+    diario = pd.DataFrame({'VP': vp_diario, 'VA': 0.0, 'CR': 0.0})
+    if '% Concluída' in df.columns:
+        diario['VA'] = _distribuir_ate_status(datas_uteis, tarefas, pos_inicio, pos_fim,
+                                              df['% Concluída'].to_numpy(dtype=float) * orcamento)
+    if 'Custo Real' in df.columns:
+        diario['CR'] = _distribuir_ate_status(datas_uteis, tarefas, pos_inicio, pos_fim, df['Custo Real'])
+
+    # Acumulado por período; o período da data de status acumula só até ela e os seguintes ficam vazios
+    acumulado = _agrupar(diario, agrupamento_opcao).cumsum()
+    ate_status = _agrupar(pd.Series(np.arange(len(datas_uteis)) <= pos_status, index=datas_uteis),
+                          agrupamento_opcao).to_numpy() > 0
+    acumulado.loc[~ate_status, ['VA', 'CR']] = np.nan
+    for coluna, origem in [('VA', '% Concluída'), ('CR', 'Custo Real')]:
+        if origem not in df.columns:
+            acumulado[coluna] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acumulado['IDP'] = acumulado['VA'] / acumulado['VP'].where(acumulado['VP'] > 0)
+        acumulado['IDC'] = acumulado['VA'] / acumulado['CR'].where(acumulado['CR'] > 0)
+        acumulado['ENT'] = ont / acumulado['IDC'].where(acumulado['IDC'] > 0)
+    return acumulado, _resumo(diario.iloc[:pos_status + 1].sum(), acumulado[['VA', 'CR']].isna().all(), ont)
+
+
+# Valores acumulados até a data de status (pela série diária: o VP do período da data de status iria até o fim
+# do período) e variações de prazo (VPR = VA - VP) e de custo (VC = VA - CR). Sem a coluna de origem, VA ou CR
+# ficam vazios.
+def _resumo(ate_status, sem_valores, ont):
+    vp = float(ate_status['VP'])
+    va = np.nan if sem_valores['VA'] else float(ate_status['VA'])
+    cr = np.nan if sem_valores['CR'] else float(ate_status['CR'])
+    idp = va / vp if vp > 0 else np.nan
+    idc = va / cr if cr > 0 else np.nan
+    return {
+        'ONT': ont,
+        'VP': vp,
+        'VA': va,
+        'CR': cr,
+        'VPR': va - vp,
+        'VC': va - cr,
+        'IDP': idp,
+        'IDC': idc,
+        'ENT': ont / idc if idc > 0 else np.nan,
+    }
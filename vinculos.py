@@ -0,0 +1,94 @@
+import itertools
+import re
+
+import numpy as np
+import pandas as pd
+
+# Tipos de vínculo na ordem dos códigos inteiros usados nos arrays (TI = término-início, o padrão)
+TIPOS = ['TI', 'II', 'TT', 'IT']
+_SINONIMOS = {'FS': 'TI', 'SS': 'II', 'FF': 'TT', 'SF': 'IT'}
+
+# Unidades de latência convertidas para dias úteis ("dias" já foi removido na leitura)
+_DIAS_POR_UNIDADE = {'': 1.0, 'd': 1.0, 'ed': 1.0, 'dd': 1.0, 'h': 1 / 8, 'hr': 1 / 8, 'hrs': 1 / 8, 'hs': 1 / 8,
+                     'sem': 5.0, 's': 5.0, 'ms': 20.0, 'mês': 20.0, 'meses': 20.0, 'mes': 20.0}
+
+# Um vínculo: Id da predecessora, tipo opcional e latência opcional (+2, -1,5, +50%, +1 sem)
+_VINCULO = (r'(?P<id>\d+)\s*(?P<tipo>TI|II|TT|IT|FS|SS|FF|SF)?'
+            r'\s*(?:(?P<latencia>[+-]\s*\d+(?:[.,]\d+)?)\s*(?P<unidade>%|[a-zçê]+)?)?')
+_PADRAO_VINCULO = re.compile(_VINCULO)
+
+
+# Id de cada tarefa (preenchido na leitura; na falta dele, a posição da linha na exportação)
+def ids_tarefas(df):
+    if 'Id' in df.columns:
+        return df['Id'].to_numpy(dtype=np.int64)
+    return np.asarray(df.index, dtype=np.int64) + 1
+
+
+# Id e projeto numa única chave inteira (Ids são menores que 2^32), para procurar o Id só dentro do projeto
+def _chaves(ids, grupos):
+    return ids if grupos is None else (np.asarray(grupos, dtype=np.int64) << 32) + ids
+
+
+# Linhas cujo Id (no mesmo projeto, com grupos) já apareceu numa linha anterior
+def id_repetido(df, grupos=None):
+    return pd.Index(_chaves(ids_tarefas(df), grupos)).duplicated()
+
+
+# Posição de cada Id de `procurados` em `ids` (-1 se não existe); Ids repetidos valem pela primeira linha
+def posicoes_por_id(ids, procurados):
+    indice = pd.Index(ids)
+    if indice.is_unique:
+        return indice.get_indexer(procurados)
+    primeiras = np.flatnonzero(~indice.duplicated())
+    posicoes = pd.Index(ids[primeiras]).get_indexer(procurados)
+    return np.where(posicoes >= 0, primeiras[posicoes], -1)
+
+
+# Aplicar a conversão só aos valores distintos da coluna (tipos, latências e unidades se repetem muito)
+def _por_valor_unico(coluna, converter):
+    codigos, valores = pd.factorize(coluna)
+    return np.asarray(converter(pd.Series(valores, dtype=object)))[codigos]
+
+
+def _latencia_em_numero(valores):
+    return pd.to_numeric(valores.str.replace(r'\s', '', regex=True).str.replace(',', '.'),
+                         errors='coerce').fillna(0.0).to_numpy(dtype=float)
+
+
+# Tabela de vínculos (uma linha por vínculo) a partir da coluna Predecessoras, com origem e destino
+# como posições inteiras no DataFrame. Vínculos para tarefas fora do DataFrame (resumos, outros projetos)
+# são descartados. Com grupos (código inteiro do projeto de cada linha, numa carteira com vários projetos),
+# o Id da predecessora é procurado só no projeto da tarefa. Um Id repetido (ver id_repetido) liga os vínculos à
+# primeira tarefa com esse Id.
+def tabela_vinculos(df, grupos=None):
+    # Um findall por tarefa (bem mais rápido que str.extractall); grupos ausentes vêm como ''
+    vinculos_por_tarefa = [_PADRAO_VINCULO.findall(texto) for texto in df['Predecessoras'].fillna('').astype(str)]
+    quantidade = np.fromiter(map(len, vinculos_por_tarefa), dtype=np.int64, count=len(vinculos_por_tarefa))
+    partes = pd.DataFrame(list(itertools.chain.from_iterable(vinculos_por_tarefa)),
+                          columns=['id', 'tipo', 'latencia', 'unidade'], dtype=object)
+
+    destino = np.repeat(np.arange(len(vinculos_por_tarefa), dtype=np.int64), quantidade)
+    ids, ids_vinculos = ids_tarefas(df), partes['id'].to_numpy(dtype=np.int64)
+    if grupos is not None:
+        grupos = np.asarray(grupos, dtype=np.int64)
+        ids, ids_vinculos = _chaves(ids, grupos), _chaves(ids_vinculos, grupos[destino])
+    origem = posicoes_por_id(ids, ids_vinculos)
+
+    codigo_tipo = _por_valor_unico(partes['tipo'], lambda tipo: pd.Categorical(
+        tipo.replace('', 'TI').replace(_SINONIMOS), categories=TIPOS).codes).astype(np.int8)
+
+    latencia = _por_valor_unico(partes['latencia'], _latencia_em_numero).astype(float)
+    unidade = partes['unidade'].str.lower()
+    percentual = (unidade == '%').to_numpy()
+    latencia = latencia * _por_valor_unico(unidade, lambda u: u.map(_DIAS_POR_UNIDADE).fillna(1.0)).astype(float)
+    latencia[percentual] = latencia[percentual] / 100.0
+
+    validos = origem >= 0
+    return pd.DataFrame({
+        'origem': origem[validos].astype(np.int32),
+        'destino': destino[validos].astype(np.int32),
+        'tipo': codigo_tipo[validos],
+        'latencia': latencia[validos],
+        'percentual': percentual[validos],
+    })